@@ -1,17 +1,36 @@
 # app/api/analyze_router.py - 단순화된 분석 API
-from fastapi import APIRouter, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Header, UploadFile, File, Form, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from pathlib import Path
 import uuid
 import os
+import io
 import json
+import math
 import time
-from typing import Optional, Dict, Any
+import asyncio
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel
+import logging
 
 from ..services.analyzers.htp_analyzer import analyze_htp_image
 from ..services.analyzers.pitr_analyzer import analyze_pitr
-from ..services.analyzers.quest_analyzer import analyze_quest
+from ..services.analyzers.quest_analyzer import analyze_quest, precheck_quest_image
+from ..services.upload_store import upload_store
+from ..services.result_store import result_store
+from ..services.result_persistence import result_persistence, build_record
+from ..core.auth import check_admin_token, current_user
+from ..core.metrics import TimedJSONResponse, observe_duration, record_cache
+from ..core.memory_guard import memory_reporter
+from ..core.timing import attach_timings, start_request_timing
+from ..core.serialization import dumps, parse_fields, select_fields
+from ..core.config import (
+    BATCH_MAX_ITEMS, BATCH_GPT_CONCURRENCY, QUEST_PRECHECK_DEFAULT,
+    DEFERRED_SSE_TIMEOUT, GPT_OVERLAP_DEFAULT, RESPONSE_DEFAULT_VIEW,
+    CANVAS_MAX_SIDE, CANVAS_MAX_SCALE
+)
+
+logger = logging.getLogger(__name__)
 
 # === API 모델 ===
 
@@ -36,6 +55,15 @@ router = APIRouter()
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# view=compact 응답의 data 필드 (모바일 클라이언트용: 해석, 감정, 단계 정보)
+COMPACT_DATA_FIELDS = (
+    "stage", "stage_info", "analysis_type", "analysis_method",
+    "interpretation", "emotion", "emotion_confidence", "stress_score",
+    "gpt_pending", "required_objects"
+)
+# data에 없으면 gpt_analysis에서 가져오는 필드 (Quest는 해석/감정이 gpt_analysis에만 있음)
+COMPACT_GPT_FIELDS = ("interpretation", "emotion", "emotion_confidence")
+
 # === API 엔드포인트 ===
 
 @router.get("/health")
@@ -51,6 +79,7 @@ async def health_check():
                 "htp": "/analyze/htp - HTP 심리검사 (신뢰도 분기 + GPT Vision)",
                 "pitr": "/analyze/pitr - PITR 심리검사 (신뢰도 분기 + GPT Vision)", 
                 "quest": "/analyze/quest - Quest 단계별 (이미지 필수 + 텍스트 설명)",
+                "batch": "/analyze/batch - 다중 이미지 일괄 분석 (NDJSON 스트리밍)",
                 "stage_deprecated": "/analyze/stage - 더 이상 사용 안함 (quest 사용)"
             },
             "models": {
@@ -64,7 +93,9 @@ async def health_check():
                 "gpt_vision_fallback": True,
                 "gpt_vision_analysis": True,
                 "ekman_emotions": True,
-                "canvas_json_support": True
+                "canvas_json_support": True,
+                "batch_analysis": True,
+                "deferred_gpt_enrichment": True
             }
         }
     ).dict()
@@ -72,120 +103,138 @@ async def health_check():
 @router.post("/analyze/htp")
 async def analyze_htp_drawing(
     image: UploadFile = File(..., description="업로드할 HTP 그림 파일"),
-    description: str = Form("", description="그림에 대한 사용자 설명")
+    description: str = Form("", description="그림에 대한 사용자 설명"),
+    deferred: bool = Form(False, description="구조적 결과 즉시 반환 후 GPT 해석은 비동기로 보강"),
+    overlap: bool = Form(GPT_OVERLAP_DEFAULT, description="YOLO 탐지와 GPT Vision 호출을 동시에 실행"),
+    username: Optional[str] = Depends(current_user),
+    view: str = Form(RESPONSE_DEFAULT_VIEW, description="응답 형태: full(전체) / compact(해석·감정·단계 정보만)"),
+    fields: Optional[str] = Form(None, description="data에서 반환할 필드 (쉼표로 구분, 점 경로 가능: interpretation,gpt_analysis.emotion)")
 ):
     """
     HTP (House-Tree-Person) 심리 검사 분석 API
     - YOLOv8 .pt 모델로 객체 탐지
     - 위치/크기 기반 심리 해석
     - 신뢰도 기반 분기: 높은 신뢰도 → 규칙 기반, 낮은 신뢰도 → GPT Vision
+    - deferred=true: 탐지 직후 result_id와 함께 응답, GPT 해석은 /analyze/result/{result_id}로 조회
+    - overlap=true: GPT Vision 호출을 탐지와 병렬로 시작 (텍스트 분기로 결정되면 취소)
+    - view=compact: 해석·감정·단계 정보만 반환 (박스/위치·크기 분석/GPT 원문 제외), fields로 필드 직접 선택
     """
     try:
-        print(f"🏠 HTP 분석 요청: {image.filename}")
+        logger.info(f"HTP 분석 요청: {image.filename}")
         
         if not image or not image.filename:
-            return AnalysisResponse(
+            return render_analysis(build_analysis_response(
                 success=False,
                 message="이미지 파일이 필요합니다.",
                 error="NO_IMAGE_FILE"
-            ).dict()
+            ), view, fields)
         
         # 이미지 처리
         image_path = await process_image_upload(image)
         
         # HTP 분석 수행
-        print("🔍 HTP 분석 (.pt 모델)")
-        result = analyze_htp_image(image_path, description)
+        # 탐지/GPT 대기가 이벤트 루프를 막지 않도록 워커 스레드에서 실행 (overlap 모드는 GPT 완료까지 대기)
+        result = await asyncio.to_thread(analyze_htp_image, image_path, description, defer_gpt=deferred, overlap_gpt=overlap)
+        
+        # 지연 모드: 구조적 결과를 먼저 반환하고 GPT 해석은 백그라운드에서 보강
+        if result.get("gpt_pending"):
+            return render_analysis(start_deferred_enrichment("htp", result, image_path, description, username), view, fields)
         
         # 표준 응답 형식
-        response = AnalysisResponse(
+        response = build_analysis_response(
             success=result.get('success', True),
             message=result.get('message', 'HTP 분석이 완료되었습니다.'),
             data=result,
-            metadata={
-                "test_type": "htp",
-                "analysis_type": "htp_pt_model",
-                "model_used": "yolov8_htp_pt",
-                "timestamp": time.time()
-            }
+            metadata=build_metadata("htp")
         )
         
         # 임시 파일 정리
         cleanup_temp_file(image_path)
         
-        print(f"✅ HTP 분석 완료")
-        return response.dict()
+        logger.info("HTP 분석 완료")
+        return render_analysis(persist_analysis("htp", response, username, image_path=image_path), view, fields)
         
     except Exception as e:
-        print(f"❌ HTP 분석 오류: {e}")
-        return AnalysisResponse(
+        logger.exception(f"HTP 분석 오류: {e}")
+        return render_analysis(build_analysis_response(
             success=False,
             message="HTP 분석 중 오류가 발생했습니다.",
             error=str(e),
             metadata={"test_type": "htp"}
-        ).dict()
+        ), view, fields)
 
 @router.post("/analyze/pitr")
 async def analyze_pitr_drawing(
     image: UploadFile = File(..., description="업로드할 PITR 그림 파일"),
-    description: str = Form("", description="그림에 대한 사용자 설명")
+    description: str = Form("", description="그림에 대한 사용자 설명"),
+    deferred: bool = Form(False, description="구조적 결과 즉시 반환 후 GPT 해석은 비동기로 보강"),
+    overlap: bool = Form(GPT_OVERLAP_DEFAULT, description="YOLO 탐지와 GPT Vision 호출을 동시에 실행"),
+    username: Optional[str] = Depends(current_user),
+    view: str = Form(RESPONSE_DEFAULT_VIEW, description="응답 형태: full(전체) / compact(해석·감정·단계 정보만)"),
+    fields: Optional[str] = Form(None, description="data에서 반환할 필드 (쉼표로 구분, 점 경로 가능: interpretation,gpt_analysis.emotion)")
 ):
     """
     PITR (Person In The Rain) 심리 검사 분석 API
     - YOLOv8 .pt 모델로 객체 탐지
     - 스트레스 대처 능력 분석
     - 신뢰도 기반 분기: 높은 신뢰도 → 규칙 기반, 낮은 신뢰도 → GPT Vision
+    - deferred=true: 탐지 직후 result_id와 함께 응답, GPT 해석은 /analyze/result/{result_id}로 조회
+    - overlap=true: GPT Vision 호출을 탐지와 병렬로 시작 (텍스트 분기로 결정되면 취소)
+    - view=compact: 해석·감정·단계 정보만 반환 (박스/위치·크기 분석/GPT 원문 제외), fields로 필드 직접 선택
     """
     try:
-        print(f"🌧️ PITR 분석 요청: {image.filename}")
+        logger.info(f"PITR 분석 요청: {image.filename}")
         
         if not image or not image.filename:
-            return AnalysisResponse(
+            return render_analysis(build_analysis_response(
                 success=False,
                 message="이미지 파일이 필요합니다.",
                 error="NO_IMAGE_FILE"
-            ).dict()
+            ), view, fields)
         
         # 이미지 처리
         image_path = await process_image_upload(image)
         
         # PITR 분석 수행
-        print("🔍 PITR 분석 (.pt 모델)")
-        result = analyze_pitr(image_path, description)
+        # 탐지/GPT 대기가 이벤트 루프를 막지 않도록 워커 스레드에서 실행 (overlap 모드는 GPT 완료까지 대기)
+        result = await asyncio.to_thread(analyze_pitr, image_path, description, defer_gpt=deferred, overlap_gpt=overlap)
+        
+        # 지연 모드: 구조적 결과를 먼저 반환하고 GPT 해석은 백그라운드에서 보강
+        if result.get("gpt_pending"):
+            return render_analysis(start_deferred_enrichment("pitr", result, image_path, description, username), view, fields)
         
         # 표준 응답 형식
-        response = AnalysisResponse(
+        response = build_analysis_response(
             success=result.get('success', True),
             message=result.get('message', 'PITR 분석이 완료되었습니다.'),
             data=result,
-            metadata={
-                "test_type": "pitr",
-                "analysis_type": "pitr_pt_model",
-                "model_used": "yolov8_pitr_pt",
-                "timestamp": time.time()
-            }
+            metadata=build_metadata("pitr")
         )
         
         # 임시 파일 정리
         cleanup_temp_file(image_path)
         
-        print(f"✅ PITR 분석 완료")
-        return response.dict()
+        logger.info("PITR 분석 완료")
+        return render_analysis(persist_analysis("pitr", response, username, image_path=image_path), view, fields)
         
     except Exception as e:
-        print(f"❌ PITR 분석 오류: {e}")
-        return AnalysisResponse(
+        logger.exception(f"PITR 분석 오류: {e}")
+        return render_analysis(build_analysis_response(
             success=False,
             message="PITR 분석 중 오류가 발생했습니다.",
             error=str(e),
             metadata={"test_type": "pitr"}
-        ).dict()
+        ), view, fields)
 
 @router.post("/analyze/quest")
 async def analyze_quest_drawing(
     stage: int = Form(..., description="분석할 Quest 스테이지 번호 (1-12)"),
     image: UploadFile = File(..., description="업로드할 이미지 파일 또는 Canvas JSON"),
-    description: str = Form(..., description="그림에 대한 사용자 설명")
+    description: str = Form(..., description="그림에 대한 사용자 설명"),
+    precheck: bool = Form(QUEST_PRECHECK_DEFAULT, description="GPT 호출 전 단계별 필수 객체 사전 검사 여부"),
+    username: Optional[str] = Depends(current_user),
+    view: str = Form(RESPONSE_DEFAULT_VIEW, description="응답 형태: full(전체) / compact(해석·감정·단계 정보만)"),
+    fields: Optional[str] = Form(None, description="data에서 반환할 필드 (쉼표로 구분, 점 경로 가능: interpretation,gpt_analysis.emotion)")
 ):
     """
     Quest 단계별 그림 분석 API (Stage 1-12)
@@ -193,96 +242,150 @@ async def analyze_quest_drawing(
     - GPT Vision을 통한 이미지+텍스트 통합 분석
     - Ekman 6감정 분석
     - 단계별 질문에 맞춘 감정 해석
+    - precheck=true: 필수 객체가 없으면 GPT 호출 없이 즉시 반려
+    - view=compact: 해석·감정·단계 정보만 반환 (gpt_analysis의 해석/감정을 data로 올림), fields로 필드 직접 선택
     """
     try:
-        print(f"🎯 Quest Stage {stage} 분석 요청: {image.filename}")
+        logger.info(f"Quest Stage {stage} 분석 요청: {image.filename}")
         
         if not image or not image.filename:
-            return AnalysisResponse(
+            return render_analysis(build_analysis_response(
                 success=False,
                 message="이미지 파일이 필요합니다. Canvas JSON 또는 이미지 파일을 업로드해주세요.",
                 error="NO_IMAGE_FILE"
-            ).dict()
+            ), view, fields)
         
         if not description or description.strip() == "":
-            return AnalysisResponse(
+            return render_analysis(build_analysis_response(
                 success=False,
                 message="그림에 대한 설명이 필요합니다.",
                 error="NO_DESCRIPTION"
-            ).dict()
+            ), view, fields)
         
         if stage < 1 or stage > 12:
-            return AnalysisResponse(
+            return render_analysis(build_analysis_response(
                 success=False,
                 message="Quest Stage는 1-12 범위여야 합니다.",
                 error="INVALID_STAGE"
-            ).dict()
+            ), view, fields)
         
         # 이미지 처리 (필수)
-        print(f"📸 이미지 처리: {image.filename}")
         image_path = await process_image_upload(image)
-        analysis_method = "gpt_vision_with_image"
         
-        # Quest 분석 수행 - GPT 직접 분석
-        print(f"🔍 Quest Stage {stage} 분석 - GPT")
-        
-        # GPT 분석 직접 수행
-        from ..services.models.gpt_analyzer import gpt_analyzer
-        
-        gpt_result = gpt_analyzer.analyze_drawing(
-            stage=stage,
-            detected_objects=[],  # Quest는 객체 탐지하지 않음
-            description=description,
-            position_dict={},
-            size_dict={},
-            image_path=image_path,  # 이미지 필수 포함
-            analysis_type="quest"
-        )
+        # 필수 객체 사전 검사 (GPT 비용/지연 전에 미완성 그림 반려)
+        required_status = None
+        if precheck:
+            required_status = await asyncio.to_thread(precheck_quest_image, image_path, stage)
+            if required_status is not None and not required_status["ok"]:
+                cleanup_temp_file(image_path)
+                missing = ", ".join(required_status["missing_classes"])
+                logger.info(f"Quest Stage {stage} 사전 검사 실패: {missing}")
+                return render_analysis(build_analysis_response(
+                    success=False,
+                    message=f"그림에 필요한 요소가 부족합니다: {missing}",
+                    error="MISSING_REQUIRED_OBJECTS",
+                    data={
+                        "stage": stage,
+                        "stage_info": get_stage_question_info(stage),
+                        "required_objects": required_status
+                    },
+                    metadata={"test_type": "quest", "stage": stage, "precheck": True}
+                ), view, fields)
         
-        # Stage Question 정보 가져오기
-        stage_question = get_stage_question_info(stage)
-        
-        # 응답 구성
-        result = {
-            "stage": stage,
-            "analysis_type": "quest_gpt_vision",
-            "stage_info": stage_question,
-            "user_description": description,
-            "gpt_analysis": gpt_result,
-            "detected_objects": [],  # Quest는 객체 탐지하지 않음
-            "analysis_method": analysis_method,
-            "has_image": True  # 항상 이미지 있음
-        }
+        # Quest 분석 수행 - GPT 직접 분석
+        result = await asyncio.to_thread(run_quest_analysis, stage, image_path, description)
+        gpt_result = result["gpt_analysis"]
+        if required_status is not None:
+            result["required_objects"] = required_status
         
         # 표준 응답 형식
-        response = AnalysisResponse(
+        response = build_analysis_response(
             success=True,
             message=f'Quest Stage {stage} 분석이 완료되었습니다.',
             data=result,
-            metadata={
-                "test_type": "quest",
-                "stage": stage,
-                "analysis_type": "quest_gpt_vision",
-                "model_used": analysis_method,
-                "has_image": True,  # 항상 이미지 있음
-                "timestamp": time.time()
-            }
+            metadata=build_metadata("quest", stage)
         )
         
         # 임시 파일 정리
         cleanup_temp_file(image_path)
         
-        print(f"✅ Quest Stage {stage} 분석 완료: {gpt_result.get('emotion')} ({gpt_result.get('emotion_confidence'):.2f})")
-        return response.dict()
+        logger.info("Quest Stage %s 분석 완료: %s (%s)", stage, gpt_result.get("emotion"), gpt_result.get("emotion_confidence"))
+        return render_analysis(persist_analysis("quest", response, username, stage, image_path), view, fields)
         
     except Exception as e:
-        print(f"❌ Quest Stage {stage} 분석 오류: {e}")
-        return AnalysisResponse(
+        logger.exception(f"Quest Stage {stage} 분석 오류: {e}")
+        return render_analysis(build_analysis_response(
             success=False,
             message=f"Quest Stage {stage} 분석 중 오류가 발생했습니다.",
             error=str(e),
             metadata={"test_type": "quest", "stage": stage}
+        ), view, fields)
+
+@router.get("/analyze/result/{result_id}")
+async def get_deferred_result(
+    result_id: str,
+    view: str = Query(RESPONSE_DEFAULT_VIEW, description="응답 형태: full / compact"),
+    fields: Optional[str] = Query(None, description="data에서 반환할 필드 (쉼표로 구분)")
+):
+    """지연 분석 결과 폴링 (status: pending | complete | failed)"""
+    entry = result_store.get(result_id)
+    if entry is None:
+        return AnalysisResponse(
+            success=False,
+            message="결과를 찾을 수 없거나 만료되었습니다.",
+            error="RESULT_NOT_FOUND",
+            metadata={"result_id": result_id}
         ).dict()
+    return render_analysis({**entry["response"], "status": entry["status"]}, view, fields)
+
+@router.get("/analyze/result/{result_id}/events")
+async def stream_deferred_result(
+    result_id: str,
+    view: str = Query(RESPONSE_DEFAULT_VIEW, description="응답 형태: full / compact"),
+    fields: Optional[str] = Query(None, description="data에서 반환할 필드 (쉼표로 구분)")
+):
+    """지연 분석 결과 SSE 스트림 - 현재 상태를 보낸 뒤 완료 시 한 번 더 전송"""
+    async def event_stream():
+        entry = result_store.get(result_id)
+        if entry is None:
+            yield format_sse("error", {"result_id": result_id, "error": "RESULT_NOT_FOUND"})
+            return
+        yield format_sse(entry["status"], shape_response({**entry["response"], "status": entry["status"]}, view, fields))
+        if entry["status"] != "pending":
+            return
+        entry = await result_store.wait(result_id, DEFERRED_SSE_TIMEOUT)
+        if entry is None:
+            yield format_sse("error", {"result_id": result_id, "error": "RESULT_NOT_FOUND"})
+        elif entry["status"] == "pending":
+            yield format_sse("timeout", {"result_id": result_id, "status": "pending"})
+        else:
+            yield format_sse(entry["status"], shape_response({**entry["response"], "status": entry["status"]}, view, fields))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@router.get("/analyze/persistence")
+async def get_persistence_stats():
+    """분석 결과 저장 큐 상태 (큐 깊이, 기록/버림 건수, 배치 기록 지연)"""
+    return {"enabled": result_persistence.enabled, **result_persistence.stats()}
+
+@router.get("/analyze/memory")
+async def get_memory_stats(
+    top: bool = False,
+    x_admin_token: Optional[str] = Header(None),
+    token: Optional[str] = Query(None, description="ADMIN_TOKEN (top=true일 때, X-Admin-Token 헤더 대신 사용)")
+):
+    """
+    프로세스 메모리 상태 (RSS, 예산 가드, tracemalloc 추적 메모리, CUDA 텐서 메모리)
+    - top=true: tracemalloc 사용 시 할당 위치별 상위 항목 포함
+      (스냅샷 비용이 크고 소스 경로/줄 번호가 노출되므로 관리자 토큰 필요)
+    """
+    if top:
+        check_admin_token(x_admin_token or token)
+    return await asyncio.to_thread(memory_reporter.collect, top)
 
 @router.post("/analyze/stage")
 async def analyze_stage_drawing(
@@ -304,8 +407,355 @@ async def analyze_stage_drawing(
         }
     ).dict()
 
+@router.post("/analyze/batch")
+async def analyze_batch_drawings(
+    images: List[UploadFile] = File(..., description="분석할 이미지 파일 또는 Canvas JSON 목록"),
+    items: str = Form(..., description='항목별 설정 JSON 배열 (images와 같은 순서): [{"test_type": "htp|pitr|quest", "stage": 3, "description": "..."}]'),
+    username: Optional[str] = Depends(current_user),
+    view: str = Form(RESPONSE_DEFAULT_VIEW, description="항목별 응답 형태: full / compact"),
+    fields: Optional[str] = Form(None, description="항목별 data에서 반환할 필드 (쉼표로 구분)")
+):
+    """
+    배치 분석 API (회기 종료 후 12단계 포트폴리오 일괄 업로드용)
+    - HTP/PITR 항목은 모델별로 YOLO를 한 번의 배치로 실행
+    - GPT 호출은 BATCH_GPT_CONCURRENCY 한도 내에서 동시 실행
+    - 항목별 결과는 완료되는 순서대로 NDJSON으로 스트리밍 (view/fields는 항목마다 적용)
+    - 결과는 Authorization 세션 토큰의 사용자로 저장 (항목별 username은 받지 않음)
+    """
+    try:
+        item_specs = json.loads(items)
+    except json.JSONDecodeError as e:
+        return AnalysisResponse(
+            success=False,
+            message="items는 JSON 배열이어야 합니다.",
+            error=f"INVALID_ITEMS: {e}"
+        ).dict()
+    
+    if not isinstance(item_specs, list) or len(item_specs) != len(images):
+        return AnalysisResponse(
+            success=False,
+            message="items 항목 수가 이미지 수와 일치해야 합니다.",
+            error="ITEM_COUNT_MISMATCH"
+        ).dict()
+    
+    if len(images) > BATCH_MAX_ITEMS:
+        return AnalysisResponse(
+            success=False,
+            message=f"한 번에 최대 {BATCH_MAX_ITEMS}개까지 분석할 수 있습니다.",
+            error="TOO_MANY_ITEMS"
+        ).dict()
+    
+    logger.info(f"배치 분석 요청: {len(images)}개 항목")
+    
+    # 업로드는 응답 스트리밍 전에 모두 저장 (UploadFile은 핸들러 종료 후 닫힘)
+    prepared = []
+    for index, (image, spec) in enumerate(zip(images, item_specs)):
+        spec = spec if isinstance(spec, dict) else {}
+        test_type = str(spec.get("test_type", "")).lower()
+        stage = spec.get("stage")
+        description = spec.get("description", "") or ""
+        
+        error = validate_batch_item(test_type, stage, description)
+        image_path = None
+        if error is None:
+            try:
+                image_path = await process_image_upload(image)
+            except Exception as e:
+                error = AnalysisResponse(
+                    success=False,
+                    message="이미지 처리 중 오류가 발생했습니다.",
+                    error=str(e),
+                    metadata={"test_type": test_type}
+                )
+        
+        prepared.append({
+            "index": index,
+            "test_type": test_type,
+            "stage": stage,
+            "description": description,
+            "username": username,
+            "image_path": image_path,
+            "error": error
+        })
+    
+    return StreamingResponse(
+        stream_batch_results(prepared, view, fields),
+        media_type="application/x-ndjson"
+    )
+
 # === 헬퍼 함수들 ===
 
+def build_metadata(test_type: str, stage: Optional[int] = None) -> dict:
+    """분석 유형별 표준 메타데이터"""
+    if test_type == "quest":
+        return {
+            "test_type": "quest",
+            "stage": stage,
+            "analysis_type": "quest_gpt_vision",
+            "model_used": "gpt_vision_with_image",
+            "has_image": True,  # 항상 이미지 있음
+            "timestamp": time.time()
+        }
+    return {
+        "test_type": test_type,
+        "analysis_type": f"{test_type}_pt_model",
+        "model_used": f"yolov8_{test_type}_pt",
+        "timestamp": time.time()
+    }
+
+# 진행 중인 GPT 보강 작업 (가비지 컬렉션 방지용 참조)
+_deferred_tasks = set()
+
+def start_deferred_enrichment(test_type: str, result: dict, image_path: str, description: str,
+                              username: Optional[str] = None) -> dict:
+    """구조적 결과를 result_id와 함께 즉시 반환하고 GPT 보강 작업 예약"""
+    metadata = build_metadata(test_type)
+    # 보강 작업이 result를 직접 갱신하므로 즉시 응답/대기 중 결과에는 복사본 사용
+    response = build_analysis_response(
+        success=result.get('success', True),
+        message="구조적 분석이 완료되었습니다. GPT 해석은 준비되는 대로 제공됩니다.",
+        data=dict(result),
+        metadata=metadata
+    )
+    
+    result_id = result_store.create(response)
+    response["metadata"].update({
+        "result_id": result_id,
+        "gpt_pending": True,
+        "poll_url": f"/api/analyze/result/{result_id}",
+        "events_url": f"/api/analyze/result/{result_id}/events"
+    })
+    
+    task = asyncio.create_task(finish_deferred_enrichment(result_id, test_type, result, image_path, description, username))
+    _deferred_tasks.add(task)
+    task.add_done_callback(_deferred_tasks.discard)
+    
+    logger.info(f"{test_type.upper()} 구조적 결과 즉시 반환 (result_id={result_id})")
+    return response
+
+async def finish_deferred_enrichment(result_id: str, test_type: str, result: dict, image_path: str, description: str,
+                                     username: Optional[str] = None):
+    """백그라운드 GPT 해석 보강 후 결과 저장소 갱신"""
+    from ..services.models.confidence_analyzer import complete_deferred_analysis
+    
+    try:
+        enriched = await asyncio.to_thread(complete_deferred_analysis, result, image_path, description)
+        metadata = build_metadata(test_type)
+        metadata.update({"result_id": result_id, "gpt_pending": False})
+        response = build_analysis_response(
+            success=enriched.get('success', True),
+            message=f'{test_type.upper()} 분석이 완료되었습니다.',
+            data=enriched,
+            metadata=metadata
+        )
+        result_store.complete(result_id, persist_analysis(test_type, response, username, image_path=image_path))
+        logger.info(f"{test_type.upper()} GPT 해석 보강 완료 (result_id={result_id})")
+    except Exception as e:
+        logger.exception(f"{test_type.upper()} GPT 해석 보강 오류: {e}")
+        result_store.complete(result_id, AnalysisResponse(
+            success=False,
+            message=f"{test_type.upper()} GPT 해석 중 오류가 발생했습니다.",
+            error=str(e),
+            data=result,
+            metadata={"test_type": test_type, "result_id": result_id}
+        ).dict(), status="failed")
+    finally:
+        cleanup_temp_file(image_path)
+
+def build_analysis_response(success: bool, message: str, data: Optional[Dict[str, Any]] = None,
+                            error: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> dict:
+    """
+    AnalysisResponse와 같은 키 구성의 dict 생성 + metadata에 단계별 시간(timings)과 processing_time 추가
+    - pydantic 검증/.dict() 변환(data 전체 재귀 복사)을 거치지 않음, 인코딩은 render_analysis에서 한 번만
+    """
+    response = {"success": success, "message": message, "data": data, "error": error, "metadata": metadata}
+    return attach_timings(response)
+
+def shape_response(response: dict, view: Optional[str] = None, fields: Optional[str] = None) -> dict:
+    """
+    응답 형태 선택 - 원본(저장/결과 조회용)은 그대로 두고 새 dict 반환
+    - full: 그대로
+    - compact: data에서 해석·감정·단계 정보만 (gpt_analysis에만 있는 해석/감정은 data로 올림), metadata.timings 제외
+      (단계별 시간은 view와 무관하게 Server-Timing 헤더로 제공되며 serialize 단계는 헤더에만 있음)
+    - fields: data 기준 점 경로 목록 (view보다 우선)
+    """
+    view = (view or RESPONSE_DEFAULT_VIEW).lower()
+    data = response.get("data")
+    if not isinstance(data, dict) or (view != "compact" and not fields):
+        return response
+    
+    if fields:
+        shaped_data = select_fields(data, parse_fields(fields))
+    else:
+        shaped_data = {key: data[key] for key in COMPACT_DATA_FIELDS if key in data}
+        gpt_result = data.get("gpt_analysis")
+        if isinstance(gpt_result, dict):
+            for key in COMPACT_GPT_FIELDS:
+                if key not in shaped_data and key in gpt_result:
+                    shaped_data[key] = gpt_result[key]
+    
+    shaped = {**response, "data": shaped_data}
+    metadata = response.get("metadata")
+    if view == "compact" and isinstance(metadata, dict) and "timings" in metadata:
+        shaped["metadata"] = {key: value for key, value in metadata.items() if key != "timings"}
+    return shaped
+
+def render_analysis(response: dict, view: Optional[str] = None, fields: Optional[str] = None) -> TimedJSONResponse:
+    """응답 형태를 적용해 바로 응답 객체로 반환 (FastAPI의 jsonable_encoder 재귀 변환 없이 한 번에 인코딩)"""
+    return TimedJSONResponse(shape_response(response, view, fields))
+
+def persist_analysis(test_type: str, response: dict, username: Optional[str] = None,
+                     stage: Optional[int] = None, image_path: Optional[str] = None) -> dict:
+    """
+    완료된 분석 결과를 저장/이력 큐에 넣고 응답을 그대로 반환 (저장은 기다리지 않음)
+    - username은 세션 토큰으로 확인한 사용자만 전달 (없으면 익명 결과로 저장, 이력 미기록)
+    """
+    if result_persistence.accepts(username) and response.get("success") and response.get("data"):
+        # 업로드 저장소 파일이면 콘텐츠 해시를 함께 기록 (이력에서 원본 이미지 참조용)
+        image_hash = upload_store.digest_for(image_path) if image_path and upload_store.owns(image_path) else None
+        result_persistence.submit(build_record(test_type, response, username, stage, image_hash))
+    return response
+
+def format_sse(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 포맷"""
+    return f"event: {event}\ndata: {dumps(data).decode('utf-8')}\n\n"
+
+def run_quest_analysis(stage: int, image_path: str, description: str) -> dict:
+    """Quest 분석 (GPT Vision 직접 분석) - 단일/배치 엔드포인트 공용"""
+    from ..services.models.gpt_analyzer import gpt_analyzer
+    
+    gpt_result = gpt_analyzer.analyze_drawing(
+        stage=stage,
+        detected_objects=[],  # Quest는 객체 탐지하지 않음
+        description=description,
+        position_dict={},
+        size_dict={},
+        image_path=image_path,  # 이미지 필수 포함
+        analysis_type="quest"
+    )
+    
+    return {
+        "stage": stage,
+        "analysis_type": "quest_gpt_vision",
+        "stage_info": get_stage_question_info(stage),
+        "user_description": description,
+        "gpt_analysis": gpt_result,
+        "detected_objects": [],  # Quest는 객체 탐지하지 않음
+        "analysis_method": "gpt_vision_with_image",
+        "has_image": True  # 항상 이미지 있음
+    }
+
+def validate_batch_item(test_type: str, stage, description: str) -> Optional[AnalysisResponse]:
+    """배치 항목 설정 검증 - 문제가 있으면 에러 응답 반환"""
+    if test_type not in ("htp", "pitr", "quest"):
+        return AnalysisResponse(
+            success=False,
+            message="test_type은 htp, pitr, quest 중 하나여야 합니다.",
+            error="INVALID_TEST_TYPE"
+        )
+    if test_type == "quest":
+        if not isinstance(stage, int) or stage < 1 or stage > 12:
+            return AnalysisResponse(
+                success=False,
+                message="Quest Stage는 1-12 범위여야 합니다.",
+                error="INVALID_STAGE",
+                metadata={"test_type": "quest", "stage": stage}
+            )
+        if not description.strip():
+            return AnalysisResponse(
+                success=False,
+                message="그림에 대한 설명이 필요합니다.",
+                error="NO_DESCRIPTION",
+                metadata={"test_type": "quest", "stage": stage}
+            )
+    return None
+
+async def stream_batch_results(prepared: list, view: Optional[str] = None, fields: Optional[str] = None):
+    """
+    배치 항목을 분석하고 완료 순서대로 NDJSON 라인 생성
+    - 클라이언트가 중간에 끊어도(시작 전 취소된 항목 포함) 모든 업로드 참조/임시 파일을 마지막에 정리
+    """
+    from ..services.models.yolov8_detector import detect_objects_batch
+    
+    def release(item: dict):
+        # 항목마다 한 번만 정리 (run_item과 바깥 finally 모두에서 호출됨)
+        if item["image_path"] and not item.get("released"):
+            item["released"] = True
+            cleanup_temp_file(item["image_path"])
+    
+    tasks = []
+    try:
+        # 1. 모델별 YOLO 배치 탐지
+        detections = {}
+        for test_type in ("htp", "pitr"):
+            targets = [item for item in prepared if item["test_type"] == test_type and item["error"] is None]
+            if not targets:
+                continue
+            batch_results = await asyncio.to_thread(
+                detect_objects_batch, [item["image_path"] for item in targets], None, test_type, 0.4
+            )
+            for item, result in zip(targets, batch_results):
+                detections[item["index"]] = result
+        
+        # 2. 항목별 분석 (GPT 호출 동시성 제한)
+        semaphore = asyncio.Semaphore(BATCH_GPT_CONCURRENCY)
+        
+        async def run_item(item: dict) -> dict:
+            if item["error"] is not None:
+                return {"index": item["index"], **item["error"].dict()}
+            
+            # 항목별 단계 시간 집계 (태스크마다 컨텍스트가 분리됨)
+            start_request_timing()
+            test_type = item["test_type"]
+            try:
+                async with semaphore:
+                    if test_type == "htp":
+                        result = await asyncio.to_thread(
+                            analyze_htp_image, item["image_path"], item["description"], None, detections.get(item["index"])
+                        )
+                    elif test_type == "pitr":
+                        result = await asyncio.to_thread(
+                            analyze_pitr, item["image_path"], item["description"], None, detections.get(item["index"])
+                        )
+                    else:
+                        result = await asyncio.to_thread(
+                            run_quest_analysis, item["stage"], item["image_path"], item["description"]
+                        )
+                
+                response = build_analysis_response(
+                    success=result.get('success', True),
+                    message=result.get('message', f'{test_type.upper()} 분석이 완료되었습니다.'),
+                    data=result,
+                    metadata=build_metadata(test_type, item["stage"] if test_type == "quest" else None)
+                )
+            except Exception as e:
+                logger.exception(f"배치 항목 {item['index']} 분석 오류: {e}")
+                response = build_analysis_response(
+                    success=False,
+                    message=f"{test_type.upper()} 분석 중 오류가 발생했습니다.",
+                    error=str(e),
+                    metadata={"test_type": test_type}
+                )
+            finally:
+                release(item)
+            
+            stage = item["stage"] if test_type == "quest" else None
+            response = persist_analysis(test_type, response, item["username"], stage, item["image_path"])
+            return {"index": item["index"], **shape_response(response, view, fields)}
+        
+        tasks = [asyncio.create_task(run_item(item)) for item in prepared]
+        for completed in asyncio.as_completed(tasks):
+            line = await completed
+            yield dumps(line) + b"\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+        # 실행 전에 취소된 태스크는 자체 finally에 도달하지 않으므로 남은 항목을 여기서 정리
+        for item in prepared:
+            release(item)
+    
+    logger.info(f"배치 분석 완료: {len(prepared)}개 항목")
+
 def get_stage_question_info(stage: int) -> dict:
     """Stage별 질문 정보 반환"""
     stage_questions = {
@@ -382,83 +832,136 @@ async def process_image_upload(image: UploadFile) -> str:
             return await process_image_file(image)
             
     except Exception as e:
-        print(f"❌ 이미지 업로드 처리 오류: {e}")
+        logger.error(f"이미지 업로드 처리 오류: {e}")
         raise e
 
 def cleanup_temp_file(file_path: str):
-    """임시 파일 정리"""
+    """임시 파일 정리 (콘텐츠 저장소 파일은 참조만 해제)"""
     try:
-        if os.path.exists(file_path):
+        if upload_store.enabled and upload_store.owns(file_path):
+            upload_store.release(file_path)
+        elif os.path.exists(file_path):
             os.unlink(file_path)
-            print(f"🗑️ 임시 파일 삭제: {file_path}")
+            logger.debug(f"임시 파일 삭제: {file_path}")
     except Exception as e:
-        print(f"⚠️ 파일 삭제 실패: {e}")
+        logger.warning(f"파일 삭제 실패: {e}")
 
 async def process_canvas_json(json_file: UploadFile) -> str:
     try:
         # JSON 읽기
-        content = await json_file.read()
+        with observe_duration("upload_read"):
+            content = await json_file.read()
         canvas_data_dict = json.loads(content.decode('utf-8'))
         canvas_data = CanvasData(**canvas_data_dict)
         
-        print(f"📋 Canvas 변환: {len(canvas_data.paths)}개 경로")
+        logger.debug(f"Canvas 변환: {len(canvas_data.paths)}개 경로")
         
         # PIL로 이미지 생성
         from PIL import Image, ImageDraw
         
-        img_width = int(canvas_data.width * canvas_data.scale)
-        img_height = int(canvas_data.height * canvas_data.scale)
-        
-        image = Image.new('RGB', (img_width, img_height), 'white')
-        draw = ImageDraw.Draw(image)
-        
-        # SVG paths 그리기
-        for path_info in canvas_data.paths:
-            path_string = path_info.get('path', '')
-            color = path_info.get('color', '#000000')
-            stroke_width = int(path_info.get('strokeWidth', 3) * canvas_data.scale)
+        with observe_duration("canvas_rasterize"):
+            width, height, scale = clamp_canvas_size(canvas_data.width, canvas_data.height, canvas_data.scale)
             
-            points = parse_svg_path(path_string, canvas_data.scale)
+            image = Image.new('RGB', (int(width * scale), int(height * scale)), 'white')
+            draw = ImageDraw.Draw(image)
             
-            if len(points) > 1:
-                for i in range(len(points) - 1):
-                    draw.line([points[i], points[i + 1]], fill=color, width=stroke_width)
+            # SVG paths 그리기
+            draw_canvas_paths(draw, canvas_data.paths, scale)
         
-        # 파일 저장
-        timestamp = int(time.time() * 1000)
-        filename = f"canvas_{timestamp}_{uuid.uuid4().hex[:8]}.png"
-        file_path = UPLOAD_DIR / filename
-        
-        image.save(file_path, 'PNG', quality=95)
-        
-        return str(file_path.resolve()).replace('\\', '/')
+        return save_rendered_canvas(image)
         
     except Exception as e:
-        print(f"Canvas 변환 오류: {e}")
+        logger.error(f"Canvas 변환 오류: {e}")
         raise e
 
+def clamp_canvas_size(width, height, scale) -> tuple:
+    """캔버스 크기/배율 제한 - 렌더링 이미지 한 변이 CANVAS_MAX_SIDE를 넘지 않도록 (클라이언트 값으로 메모리 고갈 방지)"""
+    width = min(max(int(width), 1), CANVAS_MAX_SIDE)
+    height = min(max(int(height), 1), CANVAS_MAX_SIDE)
+    scale = float(scale)
+    if not math.isfinite(scale) or scale <= 0:
+        scale = 1.0
+    scale = min(scale, CANVAS_MAX_SCALE, CANVAS_MAX_SIDE / max(width, height))
+    return width, height, scale
+
+def draw_canvas_paths(draw, paths: list, scale: float) -> Optional[tuple]:
+    """
+    SVG paths를 캔버스에 그리기
+    Returns:
+        새로 그린 영역의 bounding box (x1, y1, x2, y2) 또는 None
+    """
+    bbox = None
+    for path_info in paths:
+        path_string = path_info.get('path', '')
+        color = path_info.get('color', '#000000')
+        stroke_width = int(path_info.get('strokeWidth', 3) * scale)
+        
+        points = parse_svg_path(path_string, scale)
+        
+        if len(points) > 1:
+            for i in range(len(points) - 1):
+                draw.line([points[i], points[i + 1]], fill=color, width=stroke_width)
+            
+            xs = [x for x, _ in points]
+            ys = [y for _, y in points]
+            pad = stroke_width // 2 + 1
+            box = (min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad)
+            bbox = box if bbox is None else (
+                min(bbox[0], box[0]), min(bbox[1], box[1]),
+                max(bbox[2], box[2]), max(bbox[3], box[3])
+            )
+    
+    return bbox
+
+def save_rendered_canvas(image) -> str:
+    """렌더링된 캔버스 이미지를 PNG로 저장하고 경로 반환"""
+    # 콘텐츠 저장소 사용 시 PNG 바이트 해시로 중복 제거
+    if upload_store.enabled:
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG', quality=95)
+        _, file_path, written = upload_store.put(buffer.getvalue(), '.png')
+        record_cache("upload_store", not written)
+        return str(file_path).replace('\\', '/')
+    
+    timestamp = int(time.time() * 1000)
+    filename = f"canvas_{timestamp}_{uuid.uuid4().hex[:8]}.png"
+    file_path = UPLOAD_DIR / filename
+    
+    image.save(file_path, 'PNG', quality=95)
+    
+    return str(file_path.resolve()).replace('\\', '/')
+
 async def process_image_file(image: UploadFile) -> str:
     """일반 이미지 파일 저장"""
     try:
         # 파일 확장자 확인
         file_extension = Path(image.filename).suffix.lower() or '.png'
         
+        with observe_duration("upload_read"):
+            content = await image.read()
+        
+        # 콘텐츠 저장소 사용 시 해시 기반 저장 (동일 바이트는 다시 쓰지 않음)
+        if upload_store.enabled:
+            digest, file_path, written = upload_store.put(content, file_extension)
+            record_cache("upload_store", not written)
+            logger.debug(f"이미지 저장: {digest[:12]} ({len(content)} bytes, {'신규' if written else '중복'})")
+            return str(file_path).replace('\\', '/')
+        
         # 파일 저장
         timestamp = int(time.time() * 1000)
         filename = f"img_{timestamp}_{uuid.uuid4().hex[:8]}{file_extension}"
         file_path = UPLOAD_DIR / filename
         
         # 파일 쓰기
-        content = await image.read()
         with file_path.open("wb") as f:
             f.write(content)
         
-        print(f"📁 이미지 저장: {file_path} ({len(content)} bytes)")
+        logger.debug(f"이미지 저장: {file_path} ({len(content)} bytes)")
         
         return str(file_path.resolve()).replace('\\', '/')
         
     except Exception as e:
-        print(f"❌ 이미지 저장 오류: {e}")
+        logger.error(f"이미지 저장 오류: {e}")
         raise e
 
 def parse_svg_path(path_string: str, scale: float = 1.0) -> list:
@@ -477,6 +980,6 @@ def parse_svg_path(path_string: str, scale: float = 1.0) -> list:
                 continue
                 
     except Exception as e:
-        print(f"⚠️ SVG 파싱 오류: {e}")
+        logger.warning(f"SVG 파싱 오류: {e}")
     
     return points
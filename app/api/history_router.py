@@ -0,0 +1,73 @@
+# app/api/history_router.py - 사용자별 분석 이력 조회
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..core.auth import require_user
+from ..core.config import HISTORY_ENABLED, HISTORY_THERAPIST_USERS
+from ..services.history_store import history_store
+from ..services.portfolio import portfolio_summarizer
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def require_history_access(username: str, user: str):
+    """
+    세션 토큰의 사용자 본인 또는 치료사 계정(HISTORY_THERAPIST_USERS)만 허용
+    - 치료사의 타인 이력 조회는 감사용으로 로그에 남김
+    """
+    if username == user:
+        return
+    if user not in HISTORY_THERAPIST_USERS:
+        raise HTTPException(status_code=403, detail="본인 또는 담당 치료사만 분석 이력을 조회할 수 있습니다.")
+    logger.info("치료사 이력 조회: %s → %s", user, username)
+
+
+@router.get("/history/{username}")
+async def get_user_history(
+    username: str,
+    recent: int = Query(0, ge=0, le=200, description="함께 반환할 최근 이력 개수 (0이면 생략)"),
+    user: str = Depends(require_user)
+):
+    """
+    사용자별 감정 추이 조회 (Authorization: Bearer 세션 토큰, 본인 또는 치료사)
+    - 감정별 횟수, 스트레스 EWMA/최근 점수/추세, 검사 유형·회기별 최신 결과
+    - 집계는 기록 시점에 갱신되므로 이력 길이와 무관하게 응답
+    """
+    if not HISTORY_ENABLED:
+        raise HTTPException(status_code=404, detail="분석 이력 기능이 비활성화되어 있습니다.")
+    require_history_access(username, user)
+
+    summary = await asyncio.to_thread(history_store.get_summary, username)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="해당 사용자의 분석 이력이 없습니다.")
+    if recent:
+        summary["recent"] = await asyncio.to_thread(history_store.get_recent, username, recent)
+    return summary
+
+
+@router.get("/history/{username}/portfolio")
+async def get_portfolio_summary(
+    username: str,
+    thumbnails: bool = Query(False, description="업로드 저장소의 그림을 low detail 썸네일로 함께 전송"),
+    refresh: bool = Query(False, description="캐시를 무시하고 다시 생성 (PORTFOLIO_REFRESH_INTERVAL에 한 번까지)"),
+    user: str = Depends(require_user)
+):
+    """
+    회기 포트폴리오 종합 요약 (GPT 1회 호출, Authorization: Bearer 세션 토큰, 본인 또는 치료사)
+    - 회기별 최신 결과의 소견/감정/해석 요약으로 하나의 프롬프트 구성
+    - 새 회기가 추가되기 전까지는 캐시된 요약 반환
+    """
+    if not HISTORY_ENABLED:
+        raise HTTPException(status_code=404, detail="분석 이력 기능이 비활성화되어 있습니다.")
+    require_history_access(username, user)
+
+    try:
+        summary = await portfolio_summarizer.get_summary(username, thumbnails, refresh)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"포트폴리오 요약 생성 실패: {str(e)}")
+    if summary is None:
+        raise HTTPException(status_code=404, detail="해당 사용자의 분석 이력이 없습니다.")
+    return {"username": username, **summary}
@@ -0,0 +1,225 @@
+# app/api/live_router.py - 실시간 드로잉 피드백 WebSocket
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from PIL import Image, ImageDraw
+
+from .analyze_router import (
+    build_analysis_response,
+    build_metadata,
+    clamp_canvas_size,
+    cleanup_temp_file,
+    draw_canvas_paths,
+    persist_analysis,
+    run_quest_analysis,
+    save_rendered_canvas,
+)
+from ..core.auth import verify_token
+from ..core.config import LIVE_DETECT_MIN_INTERVAL, LIVE_DETECT_MIN_CHANGE
+from ..core.serialization import dumps
+from ..services.analyzers.quest_analyzer import precheck_quest_image
+from ..services.image_check import check_required_objects
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class LiveDrawingSession:
+    """
+    WebSocket 연결별 드로잉 세션
+    - 새로 들어온 stroke만 래스터에 누적해서 그림
+    - 마지막 탐지 이후 변경된 영역(dirty box)을 추적해 탐지 여부 결정
+    - 캔버스 크기/배율은 clamp_canvas_size로 제한
+    """
+
+    def __init__(self, stage: int, width: int, height: int, scale: float, username: Optional[str] = None):
+        width, height, scale = clamp_canvas_size(width, height, scale)
+        self.stage = stage
+        self.username = username
+        self.scale = scale
+        self.width = int(width * scale)
+        self.height = int(height * scale)
+        self.image = Image.new('RGB', (self.width, self.height), 'white')
+        self.draw = ImageDraw.Draw(self.image)
+        self.stroke_count = 0
+        self.dirty_box: Optional[tuple] = None
+        self.last_detection_at = 0.0
+        self.last_status: Optional[dict] = None
+
+    def apply_strokes(self, paths: list):
+        """새 stroke를 래스터에 그리고 변경 영역 갱신"""
+        box = draw_canvas_paths(self.draw, paths, self.scale)
+        self.stroke_count += len(paths)
+        if box is None:
+            return
+        if self.dirty_box is None:
+            self.dirty_box = box
+        else:
+            self.dirty_box = (
+                min(self.dirty_box[0], box[0]), min(self.dirty_box[1], box[1]),
+                max(self.dirty_box[2], box[2]), max(self.dirty_box[3], box[3])
+            )
+
+    def clear(self):
+        self.image = Image.new('RGB', (self.width, self.height), 'white')
+        self.draw = ImageDraw.Draw(self.image)
+        self.stroke_count = 0
+        self.dirty_box = (0, 0, self.width, self.height)
+
+    def dirty_ratio(self) -> float:
+        """마지막 탐지 이후 변경된 영역의 캔버스 대비 비율"""
+        if self.dirty_box is None:
+            return 0.0
+        x1, y1, x2, y2 = self.dirty_box
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(self.width, x2), min(self.height, y2)
+        area = max(0, x2 - x1) * max(0, y2 - y1)
+        return area / float(self.width * self.height)
+
+    def needs_detection(self) -> bool:
+        return self.dirty_ratio() >= LIVE_DETECT_MIN_CHANGE
+
+    def detection_delay(self, now: float) -> float:
+        """스로틀 간격상 다음 탐지까지 남은 시간 (초)"""
+        return max(0.0, self.last_detection_at + LIVE_DETECT_MIN_INTERVAL - now)
+
+    def take_snapshot(self, now: float) -> Image.Image:
+        """탐지용 래스터 복사본 (탐지 중에도 계속 그릴 수 있도록)"""
+        self.dirty_box = None
+        self.last_detection_at = now
+        return self.image.copy()
+
+
+@router.websocket("/ws/quest/{stage}")
+async def live_drawing_feedback(websocket: WebSocket, stage: int, width: int = 400, height: int = 300, scale: float = 2.0,
+                                token: Optional[str] = None):
+    """
+    실시간 드로잉 피드백 WebSocket
+    - 제출 결과를 이력에 남기려면 ?token=<세션 토큰> (브라우저 WebSocket은 Authorization 헤더를 보낼 수 없음)
+
+    클라이언트 → 서버:
+    - {"type": "strokes", "paths": [{"path": "...", "color": "#000", "strokeWidth": 3}, ...]}
+    - {"type": "clear"}
+    - {"type": "submit", "description": "..."}  → 최종 제출 시에만 GPT 분석
+
+    서버 → 클라이언트:
+    - {"type": "ready", ...}, {"type": "status", ...}, {"type": "result", ...}, {"type": "error", ...}
+    - 형식이 잘못된 메시지는 연결을 끊지 않고 {"type": "error", "error": "INVALID_MESSAGE"}로 응답
+    """
+    await websocket.accept()
+
+    if stage < 1 or stage > 12:
+        await websocket.send_json({"type": "error", "error": "INVALID_STAGE", "message": "Quest Stage는 1-12 범위여야 합니다."})
+        await websocket.close()
+        return
+
+    username = verify_token(token) if token else None
+    if token and username is None:
+        await websocket.send_json({"type": "error", "error": "INVALID_TOKEN", "message": "세션 토큰이 올바르지 않거나 만료되었습니다."})
+        await websocket.close(code=1008)
+        return
+
+    session = LiveDrawingSession(stage, width, height, scale, username)
+    send_lock = asyncio.Lock()
+    detection_task: Optional[asyncio.Task] = None
+
+    async def send(message: dict):
+        async with send_lock:
+            await websocket.send_text(dumps(message).decode("utf-8"))
+
+    async def run_detection():
+        snapshot = session.take_snapshot(time.monotonic())
+        status = await asyncio.to_thread(precheck_quest_image, snapshot, stage)
+        if status is None:
+            await send({"type": "status", "stage": stage, "available": False, "message": "객체 탐지 모델을 사용할 수 없습니다."})
+            return
+        session.last_status = status
+        await send({"type": "status", "stage": stage, "available": True, "stroke_count": session.stroke_count, **status})
+
+    async def detection_loop():
+        # 변경 영역이 충분한 동안 스로틀 간격을 지키며 탐지 반복
+        # (간격 안에 들어온 마지막 stroke도 간격이 지나면 반영 - trailing edge)
+        while session.needs_detection():
+            delay = session.detection_delay(time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            await run_detection()
+
+    def schedule_detection():
+        nonlocal detection_task
+        # 진행 중인 루프가 있으면 다음 반복에서 새 변경 영역을 확인함
+        if (detection_task is None or detection_task.done()) and session.needs_detection():
+            detection_task = asyncio.create_task(detection_loop())
+
+    logger.info(f"실시간 드로잉 세션 시작 (Stage {stage})")
+    await send({
+        "type": "ready",
+        "stage": stage,
+        **check_required_objects([], stage)
+    })
+
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+                message_type = message.get("type")
+
+                if message_type == "strokes":
+                    session.apply_strokes(message.get("paths", []))
+                elif message_type == "clear":
+                    session.clear()
+                elif message_type == "submit":
+                    if detection_task and not detection_task.done():
+                        detection_task.cancel()
+                    await send(await submit_session(session, message.get("description", "")))
+                    continue
+                else:
+                    await send({"type": "error", "error": "UNKNOWN_MESSAGE", "message": f"알 수 없는 메시지 유형: {message_type}"})
+                    continue
+            except (ValueError, TypeError, AttributeError, KeyError) as e:
+                # JSON이 아니거나(바이너리 프레임 포함) 객체가 아닌 메시지, 잘못된 paths 형식
+                await send({"type": "error", "error": "INVALID_MESSAGE", "message": f"메시지 형식이 올바르지 않습니다: {e}"})
+                continue
+
+            # 변경 영역이 충분하면 탐지 (스로틀 간격 안이면 간격이 지난 뒤 실행)
+            schedule_detection()
+
+    except WebSocketDisconnect:
+        logger.info(f"실시간 드로잉 세션 종료 (Stage {stage}, {session.stroke_count}개 stroke)")
+    finally:
+        if detection_task and not detection_task.done():
+            detection_task.cancel()
+
+
+async def submit_session(session: LiveDrawingSession, description: str) -> dict:
+    """최종 제출 - 래스터를 저장하고 Quest GPT 분석 수행"""
+    if not description or not description.strip():
+        return {"type": "error", "error": "NO_DESCRIPTION", "message": "그림에 대한 설명이 필요합니다."}
+
+    image_path = await asyncio.to_thread(save_rendered_canvas, session.image.copy())
+    try:
+        result = await asyncio.to_thread(run_quest_analysis, session.stage, image_path, description)
+        if session.last_status is not None:
+            result["required_objects"] = session.last_status
+        response = build_analysis_response(
+            success=True,
+            message=f'Quest Stage {session.stage} 분석이 완료되었습니다.',
+            data=result,
+            metadata=build_metadata("quest", session.stage)
+        )
+    except Exception as e:
+        logger.exception(f"실시간 세션 제출 오류: {e}")
+        response = build_analysis_response(
+            success=False,
+            message=f"Quest Stage {session.stage} 분석 중 오류가 발생했습니다.",
+            error=str(e),
+            metadata={"test_type": "quest", "stage": session.stage}
+        )
+    finally:
+        cleanup_temp_file(image_path)
+
+    return {"type": "result", **persist_analysis("quest", response, session.username, session.stage, image_path)}
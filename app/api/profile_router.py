@@ -0,0 +1,48 @@
+# app/api/profile_router.py - 요청 단위 프로파일 결과 조회 (관리자 전용)
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from ..core.profiling import request_profiler
+
+router = APIRouter()
+
+_MEDIA_TYPES = {"sample": "text/plain; charset=utf-8", "cprofile": "application/octet-stream"}
+
+
+def require_profile_token(header_token: Optional[str], query_token: Optional[str]):
+    """PROFILE_TOKEN 미설정 시 404, 토큰 불일치 시 403"""
+    if not request_profiler.token:
+        raise HTTPException(status_code=404, detail="프로파일링이 비활성화되어 있습니다.")
+    if not request_profiler.check_token(header_token or query_token):
+        raise HTTPException(status_code=403, detail="프로파일 토큰이 올바르지 않습니다.")
+
+
+@router.get("/profiles")
+async def list_profiles(
+    x_profile: Optional[str] = Header(None),
+    token: Optional[str] = Query(None, description="PROFILE_TOKEN (X-Profile 헤더 대신 사용)")
+):
+    """저장된 프로파일 목록 (최근 순) 및 프로파일러 상태"""
+    require_profile_token(x_profile, token)
+    return {**request_profiler.stats(), "profiles": request_profiler.store.list()}
+
+
+@router.get("/profiles/{request_id}")
+async def get_profile(
+    request_id: str,
+    x_profile: Optional[str] = Header(None),
+    token: Optional[str] = Query(None, description="PROFILE_TOKEN (X-Profile 헤더 대신 사용)")
+):
+    """
+    요청 ID(X-Request-ID / X-Profile-Id)로 프로파일 파일 다운로드
+    - sample: collapsed stack (.folded) → flamegraph.pl, speedscope
+    - cprofile: pstats (.prof) → python -m pstats, snakeviz
+    """
+    require_profile_token(x_profile, token)
+    found = request_profiler.store.get(request_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="해당 요청의 프로파일이 없습니다.")
+    path, entry = found
+    return FileResponse(path, media_type=_MEDIA_TYPES.get(entry["mode"]), filename=path.name)
@@ -1,14 +1,42 @@
 # app/api/user_router.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional
-import httpx
 import asyncio
 
+from ..core.auth import issue_token, require_admin
+from ..core.config import GAME_CLEAR_WRITE_BEHIND, SESSION_TTL
+from ..services.db_resilience import resilient_db, UpstreamUnavailable
+from ..services.game_clear_queue import game_clear_queue
+from ..services.health_prober import health_prober
+
 router = APIRouter()
 
-# DB 서버 URL
-DB_SERVER_URL = "http://34.63.32.189:8000"
+
+async def proxy_db_request(route: str, path: str, payload: dict, fail_detail: str):
+    """
+    DB 서버로 POST 요청 전달 (라우트 정책에 따른 재시도/타임아웃/서킷 브레이커 적용)
+    - 업스트림 오류 응답은 상태 코드와 detail을 그대로 전달
+    - DB 서버 사용 불가 시 503 (+ Retry-After)
+    """
+    try:
+        response = await resilient_db.request(route, "POST", path, json=payload)
+    except UpstreamUnavailable as e:
+        headers = {"Retry-After": str(int(e.retry_after) + 1)} if e.retry_after is not None else None
+        raise HTTPException(status_code=503, detail="DB 서버에 연결할 수 없습니다.", headers=headers)
+
+    try:
+        body = response.json() if response.content else None
+    except ValueError:
+        body = None
+
+    if response.status_code == 200:
+        if body is None:
+            raise HTTPException(status_code=502, detail="DB 서버 응답을 해석할 수 없습니다.")
+        return body
+    detail = body.get("detail", fail_detail) if isinstance(body, dict) else fail_detail
+    raise HTTPException(status_code=response.status_code, detail=detail)
+
 
 # 요청 데이터 모델
 class UserCreate(BaseModel):
@@ -26,79 +54,60 @@ class GameClearData(BaseModel):
 
 @router.post("/signup")
 async def signup(user: UserCreate):
-    """회원가입 API - DB 서버로 요청 전달"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{DB_SERVER_URL}/signup",
-                json=user.dict(),
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.content else {"detail": "Unknown error"}
-                raise HTTPException(status_code=response.status_code, detail=error_data.get("detail", "회원가입 실패"))
-                
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=503, detail="DB 서버에 연결할 수 없습니다.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
+    """회원가입 API - DB 서버로 요청 전달 (중복 생성 방지를 위해 재시도 없음)"""
+    return await proxy_db_request("signup", "/signup", user.dict(), "회원가입 실패")
 
 @router.post("/login")
 async def login(user: UserLogin):
-    """로그인 API - DB 서버로 요청 전달"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{DB_SERVER_URL}/login",
-                json=user.dict(),
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.content else {"detail": "Unknown error"}
-                raise HTTPException(status_code=response.status_code, detail=error_data.get("detail", "로그인 실패"))
-                
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=503, detail="DB 서버에 연결할 수 없습니다.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
+    """
+    로그인 API - DB 서버로 요청 전달
+    - 성공 시 분석 이력 연결용 세션 토큰 발급 (Authorization: Bearer <session_token>)
+    """
+    body = await proxy_db_request("login", "/login", user.dict(), "로그인 실패")
+    if not isinstance(body, dict):
+        return body
+    return {**body, "session_token": issue_token(user.username), "token_type": "bearer", "expires_in": SESSION_TTL}
 
 @router.post("/game/clear")
 async def save_game_clear(data: GameClearData):
-    """게임 클리어 결과 저장 API - DB 서버로 요청 전달"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{DB_SERVER_URL}/game/clear",
-                json=data.dict(),
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.content else {"detail": "Unknown error"}
-                raise HTTPException(status_code=response.status_code, detail=error_data.get("detail", "게임 결과 저장 실패"))
-                
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=503, detail="DB 서버에 연결할 수 없습니다.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
+    """
+    게임 클리어 결과 저장 API - DB 서버로 요청 전달
+    GAME_CLEAR_WRITE_BEHIND 사용 시 로컬 큐에 기록 후 즉시 응답 (DB 서버 전송은 백그라운드)
+    """
+    if GAME_CLEAR_WRITE_BEHIND:
+        try:
+            queue_id = await asyncio.to_thread(game_clear_queue.enqueue, data.dict())
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"게임 결과 임시 저장 실패: {str(e)}")
+        return {"status": "queued", "queue_id": queue_id, "message": "게임 결과가 접수되었습니다."}
+    
+    return await proxy_db_request("game_clear", "/game/clear", data.dict(), "게임 결과 저장 실패")
 
 @router.get("/health/db")
-async def check_db_health():
-    """DB 서버 연결 상태 확인"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{DB_SERVER_URL}/", timeout=5.0)
-            if response.status_code == 200:
-                return {"status": "healthy", "db_server": "connected"}
-            else:
-                return {"status": "unhealthy", "db_server": "error", "code": response.status_code}
-    except Exception as e:
-        return {"status": "unhealthy", "db_server": "disconnected", "error": str(e)}
+async def check_db_health(fresh: bool = Query(False, description="캐시 대신 즉시 점검")):
+    """DB 서버 연결 상태 확인 (백그라운드 프로버 캐시, fresh=1이면 즉시 점검)"""
+    if fresh:
+        return await health_prober.probe("db")
+    return health_prober.snapshot("db")
+
+@router.get("/health/deps")
+async def check_dependencies_health(fresh: bool = Query(False, description="캐시 대신 즉시 점검")):
+    """DB 서버, OpenAI, YOLO 모델 준비 상태 (백그라운드 프로버 캐시)"""
+    if fresh:
+        await health_prober.probe_all()
+    checks = health_prober.snapshot_all()
+    healthy = all(check["status"] in ("healthy", "disabled") for check in checks.values())
+    return {"status": "healthy" if healthy else "unhealthy", "checks": checks}
+
+@router.get("/game/clear/queue", dependencies=[Depends(require_admin)])
+async def get_game_clear_queue_status():
+    """게임 클리어 write-behind 큐 상태 (대기 건수, 가장 오래된 대기 시간 등, 관리자 토큰 필요)"""
+    if not GAME_CLEAR_WRITE_BEHIND:
+        return {"enabled": False}
+    stats = await asyncio.to_thread(game_clear_queue.stats)
+    return {"enabled": True, **stats}
+
+@router.get("/upstream/stats", dependencies=[Depends(require_admin)])
+async def get_upstream_stats():
+    """DB 서버 호출 통계 (라우트별 지연 히스토그램, 재시도/헤징 횟수, 서킷 브레이커 상태, 관리자 토큰 필요)"""
+    return resilient_db.snapshot()
@@ -0,0 +1,97 @@
+# app/core/auth.py
+"""
+로그인 세션 토큰 (분석 이력 사용자 식별)
+- /login 성공 시 HMAC 서명 토큰 발급: base64url("username:만료시각") + "." + 서명
+- 이력 기록/조회는 Authorization: Bearer 토큰으로 확인한 사용자로만 (요청의 username 값은 믿지 않음)
+- SESSION_SECRET 미설정 시 프로세스마다 임의 키 사용 (재시작하면 토큰 무효, 워커 간 공유 안 됨)
+- 내부 상태 조회 엔드포인트는 별도 관리자 토큰(ADMIN_TOKEN)으로 보호
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from typing import Optional
+
+from fastapi import Header, HTTPException, Query
+
+from .config import ADMIN_TOKEN, SESSION_SECRET, SESSION_TTL
+
+logger = logging.getLogger(__name__)
+
+if SESSION_SECRET:
+    _SECRET = SESSION_SECRET.encode("utf-8")
+else:
+    _SECRET = secrets.token_bytes(32)
+    logger.warning("SESSION_SECRET 미설정 - 임의 키 사용 (재시작 시 세션 토큰 무효)")
+
+
+def _sign(payload: bytes) -> str:
+    return base64.urlsafe_b64encode(hmac.new(_SECRET, payload, hashlib.sha256).digest()).rstrip(b"=").decode("ascii")
+
+
+def issue_token(username: str, ttl: int = SESSION_TTL) -> str:
+    """사용자 세션 토큰 발급"""
+    payload = f"{username}:{int(time.time()) + ttl}".encode("utf-8")
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode("ascii") + "." + _sign(payload)
+
+
+def verify_token(token: Optional[str]) -> Optional[str]:
+    """서명/만료 확인 후 사용자 이름 반환 (유효하지 않으면 None)"""
+    if not token or "." not in token:
+        return None
+    encoded, signature = token.rsplit(".", 1)
+    try:
+        payload = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    except ValueError:
+        return None
+    if not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    username, _, expires = payload.decode("utf-8", "replace").rpartition(":")
+    if not username or not expires.isdigit() or int(expires) < time.time():
+        return None
+    return username
+
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else None
+
+
+async def current_user(authorization: Optional[str] = Header(None)) -> Optional[str]:
+    """토큰이 없으면 None (익명 분석, 이력 미기록), 잘못되거나 만료된 토큰이면 401"""
+    if authorization is None:
+        return None
+    username = verify_token(bearer_token(authorization))
+    if username is None:
+        raise HTTPException(status_code=401, detail="세션 토큰이 올바르지 않거나 만료되었습니다.",
+                            headers={"WWW-Authenticate": "Bearer"})
+    return username
+
+
+async def require_user(authorization: Optional[str] = Header(None)) -> str:
+    """로그인 필수 엔드포인트용 (토큰이 없어도 401)"""
+    username = await current_user(authorization)
+    if username is None:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다.", headers={"WWW-Authenticate": "Bearer"})
+    return username
+
+
+def check_admin_token(value: Optional[str]) -> None:
+    """ADMIN_TOKEN 미설정 시 404, 토큰 불일치 시 403 (프로파일 조회와 같은 규칙)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="관리자 조회가 비활성화되어 있습니다.")
+    if value is None or not hmac.compare_digest(value.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+
+
+async def require_admin(
+    x_admin_token: Optional[str] = Header(None),
+    token: Optional[str] = Query(None, description="ADMIN_TOKEN (X-Admin-Token 헤더 대신 사용)")
+) -> None:
+    """내부 상태 조회 엔드포인트용 의존성"""
+    check_admin_token(x_admin_token or token)
@@ -0,0 +1,104 @@
+# app/core/compression.py
+"""
+큰 JSON 응답 gzip 압축 (순수 ASGI 미들웨어)
+- Accept-Encoding이 gzip을 허용하고(q값 해석, gzip;q=0은 거부) 본문이 RESPONSE_GZIP_MIN_SIZE 이상인
+  단일 본문 JSON 응답만 압축
+- 스트리밍 응답(배치 NDJSON, SSE)은 줄 단위 전달이 늦어지지 않도록 그대로 전달
+- 압축 시간은 serialize 단계(response_compress)로 기록
+"""
+
+import gzip
+
+from .config import RESPONSE_GZIP_MIN_SIZE, RESPONSE_GZIP_LEVEL
+from .metrics import observe_duration
+
+ACCEPT_ENCODING_HEADER = b"accept-encoding"
+_COMPRESSIBLE_TYPES = (b"application/json",)
+
+
+_GZIP_CODINGS = (b"gzip", b"x-gzip")
+
+
+def _qvalue(params: bytes) -> float:
+    """";q=0.5" 형식 파라미터의 q값 (없으면 1, 해석할 수 없으면 0)"""
+    for param in params.split(b";"):
+        name, _, value = param.partition(b"=")
+        if name.strip().lower() == b"q":
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def _accepts_gzip(scope) -> bool:
+    """
+    Accept-Encoding 해석 (같은 헤더가 여러 번 오면 모두 합침)
+    - gzip이 명시되면 그 q값, 없으면 "*"의 q값으로 판단 (q=0이면 거부)
+    """
+    gzip_q = any_q = None
+    for key, value in scope["headers"]:
+        if key != ACCEPT_ENCODING_HEADER:
+            continue
+        for item in value.split(b","):
+            coding, _, params = item.partition(b";")
+            coding = coding.strip().lower()
+            if coding in _GZIP_CODINGS:
+                q = _qvalue(params)
+                gzip_q = q if gzip_q is None else max(gzip_q, q)
+            elif coding == b"*":
+                any_q = _qvalue(params)
+    q = gzip_q if gzip_q is not None else any_q
+    return q is not None and q > 0
+
+
+class GZipMiddleware:
+    """단일 본문 JSON 응답 gzip 압축 (RESPONSE_GZIP_MIN_SIZE=0이면 비활성)"""
+
+    def __init__(self, app, minimum_size: int = RESPONSE_GZIP_MIN_SIZE, level: int = RESPONSE_GZIP_LEVEL):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.minimum_size <= 0 or not _accepts_gzip(scope):
+            return await self.app(scope, receive, send)
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if self._compressible(message.get("headers", [])):
+                    # 본문 크기를 알 때까지 응답 시작을 보류
+                    start = message
+                    return
+            elif start is not None and message["type"] == "http.response.body":
+                pending, start = start, None
+                body = message.get("body", b"")
+                if message.get("more_body", False) or len(body) < self.minimum_size:
+                    await send(pending)
+                    return await send(message)
+                with observe_duration("response_compress"):
+                    body = gzip.compress(body, self.level, mtime=0)
+                headers = [(k, v) for k, v in pending.get("headers", []) if k != b"content-length"]
+                headers += [
+                    (b"content-encoding", b"gzip"),
+                    (b"content-length", b"%d" % len(body)),
+                    (b"vary", b"Accept-Encoding"),
+                ]
+                await send({**pending, "headers": headers})
+                return await send({**message, "body": body})
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(headers) -> bool:
+        content_type = content_encoding = None
+        for key, value in headers:
+            if key == b"content-type":
+                content_type = value
+            elif key == b"content-encoding":
+                content_encoding = value
+        return content_encoding is None and content_type is not None and content_type.startswith(_COMPRESSIBLE_TYPES)
@@ -18,6 +18,9 @@ YOLO_MODELS = {
     "pitr": WEIGHTS_DIR / "pitr_yolov8.pt",     # Person-in-the-Rain 분석 (파일명 수정)
 }
 
+# YOLO 추론 입력 크기 (변경 전 tools/golden_runner.py로 정확도/지연 비교 권장)
+YOLO_IMGSZ = int(os.getenv("YOLO_IMGSZ", "512"))
+
 # 튜토리얼 분석에서 필수로 포함되어야 할 객체 이름
 # names: ["rain", "umbrella", "person", "lightning", "cloud", "puddle"] # class names
 TUTORIAL_REQUIRED_OBJECTS = {
@@ -91,10 +94,155 @@ HTP_REQUIRED_CLASSES = [15, 29, 0]  # 나무전체, 사람전체, 집전체
 # 허용 이미지 확장자
 ALLOWED_EXTENSIONS = {".png", ".jpg", ".jpeg"}
 
+# 업로드 콘텐츠 주소 저장소 (SHA-256 해시 기반 중복 제거)
+UPLOAD_STORE_ENABLED = os.getenv("UPLOAD_STORE_ENABLED", "false").lower() == "true"
+UPLOAD_STORE_DIR = Path(os.getenv("UPLOAD_STORE_DIR", str(BASE_DIR / "uploads" / "store")))
+UPLOAD_STORE_RETAIN = os.getenv("UPLOAD_STORE_RETAIN", "true").lower() == "true"  # false면 참조 0일 때 삭제
+UPLOAD_STORE_ORPHAN_TTL = float(os.getenv("UPLOAD_STORE_ORPHAN_TTL", "3600"))  # 시작 시 이보다 오래된 임시/미참조 파일 삭제 (초)
+DETECTION_CACHE_SIZE = int(os.getenv("DETECTION_CACHE_SIZE", "64"))  # 콘텐츠 해시 기반 탐지 결과 캐시 크기 (0이면 비활성)
+
 # API 키 (환경변수로 설정 권장)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "your-key-here")
+# OpenAI 호환 엔드포인트 (예: 부하 테스트용 tools/fake_openai_server.py → http://127.0.0.1:9100/v1)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
 
 # GPT 설정
 GPT_MODEL = os.getenv("GPT_MODEL", "gpt-4o")
 GPT_MAX_TOKENS = 1000
 GPT_TEMPERATURE = 0.7
+
+# 배치 분석 설정 (/api/analyze/batch)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "24"))
+BATCH_GPT_CONCURRENCY = int(os.getenv("BATCH_GPT_CONCURRENCY", "4"))  # 동시 GPT 호출 수 제한
+
+# 캔버스 렌더링 크기 제한 (Canvas JSON 업로드, 실시간 드로잉 공용)
+CANVAS_MAX_SIDE = int(os.getenv("CANVAS_MAX_SIDE", "4096"))  # 렌더링 이미지 한 변 최대 픽셀
+CANVAS_MAX_SCALE = float(os.getenv("CANVAS_MAX_SCALE", "4.0"))
+
+# 실시간 드로잉 피드백 설정 (WebSocket)
+LIVE_DETECT_MIN_INTERVAL = float(os.getenv("LIVE_DETECT_MIN_INTERVAL", "1.0"))  # 탐지 최소 간격 (초)
+LIVE_DETECT_MIN_CHANGE = float(os.getenv("LIVE_DETECT_MIN_CHANGE", "0.02"))  # 탐지를 유발하는 변경 영역 비율
+
+# Quest 필수 객체 사전 검사 (GPT 호출 전 빠른 반려)
+QUEST_PRECHECK_DEFAULT = os.getenv("QUEST_PRECHECK_DEFAULT", "false").lower() == "true"
+
+# 지연 GPT 해석 (즉시 구조적 결과 → 비동기 GPT 보강)
+DEFERRED_RESULT_TTL = int(os.getenv("DEFERRED_RESULT_TTL", "600"))  # 결과 보관 시간 (초)
+DEFERRED_RESULT_MAX_ENTRIES = int(os.getenv("DEFERRED_RESULT_MAX_ENTRIES", "1000"))
+DEFERRED_SSE_TIMEOUT = float(os.getenv("DEFERRED_SSE_TIMEOUT", "60"))  # SSE 대기 최대 시간 (초)
+
+# YOLO 탐지와 GPT Vision 호출 병렬 실행 (투기적 실행)
+GPT_OVERLAP_DEFAULT = os.getenv("GPT_OVERLAP_DEFAULT", "false").lower() == "true"
+GPT_OVERLAP_WORKERS = int(os.getenv("GPT_OVERLAP_WORKERS", "8"))
+
+# DB 서버 프록시 설정 (user_router)
+DB_SERVER_URL = os.getenv("DB_SERVER_URL", "http://34.63.32.189:8000")
+# 여러 업스트림 사용 시 쉼표로 구분 (미설정 시 DB_SERVER_URL 하나)
+DB_SERVER_URLS = [u.strip() for u in os.getenv("DB_SERVER_URLS", DB_SERVER_URL).split(",") if u.strip()]
+# 읽기 전용 라우트(로그인 등)를 보낼 복제본 (미설정 시 DB_SERVER_URLS 사용)
+DB_REPLICA_URLS = [u.strip() for u in os.getenv("DB_REPLICA_URLS", "").split(",") if u.strip()]
+DB_LB_EWMA_ALPHA = float(os.getenv("DB_LB_EWMA_ALPHA", "0.3"))  # 지연 EWMA 가중치
+DB_EJECT_FAILURES = int(os.getenv("DB_EJECT_FAILURES", "3"))  # 연속 실패 시 일시 제외
+DB_EJECT_DURATION = float(os.getenv("DB_EJECT_DURATION", "30"))  # 제외 유지 시간 (초)
+DB_HTTP_MAX_CONNECTIONS = int(os.getenv("DB_HTTP_MAX_CONNECTIONS", "100"))
+DB_HTTP_MAX_KEEPALIVE = int(os.getenv("DB_HTTP_MAX_KEEPALIVE", "20"))
+DB_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("DB_HTTP_KEEPALIVE_EXPIRY", "30"))  # 유휴 연결 유지 시간 (초)
+DB_HTTP2 = os.getenv("DB_HTTP2", "auto").lower()  # auto: h2 패키지가 있으면 HTTP/2 사용
+
+# 게임 클리어 결과 write-behind 큐 (로컬 SQLite WAL에 먼저 기록 후 DB 서버로 일괄 전송)
+DATA_DIR = Path(os.getenv("DATA_DIR", str(BASE_DIR / "data")))
+GAME_CLEAR_WRITE_BEHIND = os.getenv("GAME_CLEAR_WRITE_BEHIND", "false").lower() == "true"
+GAME_CLEAR_QUEUE_PATH = Path(os.getenv("GAME_CLEAR_QUEUE_PATH", str(DATA_DIR / "game_clear_queue.db")))
+GAME_CLEAR_FLUSH_INTERVAL = float(os.getenv("GAME_CLEAR_FLUSH_INTERVAL", "1.0"))  # 초
+GAME_CLEAR_BATCH_SIZE = int(os.getenv("GAME_CLEAR_BATCH_SIZE", "50"))
+GAME_CLEAR_RETRY_BASE = float(os.getenv("GAME_CLEAR_RETRY_BASE", "1.0"))  # 재시도 백오프 기준 (초)
+GAME_CLEAR_RETRY_MAX = float(os.getenv("GAME_CLEAR_RETRY_MAX", "300"))  # 재시도 백오프 상한 (초)
+
+# 의존성 헬스 체크 백그라운드 프로버
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "15"))  # 초
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "5"))  # 초
+
+# DB 서버 호출 회복성 (재시도 / 타임아웃 예산 / 헤징 / 서킷 브레이커)
+DB_RETRY_BACKOFF = float(os.getenv("DB_RETRY_BACKOFF", "0.1"))  # 재시도 백오프 기준 (초)
+DB_BREAKER_FAILURE_THRESHOLD = int(os.getenv("DB_BREAKER_FAILURE_THRESHOLD", "5"))  # 연속 실패 시 차단
+DB_BREAKER_RESET_TIMEOUT = float(os.getenv("DB_BREAKER_RESET_TIMEOUT", "30"))  # 차단 후 재시도 허용까지 (초)
+
+# 로그인 세션 토큰 (분석 결과/이력을 로그인한 사용자에게만 연결)
+SESSION_SECRET = os.getenv("SESSION_SECRET", "")  # 비어 있으면 프로세스마다 임의 키 (재시작 시 토큰 무효)
+SESSION_TTL = int(os.getenv("SESSION_TTL", "86400"))  # 토큰 유효 시간 (초)
+
+# 분석 결과 비동기 일괄 저장 (DB 서버 엔드포인트 미설정 시 로컬 SQLite, 기본 비활성)
+# 이력(HISTORY_ENABLED)도 같은 백그라운드 기록기/큐(RESULT_PERSIST_QUEUE_SIZE 등)를 쓰지만
+# 결과 저장을 끈 채 이력만 켜도 기록기는 실행됨 (이 경우 로그인 사용자 결과만 이력에 기록)
+RESULT_PERSIST_ENABLED = os.getenv("RESULT_PERSIST_ENABLED", "false").lower() == "true"
+RESULT_PERSIST_ENDPOINT = os.getenv("RESULT_PERSIST_ENDPOINT", "")  # 예: /analysis/results (DB 서버 경로)
+RESULT_PERSIST_DB_PATH = Path(os.getenv("RESULT_PERSIST_DB_PATH", str(DATA_DIR / "analysis_results.db")))
+RESULT_PERSIST_QUEUE_SIZE = int(os.getenv("RESULT_PERSIST_QUEUE_SIZE", "1000"))  # 가득 차면 새 결과는 버림
+RESULT_PERSIST_BATCH_SIZE = int(os.getenv("RESULT_PERSIST_BATCH_SIZE", "50"))
+RESULT_PERSIST_FLUSH_INTERVAL = float(os.getenv("RESULT_PERSIST_FLUSH_INTERVAL", "1.0"))  # 배치 최대 대기 (초)
+
+# 사용자별 분석 이력 저장소 (감정 추이 조회용, 기본 비활성 - 조회/기록 모두 세션 토큰 필요)
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "false").lower() == "true"
+# 다른 사용자(내담자)의 이력/포트폴리오를 조회할 수 있는 치료사 계정 (쉼표로 구분, 로그인 사용자 이름)
+HISTORY_THERAPIST_USERS = frozenset(u.strip() for u in os.getenv("HISTORY_THERAPIST_USERS", "").split(",") if u.strip())
+HISTORY_DB_PATH = Path(os.getenv("HISTORY_DB_PATH", str(DATA_DIR / "history.db")))
+HISTORY_STRESS_WINDOW = int(os.getenv("HISTORY_STRESS_WINDOW", "10"))  # 최근 스트레스 점수 보관 개수
+HISTORY_STRESS_ALPHA = float(os.getenv("HISTORY_STRESS_ALPHA", "0.3"))  # 스트레스 EWMA 가중치
+HISTORY_EXCERPT_CHARS = int(os.getenv("HISTORY_EXCERPT_CHARS", "500"))  # 저장할 해석 요약 길이
+
+# 회기 포트폴리오 종합 요약 (GPT 1회 호출)
+PORTFOLIO_MAX_TOKENS = int(os.getenv("PORTFOLIO_MAX_TOKENS", "1500"))
+PORTFOLIO_THUMBNAIL_SIZE = int(os.getenv("PORTFOLIO_THUMBNAIL_SIZE", "256"))  # 썸네일 최대 변 길이 (px)
+PORTFOLIO_REFRESH_INTERVAL = float(os.getenv("PORTFOLIO_REFRESH_INTERVAL", "3600"))  # 이력이 그대로일 때 refresh 허용 간격 (초)
+
+# 요청 단위 프로파일링 (관리자 토큰으로 요청 시 또는 무작위 상시 샘플링)
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")  # 비어 있으면 토큰 트리거/조회 비활성
+# 내부 상태 조회(업스트림 통계, 게임 클리어 큐, 메모리 할당 위치) 관리자 토큰 - 미설정 시 PROFILE_TOKEN, 둘 다 없으면 비활성
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", PROFILE_TOKEN)
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(DATA_DIR / "profiles")))
+PROFILE_MAX_ARTIFACTS = int(os.getenv("PROFILE_MAX_ARTIFACTS", "100"))  # 초과 시 오래된 결과부터 삭제
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))  # 스택 샘플링 주기 (초)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # 무작위 상시 프로파일링 비율 (0~1)
+PROFILE_SAMPLE_MAX_PER_MINUTE = int(os.getenv("PROFILE_SAMPLE_MAX_PER_MINUTE", "2"))  # 무작위 프로파일링 상한
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "2"))  # 동시에 프로파일링하는 요청 수
+
+# 분산 추적 (OpenTelemetry 형식 span, W3C traceparent 전파)
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "").lower()  # 비어 있으면 비활성, file / console / otlp / "모듈:클래스"
+TRACE_FILE_PATH = Path(os.getenv("TRACE_FILE_PATH", str(DATA_DIR / "traces.jsonl")))  # file 익스포터 출력 (JSON Lines)
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://127.0.0.1:4318/v1/traces")  # OTLP/HTTP JSON 수집기
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))  # 새 trace 샘플링 비율 (상위 trace는 부모 결정 따름)
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "drawing-analysis-api")
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "2048"))  # 가득 차면 span 버림
+TRACE_EXPORT_BATCH_SIZE = int(os.getenv("TRACE_EXPORT_BATCH_SIZE", "128"))
+TRACE_EXPORT_INTERVAL = float(os.getenv("TRACE_EXPORT_INTERVAL", "2.0"))  # 배치 최대 대기 (초)
+
+# 메모리 계측 / 예산 가드
+MEMORY_TRACE_ENABLED = os.getenv("MEMORY_TRACE_ENABLED", "false").lower() == "true"  # tracemalloc (할당 추적 오버헤드 있음)
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "1"))  # 할당 위치별 집계에 보관할 스택 깊이
+MEMORY_BUDGET_MB = os.getenv("MEMORY_BUDGET_MB", "0").lower()  # 0: 가드 비활성, auto: cgroup 메모리 제한 사용
+MEMORY_GUARD_SOFT_RATIO = float(os.getenv("MEMORY_GUARD_SOFT_RATIO", "0.85"))  # 이 비율 이상이면 새 분석 대기
+MEMORY_GUARD_HARD_RATIO = float(os.getenv("MEMORY_GUARD_HARD_RATIO", "0.95"))  # 이 비율 이상이면 즉시 거절 (503)
+MEMORY_GUARD_WAIT = float(os.getenv("MEMORY_GUARD_WAIT", "10"))  # 대기 최대 시간 (초), 초과 시 503
+MEMORY_GUARD_MAX_WAITING = int(os.getenv("MEMORY_GUARD_MAX_WAITING", "16"))  # 대기 가능한 요청 수
+MEMORY_GUARD_PATHS = [p.strip() for p in os.getenv("MEMORY_GUARD_PATHS", "/api/analyze/").split(",") if p.strip()]
+MEMORY_REPORT_INTERVAL = float(os.getenv("MEMORY_REPORT_INTERVAL", "60"))  # RSS/텐서 메모리 보고 주기 (초, 0이면 비활성)
+MEMORY_REPORT_TOP = int(os.getenv("MEMORY_REPORT_TOP", "5"))  # 보고에 포함할 할당 위치 상위 개수 (tracemalloc 사용 시)
+
+# 로깅 (큐 기반 비동기 출력, 요청 ID 연동)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # DEBUG면 탐지/해석 상세 덤프까지 출력
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # text / json
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # 가득 차면 새 로그는 버림 (요청 처리를 막지 않음)
+LOG_RATE_LIMIT = float(os.getenv("LOG_RATE_LIMIT", "20"))  # 호출 위치별 초당 INFO 이하 로그 상한 (0이면 제한 없음)
+LOG_QUIET_LOGGERS = [n.strip() for n in os.getenv("LOG_QUIET_LOGGERS", "httpx,httpcore,ultralytics").split(",") if n.strip()]  # WARNING 이상만
+
+# CORS (순수 ASGI 미들웨어, 프리플라이트는 브라우저가 CORS_MAX_AGE 동안 캐시)
+CORS_ALLOW_ORIGINS = [o.strip() for o in os.getenv("CORS_ALLOW_ORIGINS", "*").split(",") if o.strip()]  # * 이면 모든 출처 허용
+CORS_ALLOW_METHODS = [m.strip().upper() for m in os.getenv("CORS_ALLOW_METHODS", "GET,POST,PUT,DELETE,OPTIONS").split(",") if m.strip()]
+CORS_ALLOW_HEADERS = [h.strip() for h in os.getenv("CORS_ALLOW_HEADERS", "*").split(",") if h.strip()]  # * 이면 요청한 헤더를 그대로 허용
+CORS_EXPOSE_HEADERS = [h.strip() for h in os.getenv("CORS_EXPOSE_HEADERS", "*").split(",") if h.strip()]
+CORS_MAX_AGE = int(os.getenv("CORS_MAX_AGE", "7200"))  # 프리플라이트 캐시 (초, 크롬 상한 2시간)
+
+# 응답 인코딩 / 압축
+RESPONSE_DEFAULT_VIEW = os.getenv("RESPONSE_DEFAULT_VIEW", "full").lower()  # 분석 응답 기본 형태 (full / compact)
+RESPONSE_GZIP_MIN_SIZE = int(os.getenv("RESPONSE_GZIP_MIN_SIZE", "4096"))  # 이 크기(bytes) 이상 JSON 응답 gzip 압축 (0이면 비활성)
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "5"))  # 1(빠름) ~ 9(작음)
@@ -0,0 +1,150 @@
+# app/core/cors.py
+"""
+CORS / 프리플라이트 처리 (순수 ASGI 미들웨어)
+- 응답 헤더 튜플은 생성 시 미리 만들어 두고 응답마다 그대로 덧붙임
+  (BaseHTTPMiddleware처럼 요청/응답 객체를 새로 만들거나 업로드 본문을 스트림으로 다시 감싸지 않음)
+- Origin 헤더가 없는 요청(같은 출처, 서버 간 호출)은 아무것도 하지 않고 그대로 전달
+- 프리플라이트(OPTIONS + Access-Control-Request-Method)는 라우터까지 가지 않고 204로 응답,
+  Access-Control-Max-Age로 브라우저가 같은 요청의 프리플라이트를 다시 보내지 않게 함
+- 프리플라이트가 아닌 OPTIONS는 기존 전역 OPTIONS 처리와 같이 {"message": "OK"}로 응답
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from .config import CORS_ALLOW_ORIGINS, CORS_ALLOW_METHODS, CORS_ALLOW_HEADERS, CORS_EXPOSE_HEADERS, CORS_MAX_AGE
+
+Headers = Tuple[Tuple[bytes, bytes], ...]
+
+ORIGIN_HEADER = b"origin"
+REQUEST_METHOD_HEADER = b"access-control-request-method"
+REQUEST_HEADERS_HEADER = b"access-control-request-headers"
+
+_OPTIONS_BODY = b'{"message":"OK"}'
+
+
+def _join(values: Iterable[str]) -> bytes:
+    return ", ".join(values).encode("latin-1")
+
+
+class CORSMiddleware:
+    """CORS 헤더 추가 및 프리플라이트 응답 (순수 ASGI 미들웨어)"""
+
+    def __init__(self, app, allow_origins: Optional[Iterable[str]] = None,
+                 allow_methods: Optional[Iterable[str]] = None, allow_headers: Optional[Iterable[str]] = None,
+                 expose_headers: Optional[Iterable[str]] = None, max_age: int = CORS_MAX_AGE):
+        self.app = app
+        origins = list(allow_origins if allow_origins is not None else CORS_ALLOW_ORIGINS)
+        methods = [m.upper() for m in (allow_methods if allow_methods is not None else CORS_ALLOW_METHODS)]
+        headers = list(allow_headers if allow_headers is not None else CORS_ALLOW_HEADERS)
+        expose = list(expose_headers if expose_headers is not None else CORS_EXPOSE_HEADERS)
+
+        self.allow_all_origins = "*" in origins
+        self.allow_all_headers = "*" in headers
+        self.methods = frozenset(m.encode("latin-1") for m in methods)
+        self.headers = frozenset(h.lower() for h in headers)
+
+        expose_part: Headers = ((b"access-control-expose-headers", _join(expose)),) if expose else ()
+        preflight_part: Headers = (
+            (b"access-control-allow-methods", _join(methods)),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+        )
+        if not self.allow_all_headers:
+            preflight_part += ((b"access-control-allow-headers", _join(headers)),)
+
+        # 출처별 헤더를 미리 만들어 두어 응답마다 튜플/문자열을 새로 만들지 않음
+        # (출처를 지정한 경우 응답이 Origin에 따라 달라지므로 Vary: Origin 포함)
+        self._simple_any: Optional[Headers] = None
+        self._preflight_any: Optional[Headers] = None
+        self._simple: Dict[bytes, Headers] = {}
+        self._preflight: Dict[bytes, Headers] = {}
+        if self.allow_all_origins:
+            allow = ((b"access-control-allow-origin", b"*"),)
+            self._simple_any = allow + expose_part
+            self._preflight_any = allow + preflight_part
+        else:
+            for origin in origins:
+                raw = origin.encode("latin-1")
+                allow = ((b"access-control-allow-origin", raw), (b"vary", b"Origin"))
+                self._simple[raw] = allow + expose_part
+                self._preflight[raw] = allow + preflight_part
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        origin = request_method = request_headers = None
+        for key, value in scope["headers"]:
+            if key == ORIGIN_HEADER:
+                origin = value
+            elif key == REQUEST_METHOD_HEADER:
+                request_method = value
+            elif key == REQUEST_HEADERS_HEADER:
+                request_headers = value
+
+        if scope["method"] == "OPTIONS":
+            if origin is not None and request_method is not None:
+                return await self._preflight_response(send, origin, request_method, request_headers)
+            return await self._options_response(send, origin)
+
+        cors_headers = self._simple_headers(origin)
+        if not cors_headers:
+            # Origin 없음(같은 출처) 또는 허용하지 않은 출처 - CORS 헤더 없이 처리
+            return await self.app(scope, receive, send)
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers")
+                if isinstance(headers, list):
+                    headers.extend(cors_headers)
+                else:
+                    message["headers"] = [*(headers or ()), *cors_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    def _simple_headers(self, origin: Optional[bytes]) -> Headers:
+        if origin is None:
+            return ()
+        return self._simple_any or self._simple.get(origin) or ()
+
+    async def _options_response(self, send, origin: Optional[bytes]):
+        """프리플라이트가 아닌 OPTIONS (기존 전역 OPTIONS 응답과 동일한 본문)"""
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", b"%d" % len(_OPTIONS_BODY)),
+                *self._simple_headers(origin),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _OPTIONS_BODY})
+
+    async def _preflight_response(self, send, origin: bytes, request_method: bytes, request_headers: Optional[bytes]):
+        headers = self._preflight_any or self._preflight.get(origin)
+        if headers is None:
+            return await self._reject(send, b"Disallowed CORS origin")
+        if request_method.strip().upper() not in self.methods:
+            return await self._reject(send, b"Disallowed CORS method")
+
+        extra: Headers = ()
+        if request_headers:
+            if self.allow_all_headers:
+                # "*"는 Authorization을 포함하지 않으므로 요청한 헤더를 그대로 허용
+                extra = ((b"access-control-allow-headers", request_headers),)
+            else:
+                requested = {h.strip().lower() for h in request_headers.decode("latin-1").split(",") if h.strip()}
+                if not requested <= self.headers:
+                    return await self._reject(send, b"Disallowed CORS headers")
+
+        await send({"type": "http.response.start", "status": 204, "headers": [*headers, *extra]})
+        await send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    async def _reject(send, reason: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": 400,
+            "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", b"%d" % len(reason))],
+        })
+        await send({"type": "http.response.body", "body": reason})
@@ -0,0 +1,160 @@
+# app/core/log.py
+"""
+로깅 설정 (표준 logging 기반)
+- 요청 처리 스레드는 레코드를 큐에 넣기만 하고 실제 출력은 QueueListener 스레드가 담당
+  → stdout 쓰기/락 경합이 요청 지연에 포함되지 않음, 큐가 가득 차면 버리고 개수만 기록
+- 모든 레코드에 request_id(X-Request-ID), trace_id(추적 활성 시) 부여
+- 호출 위치(파일:줄)별 초당 INFO 이하 로그 상한 - 초과분은 버리고 다음 출력에 생략 건수 표시
+- LOG_FORMAT=json 이면 한 줄 JSON (수집기용)
+- 상세 덤프는 DEBUG 레벨 (기본 INFO에서는 포맷팅 비용 없이 생략)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from .config import LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_RATE_LIMIT, LOG_QUIET_LOGGERS
+from .request_context import current_request_id
+from .tracing import current_span
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+
+class RequestContextFilter(logging.Filter):
+    """요청 ID / trace ID 부여 (큐에 넣기 전, 로그를 남긴 스레드의 컨텍스트에서 실행)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = current_request_id() or "-"
+        record.trace_id = getattr(current_span(), "trace_id", None)
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """호출 위치별 초당 상한 (WARNING 이상은 항상 통과)"""
+
+    def __init__(self, per_second: float = LOG_RATE_LIMIT):
+        super().__init__()
+        self.per_second = per_second
+        self._windows: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.per_second <= 0 or record.levelno >= logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= 1.0:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.per_second:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 레코드를 버림 (요청 스레드를 막거나 에러를 출력하지 않음)"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 예외 traceback은 여기서 메시지에 합쳐짐 (출력 스레드로 예외 객체를 넘기지 않음)
+        record = super().prepare(record)
+        if self._unreported:
+            # 동시에 기록하는 스레드끼리 일부 누락될 수 있으나 대략적인 버림 규모를 알리는 용도
+            record.dropped, self._unreported = self._unreported, 0
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        notes = []
+        if getattr(record, "suppressed", 0):
+            notes.append(f"같은 위치 로그 {record.suppressed}건 생략")
+        if getattr(record, "dropped", 0):
+            notes.append(f"큐 초과로 {record.dropped}건 버림")
+        return f"{message} ({', '.join(notes)})" if notes else message
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "trace_id": getattr(record, "trace_id", None),
+        }
+        for key in ("suppressed", "dropped"):
+            if getattr(record, key, 0):
+                entry[key] = getattr(record, key)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    """루트 로거에 큐 핸들러 설치 (여러 번 호출해도 한 번만 적용)"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter(TEXT_FORMAT))
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    _queue_handler.addFilter(RateLimitFilter())
+    _queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    for name in LOG_QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """남은 로그를 출력하고 리스너 종료"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    _listener = _queue_handler = None
+
+
+def logging_stats() -> Dict[str, int]:
+    if _queue_handler is None:
+        return {"enabled": False}
+    return {"enabled": True, "queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
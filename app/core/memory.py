@@ -0,0 +1,200 @@
+# app/core/memory.py
+"""
+프로세스 메모리 계측
+- RSS: /proc/self/statm (리눅스 외에는 resource의 최대 RSS로 대체)
+- 예산: MEMORY_BUDGET_MB 또는 cgroup 메모리 제한 (auto)
+- 텐서 메모리: torch가 이미 로드되어 있고 CUDA를 쓰는 경우만 (CPU 텐서는 RSS에 포함)
+- tracemalloc 구간 피크: 단계/요청별로 구간 시작 대비 최대 증가량(bytes)
+
+주의: tracemalloc 피크는 프로세스 전체 값이라 동시에 처리 중인 다른 요청의 할당도 포함됨
+(구간이 열리고 닫힐 때마다 피크를 열린 구간 모두에 반영한 뒤 초기화하므로 중첩 구간도 올바르게 집계)
+"""
+
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import MEMORY_TRACE_ENABLED, MEMORY_TRACE_FRAMES, MEMORY_BUDGET_MB
+
+logger = logging.getLogger(__name__)
+
+_CGROUP_LIMIT_FILES = (
+    Path("/sys/fs/cgroup/memory.max"),  # cgroup v2
+    Path("/sys/fs/cgroup/memory/memory.limit_in_bytes"),  # cgroup v1
+)
+# cgroup v1은 제한이 없으면 매우 큰 값을 돌려줌
+_UNLIMITED = 1 << 60
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+try:
+    import psutil
+    _PROCESS = psutil.Process()
+except ImportError:
+    psutil = None
+    _PROCESS = None
+
+
+def rss_bytes() -> Optional[int]:
+    """
+    현재 프로세스 RSS (측정할 수 없으면 None → 메모리 가드 비활성)
+    - 리눅스는 /proc/self/statm, 그 외에는 psutil이 설치된 경우에만 측정
+    - getrusage의 ru_maxrss는 줄어들지 않는 피크 값이라 한 번 넘으면 계속 거부하게 되므로 사용하지 않음
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    if _PROCESS is None:
+        return None
+    try:
+        return _PROCESS.memory_info().rss
+    except (psutil.Error, OSError):
+        return None
+
+
+def container_memory_limit() -> Optional[int]:
+    """cgroup 메모리 제한 (bytes, 제한이 없거나 알 수 없으면 None)"""
+    for path in _CGROUP_LIMIT_FILES:
+        try:
+            value = path.read_text().strip()
+        except OSError:
+            continue
+        if value == "max":
+            return None
+        try:
+            limit = int(value)
+        except ValueError:
+            continue
+        return limit if limit < _UNLIMITED else None
+    return None
+
+
+def resolve_budget(value: str = MEMORY_BUDGET_MB) -> Optional[int]:
+    """MEMORY_BUDGET_MB → bytes (0/빈 값이면 None, auto면 cgroup 제한)"""
+    if value == "auto":
+        limit = container_memory_limit()
+        if limit is None:
+            logger.warning("MEMORY_BUDGET_MB=auto 이지만 cgroup 메모리 제한을 찾지 못해 메모리 가드를 비활성화합니다.")
+        return limit
+    try:
+        megabytes = float(value or 0)
+    except ValueError:
+        logger.warning(f"MEMORY_BUDGET_MB 값이 올바르지 않습니다: {value!r}")
+        return None
+    return int(megabytes * 1024 * 1024) if megabytes > 0 else None
+
+
+def tensor_memory() -> Dict[str, Dict[str, int]]:
+    """CUDA 장치별 텐서 메모리 (allocated/reserved/max_allocated, bytes)"""
+    # 계측을 위해 torch를 새로 import하지 않음 (모델이 로드된 프로세스에서만 의미가 있음)
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return {}
+    try:
+        if not torch.cuda.is_available():
+            return {}
+        return {
+            f"cuda:{index}": {
+                "allocated": torch.cuda.memory_allocated(index),
+                "reserved": torch.cuda.memory_reserved(index),
+                "max_allocated": torch.cuda.max_memory_allocated(index),
+            }
+            for index in range(torch.cuda.device_count())
+        }
+    except Exception as e:
+        logger.debug(f"텐서 메모리 조회 실패: {e}")
+        return {}
+
+
+class MemoryScope:
+    """tracemalloc 구간 - 종료 후 peak에 구간 시작 대비 최대 증가량(bytes), 추적 중이 아니면 None"""
+
+    __slots__ = ("start", "high", "peak")
+
+    def __init__(self, start: int = 0):
+        self.start = start
+        self.high = start
+        self.peak: Optional[int] = None
+
+
+class MemoryTracker:
+    """tracemalloc 기반 구간 피크 측정 (중첩/동시 구간 지원)"""
+
+    def __init__(self, enabled: bool = MEMORY_TRACE_ENABLED, frames: int = MEMORY_TRACE_FRAMES):
+        self.enabled = enabled
+        self.frames = frames
+        self._active: List[MemoryScope] = []
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            logger.info(f"tracemalloc 시작 (스택 깊이 {self.frames})")
+
+    def stop(self):
+        if self.enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _fold(self) -> int:
+        """지금까지의 피크를 열린 구간 모두에 반영하고 피크 초기화 (lock 보유 상태에서 호출)"""
+        current, peak = tracemalloc.get_traced_memory()
+        for scope in self._active:
+            if peak > scope.high:
+                scope.high = peak
+        tracemalloc.reset_peak()
+        return current
+
+    @contextmanager
+    def scope(self):
+        if not tracemalloc.is_tracing():
+            yield MemoryScope()
+            return
+        with self._lock:
+            scope = MemoryScope(self._fold())
+            self._active.append(scope)
+        try:
+            yield scope
+        finally:
+            with self._lock:
+                if tracemalloc.is_tracing():
+                    self._fold()
+                self._active.remove(scope)
+            scope.peak = max(0, scope.high - scope.start)
+
+    def traced(self) -> Optional[Dict[str, int]]:
+        """현재/최대 추적 메모리 (추적 중이 아니면 None) - 최대값은 마지막 구간 경계 이후 기준"""
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        return {"current": current, "peak": peak}
+
+    def top_allocations(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """할당 위치별 상위 메모리 사용 (스냅샷 생성 비용이 크므로 워커 스레드에서 호출)"""
+        if not tracemalloc.is_tracing() or limit <= 0:
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        top = []
+        for stat in snapshot.statistics("lineno")[:limit]:
+            frame = stat.traceback[0]
+            top.append({"location": f"{frame.filename}:{frame.lineno}", "size": stat.size, "count": stat.count})
+        return top
+
+
+memory_tracker = MemoryTracker()
@@ -0,0 +1,256 @@
+# app/core/memory_guard.py
+"""
+메모리 예산 가드 및 주기적 메모리 보고
+- MEMORY_BUDGET_MB(또는 cgroup 제한) 대비 RSS 비율로 새 분석 요청의 진입을 결정
+  - soft 미만: 바로 처리
+  - soft 이상: 대기 (진행 중인 분석이 끝날 때마다 다시 확인, 진행 중인 분석이 없으면 하나씩 처리)
+  - hard 이상 / 대기 시간·대기열 초과: 503 + Retry-After
+- 처리 도중 OOM으로 종료되어 진행 중인 모든 요청을 잃는 대신 새 요청을 미리 거절
+- MemoryReporter: RSS/추적 메모리/텐서 메모리 게이지 갱신 및 로그 (tracemalloc 사용 시 상위 할당 위치 포함)
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from .config import (
+    MEMORY_GUARD_SOFT_RATIO,
+    MEMORY_GUARD_HARD_RATIO,
+    MEMORY_GUARD_WAIT,
+    MEMORY_GUARD_MAX_WAITING,
+    MEMORY_GUARD_PATHS,
+    MEMORY_REPORT_INTERVAL,
+    MEMORY_REPORT_TOP,
+)
+from .memory import memory_tracker, resolve_budget, rss_bytes, tensor_memory
+from .metrics import MEMORY_GUARD_DECISIONS, PROCESS_MEMORY, TENSOR_MEMORY
+from .tracing import add_span_event
+
+logger = logging.getLogger(__name__)
+
+# 대기 중 RSS를 다시 확인하는 최대 간격 (초) - 분석 종료 알림 없이도 메모리가 줄어드는 경우 대비
+_POLL_INTERVAL = 0.25
+
+
+class MemoryGuard:
+    """RSS 기반 분석 요청 진입 제어 (대기/거절)"""
+
+    def __init__(self, budget: Optional[int] = None, soft_ratio: float = MEMORY_GUARD_SOFT_RATIO,
+                 hard_ratio: float = MEMORY_GUARD_HARD_RATIO, wait: float = MEMORY_GUARD_WAIT,
+                 max_waiting: int = MEMORY_GUARD_MAX_WAITING, paths: Optional[List[str]] = None):
+        self.budget = budget if budget is not None else resolve_budget()
+        self.soft_ratio = soft_ratio
+        self.hard_ratio = hard_ratio
+        self.wait = wait
+        self.max_waiting = max_waiting
+        self.paths = tuple(paths if paths is not None else MEMORY_GUARD_PATHS)
+        self.inflight = 0
+        self.waiting = 0
+        self.counters = Counter()
+        self._released = asyncio.Condition()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.budget)
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.wait))
+
+    def usage(self) -> Optional[float]:
+        """예산 대비 RSS 비율 (측정 불가 시 None)"""
+        rss = rss_bytes()
+        if not self.budget or rss is None:
+            return None
+        return rss / self.budget
+
+    def applies(self, scope) -> bool:
+        return (
+            self.enabled
+            and scope.get("method") == "POST"
+            and scope.get("path", "").startswith(self.paths)
+        )
+
+    def _decide(self, decision: str, reason: str, ratio: Optional[float]) -> Optional[str]:
+        self.counters[f"{decision}_{reason}" if decision == "rejected" else decision] += 1
+        MEMORY_GUARD_DECISIONS.labels(decision=decision, reason=reason).inc()
+        if decision != "admitted" or reason != "below_soft":
+            add_span_event("memory_guard", {"decision": decision, "reason": reason,
+                                            "memory.usage_ratio": round(ratio, 3) if ratio is not None else None})
+        if decision == "rejected":
+            logger.warning(f"메모리 예산 초과로 분석 요청 거절 ({reason}, 사용률 {ratio:.0%}, 진행 {self.inflight}, 대기 {self.waiting})")
+            return reason
+        self.inflight += 1
+        return None
+
+    def _admissible(self, ratio: float) -> bool:
+        # soft 이상이면 진행 중인 분석이 모두 끝난 뒤 하나씩만 처리
+        return ratio < self.soft_ratio or self.inflight == 0
+
+    async def acquire(self) -> Optional[str]:
+        """분석 시작 허용 시 None, 거절 시 사유 (hard_limit / queue_full / timeout)"""
+        ratio = self.usage()
+        if ratio is None or ratio < self.soft_ratio:
+            return self._decide("admitted", "below_soft", ratio)
+        if ratio >= self.hard_ratio:
+            return self._decide("rejected", "hard_limit", ratio)
+        if self.waiting == 0 and self.inflight == 0:
+            return self._decide("admitted", "serialized", ratio)
+        if self.waiting >= self.max_waiting:
+            return self._decide("rejected", "queue_full", ratio)
+
+        self.counters["queued"] += 1
+        MEMORY_GUARD_DECISIONS.labels(decision="queued", reason="soft_limit").inc()
+        self.waiting += 1
+        deadline = time.monotonic() + self.wait
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return self._decide("rejected", "timeout", ratio)
+                async with self._released:
+                    try:
+                        await asyncio.wait_for(self._released.wait(), min(remaining, _POLL_INTERVAL))
+                    except asyncio.TimeoutError:
+                        pass
+                ratio = self.usage() or 0.0
+                if ratio >= self.hard_ratio:
+                    return self._decide("rejected", "hard_limit", ratio)
+                if self._admissible(ratio):
+                    return self._decide("admitted", "after_wait", ratio)
+        finally:
+            self.waiting -= 1
+
+    async def release(self):
+        self.inflight -= 1
+        async with self._released:
+            self._released.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        ratio = self.usage()
+        return {
+            "enabled": self.enabled,
+            "budget_bytes": self.budget,
+            "usage_ratio": round(ratio, 4) if ratio is not None else None,
+            "soft_ratio": self.soft_ratio,
+            "hard_ratio": self.hard_ratio,
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            **self.counters,
+        }
+
+
+class MemoryGuardMiddleware:
+    """분석 요청(POST, MEMORY_GUARD_PATHS)에 메모리 예산 가드 적용 (순수 ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not memory_guard.applies(scope):
+            return await self.app(scope, receive, send)
+
+        reason = await memory_guard.acquire()
+        if reason is not None:
+            return await self._reject(send, reason)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await memory_guard.release()
+
+    @staticmethod
+    async def _reject(send, reason: str):
+        body = json.dumps(
+            {"detail": "서버 메모리가 부족해 분석 요청을 처리할 수 없습니다. 잠시 후 다시 시도해주세요.", "reason": reason},
+            ensure_ascii=False
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(memory_guard.retry_after).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class MemoryReporter:
+    """주기적 메모리 보고 (게이지 갱신 + 로그)"""
+
+    def __init__(self, interval: float = MEMORY_REPORT_INTERVAL, top: int = MEMORY_REPORT_TOP):
+        self.interval = interval
+        self.top = top
+        self._task: Optional[asyncio.Task] = None
+
+    def collect(self, include_top: bool = False) -> Dict[str, Any]:
+        """현재 메모리 상태 (include_top이면 tracemalloc 스냅샷을 만들므로 워커 스레드에서 호출)"""
+        rss = rss_bytes()
+        traced = memory_tracker.traced()
+        tensors = tensor_memory()
+
+        if rss is not None:
+            PROCESS_MEMORY.labels(kind="rss").set(rss)
+        if memory_guard.budget:
+            PROCESS_MEMORY.labels(kind="budget").set(memory_guard.budget)
+        if traced is not None:
+            PROCESS_MEMORY.labels(kind="traced_current").set(traced["current"])
+            PROCESS_MEMORY.labels(kind="traced_peak").set(traced["peak"])
+        for device, values in tensors.items():
+            TENSOR_MEMORY.labels(device=device, kind="allocated").set(values["allocated"])
+            TENSOR_MEMORY.labels(device=device, kind="reserved").set(values["reserved"])
+
+        report = {"rss_bytes": rss, "traced": traced, "tensors": tensors, "guard": memory_guard.stats()}
+        if include_top:
+            report["top_allocations"] = memory_tracker.top_allocations(self.top)
+        return report
+
+    async def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"메모리 보고 시작 (간격 {self.interval}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                report = await asyncio.to_thread(self.collect, True)
+                self._log(report)
+            except Exception as e:
+                logger.error(f"메모리 보고 오류: {e}")
+
+    @staticmethod
+    def _log(report: Dict[str, Any]):
+        def mb(value):
+            return f"{value / 1048576:.1f}MB" if value is not None else "n/a"
+
+        guard = report["guard"]
+        parts = [f"rss={mb(report['rss_bytes'])}"]
+        if guard["enabled"] and guard["usage_ratio"] is not None:
+            parts.append(f"budget={mb(guard['budget_bytes'])} ({guard['usage_ratio']:.0%})")
+            parts.append(f"inflight={guard['inflight']} waiting={guard['waiting']}")
+        if report["traced"] is not None:
+            parts.append(f"traced={mb(report['traced']['current'])} peak={mb(report['traced']['peak'])}")
+        for device, values in report["tensors"].items():
+            parts.append(f"{device}={mb(values['allocated'])}/{mb(values['reserved'])}")
+        logger.info("메모리: " + " ".join(parts))
+        for entry in report.get("top_allocations", []):
+            logger.info(f"  {mb(entry['size'])} ({entry['count']}건) {entry['location']}")
+
+
+memory_guard = MemoryGuard()
+memory_reporter = MemoryReporter()
@@ -0,0 +1,238 @@
+# app/core/metrics.py
+"""
+Prometheus 메트릭 (prometheus_client 미설치 시 아무 것도 기록하지 않는 대체 구현)
+- 파이프라인 단계별 지연 히스토그램 (업로드, 캔버스 래스터화, 탐지 세부 단계, 기하 분석, GPT 호출 등)
+- 분기 결정, 캐시 적중, 폴백 카운터
+- 단계/요청별 메모리 피크 (tracemalloc 사용 시), 프로세스 RSS/텐서 메모리 게이지
+- 레이블 값은 고정된 집합으로 정규화해 카디널리티를 제한
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+from .memory import memory_tracker
+from .serialization import dumps
+from .timing import record_step, record_cache_layer, record_memory_peak
+from .tracing import start_span, set_span_attribute, add_span_event
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+    class _NoopMetric:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def labels(self, *args, **kwargs):
+            return self
+
+        def observe(self, value):
+            pass
+
+        def inc(self, amount=1):
+            pass
+
+        def set(self, value):
+            pass
+
+    Counter = Gauge = Histogram = _NoopMetric
+
+    def generate_latest(registry=None) -> bytes:
+        return b"# prometheus_client is not installed\n"
+
+
+# GPT 호출/업스트림 요청은 수 초 이상 걸릴 수 있어 버킷 범위를 넓게 잡음
+_SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+# 메모리 피크 (bytes): 256KB ~ 1GB
+_MEMORY_BUCKETS = tuple(float(1 << shift) for shift in range(18, 31, 2))
+
+HTTP_REQUEST_DURATION = Histogram(
+    "drawing_http_request_seconds", "HTTP 요청 처리 시간",
+    ["endpoint", "method", "status"], buckets=_SLOW_BUCKETS
+)
+PIPELINE_STEP_DURATION = Histogram(
+    "drawing_pipeline_step_seconds", "분석 파이프라인 단계별 처리 시간",
+    ["step", "endpoint", "model", "stage"]
+)
+GPT_CALL_DURATION = Histogram(
+    "drawing_gpt_call_seconds", "GPT 호출 시간 (vision/text/portfolio, 폴백 여부)",
+    ["mode", "outcome", "endpoint", "stage"], buckets=_SLOW_BUCKETS
+)
+UPSTREAM_DURATION = Histogram(
+    "drawing_upstream_request_seconds", "DB 서버 요청 시간 (시도 단위)",
+    ["route", "outcome"], buckets=_SLOW_BUCKETS
+)
+BRANCH_DECISIONS = Counter(
+    "drawing_branch_decisions_total", "신뢰도 기반 분기 결정",
+    ["branch", "model", "endpoint"]
+)
+CACHE_EVENTS = Counter(
+    "drawing_cache_events_total", "캐시 적중/미스",
+    ["cache", "result"]
+)
+FALLBACKS = Counter(
+    "drawing_fallbacks_total", "폴백 발생 횟수",
+    ["kind", "endpoint"]
+)
+PIPELINE_STEP_MEMORY = Histogram(
+    "drawing_pipeline_step_memory_peak_bytes", "분석 단계별 추적 메모리 피크 (tracemalloc, 구간 시작 대비 증가량)",
+    ["step", "endpoint", "model"], buckets=_MEMORY_BUCKETS
+)
+REQUEST_MEMORY = Histogram(
+    "drawing_http_request_memory_peak_bytes", "요청별 추적 메모리 피크 (tracemalloc, 동시 요청 할당 포함)",
+    ["endpoint"], buckets=_MEMORY_BUCKETS
+)
+PROCESS_MEMORY = Gauge(
+    "drawing_process_memory_bytes", "프로세스 메모리 (rss, budget, traced_current, traced_peak)",
+    ["kind"]
+)
+TENSOR_MEMORY = Gauge(
+    "drawing_tensor_memory_bytes", "CUDA 텐서 메모리 (allocated, reserved)",
+    ["device", "kind"]
+)
+MEMORY_GUARD_DECISIONS = Counter(
+    "drawing_memory_guard_total", "메모리 예산 가드 결정 (admitted, queued, rejected)",
+    ["decision", "reason"]
+)
+
+# 요청별 엔드포인트 레이블 (MetricsMiddleware가 라우트 템플릿으로 설정)
+_endpoint_label: ContextVar[str] = ContextVar("metrics_endpoint", default="none")
+
+_MODELS = {"htp", "pitr", "gpt", "none"}
+
+
+def current_endpoint() -> str:
+    return _endpoint_label.get()
+
+
+def stage_label(stage) -> str:
+    """치료 회기 레이블 (0~12 외 값은 other)"""
+    try:
+        value = int(stage)
+    except (TypeError, ValueError):
+        return "none"
+    return str(value) if 0 <= value <= 12 else "other"
+
+
+def model_label(model: Optional[str]) -> str:
+    return model if model in _MODELS else "other"
+
+
+@contextmanager
+def observe_duration(step: str, model: Optional[str] = "none", stage=None):
+    """with 블록 실행 시간을 파이프라인 단계 히스토그램에 기록 (추적 활성 시 같은 이름의 span, tracemalloc 사용 시 메모리 피크도 기록)"""
+    started = time.perf_counter()
+    memory = None
+    try:
+        with start_span(step, {"analysis.model": None if model == "none" else model, "analysis.stage": stage}), \
+                memory_tracker.scope() as memory:
+            yield
+    finally:
+        observe_step(step, time.perf_counter() - started, model, stage)
+        if memory is not None and memory.peak is not None:
+            observe_memory(step, memory.peak, model)
+
+
+def observe_step(step: str, seconds: float, model: Optional[str] = "none", stage=None):
+    """단계 히스토그램 기록 + 현재 요청의 단계별 시간(Server-Timing)에 누적"""
+    PIPELINE_STEP_DURATION.labels(
+        step=step, endpoint=current_endpoint(), model=model_label(model), stage=stage_label(stage)
+    ).observe(seconds)
+    record_step(step, seconds)
+
+
+def observe_memory(step: str, peak_bytes: int, model: Optional[str] = "none"):
+    """단계 메모리 피크 히스토그램 기록 + 현재 요청의 단계별 메모리 피크(metadata.timings)에 반영"""
+    PIPELINE_STEP_MEMORY.labels(step=step, endpoint=current_endpoint(), model=model_label(model)).observe(peak_bytes)
+    record_memory_peak(step, peak_bytes)
+
+
+def record_branch(branch: str, stage=None):
+    """신뢰도 분기 결정 기록 (stage 0 → htp, 1 → pitr)"""
+    model = {0: "htp", 1: "pitr"}.get(stage, "other")
+    BRANCH_DECISIONS.labels(branch=branch, model=model, endpoint=current_endpoint()).inc()
+    set_span_attribute("analysis.branch", branch)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_EVENTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+    record_cache_layer(cache, hit)
+
+
+def record_fallback(kind: str):
+    FALLBACKS.labels(kind=kind, endpoint=current_endpoint()).inc()
+    add_span_event("fallback", {"fallback.kind": kind})
+
+
+class TimedJSONResponse(JSONResponse):
+    """응답 JSON 직렬화 시간을 기록하는 기본 응답 클래스 (orjson 설치 시 orjson으로 인코딩)"""
+
+    def render(self, content: Any) -> bytes:
+        with observe_duration("response_serialize"):
+            return dumps(content)
+
+
+def _status_class(status: int) -> str:
+    return f"{status // 100}xx"
+
+
+class MetricsMiddleware:
+    """
+    요청 처리 시간 기록 + 엔드포인트 레이블 설정 (순수 ASGI 미들웨어)
+    - 레이블은 매칭된 라우트 템플릿(/api/history/{username} 등)이라 사용자 값이 섞이지 않음
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = None
+        self._labels = {}
+
+    def _resolve(self, scope) -> str:
+        path = scope.get("path", "")
+        label = self._labels.get(path)
+        if label is not None:
+            return label
+        if self._routes is None:
+            self._routes = [r for r in getattr(scope.get("app"), "routes", []) if hasattr(r, "path_regex")]
+        label = "unmatched"
+        for route in self._routes:
+            if route.path_regex.match(path):
+                label = route.path
+                break
+        # 템플릿이 없는 고정 경로만 캐시 (경로 변수 값으로 캐시가 커지지 않도록)
+        if label == path and len(self._labels) < 1024:
+            self._labels[path] = label
+        return label
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        endpoint = self._resolve(scope)
+        token = _endpoint_label.set(endpoint)
+        status = {"code": 500}
+        started = time.perf_counter()
+        memory = None
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            with memory_tracker.scope() as memory:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.labels(
+                endpoint=endpoint, method=scope.get("method", ""), status=_status_class(status["code"])
+            ).observe(time.perf_counter() - started)
+            if memory is not None and memory.peak is not None:
+                REQUEST_MEMORY.labels(endpoint=endpoint).observe(memory.peak)
+            _endpoint_label.reset(token)
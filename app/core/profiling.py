@@ -0,0 +1,273 @@
+# app/core/profiling.py
+"""
+요청 단위 온디맨드 프로파일링
+- 관리자 트리거: PROFILE_TOKEN과 같은 값을 X-Profile 헤더 또는 ?profile= 쿼리로 보내면 그 요청만 프로파일링
+  - 모드(X-Profile-Mode 헤더 / ?profile_mode=):
+    sample   - sys._current_frames 기반 스택 샘플링 → collapsed stack (.folded, flamegraph.pl / speedscope)
+    cprofile - 이벤트 루프 스레드의 결정적 프로파일 → pstats (.prof, snakeviz / pstats)
+- 상시 샘플링: PROFILE_SAMPLE_RATE 비율로 무작위 요청을 sample 모드로 프로파일링 (분당 상한)
+- 결과는 요청 ID(X-Request-ID)로 /api/profiles/{request_id}에서 조회
+
+주의: 프로파일은 요청이 처리되는 동안의 프로세스 상태를 기록하므로 동시에 처리 중인 다른 요청의
+프레임도 섞일 수 있음 (sample은 스레드 이름이 스택 루트, cprofile은 이벤트 루프 스레드 한정)
+"""
+
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from .config import (
+    PROFILE_TOKEN,
+    PROFILE_DIR,
+    PROFILE_MAX_ARTIFACTS,
+    PROFILE_SAMPLE_INTERVAL,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_SAMPLE_MAX_PER_MINUTE,
+    PROFILE_MAX_CONCURRENT,
+)
+from .request_context import current_request_id, get_header, is_valid_request_id, new_request_id
+
+logger = logging.getLogger(__name__)
+
+MODES = ("sample", "cprofile")
+# 프로파일 조회 요청 자체는 프로파일링하지 않음 (같은 X-Profile 헤더를 사용)
+_EXCLUDED_PREFIX = "/api/profiles"
+ARTIFACT_SUFFIX = {"sample": ".folded", "cprofile": ".prof"}
+_MAX_STACK_DEPTH = 128
+
+
+class StackSampler:
+    """주기적으로 모든 스레드의 스택을 수집해 collapsed stack 횟수로 집계"""
+
+    mode = "sample"
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                self.counts[self._collapse(names.get(ident, str(ident)), frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        frames = []
+        while frame is not None and len(frames) < _MAX_STACK_DEPTH:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ";".join(reversed(frames))
+
+    def write(self, path: Path):
+        lines = [f"{stack} {count}" for stack, count in self.counts.most_common()]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+class DeterministicProfiler:
+    """cProfile - 활성화한 스레드(이벤트 루프)의 모든 함수 호출 기록"""
+
+    mode = "cprofile"
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def write(self, path: Path):
+        self.profile.dump_stats(str(path))
+
+
+class ProfileStore:
+    """요청 ID별 프로파일 결과 파일 (개수 상한, 오래된 것부터 삭제)"""
+
+    def __init__(self, directory: Path = PROFILE_DIR, max_artifacts: int = PROFILE_MAX_ARTIFACTS):
+        self.directory = directory
+        self.max_artifacts = max_artifacts
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, request_id: str, profiler, meta: Dict[str, Any]) -> Dict[str, Any]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{request_id}{ARTIFACT_SUFFIX[profiler.mode]}"
+        profiler.write(path)
+        entry = {"request_id": request_id, "mode": profiler.mode, "file": path.name, "created_at": time.time(), **meta}
+        with self._lock:
+            self._entries[request_id] = entry
+            self._entries.move_to_end(request_id)
+            while len(self._entries) > self.max_artifacts:
+                _, old = self._entries.popitem(last=False)
+                (self.directory / old["file"]).unlink(missing_ok=True)
+        return entry
+
+    def get(self, request_id: str) -> Optional[Tuple[Path, Dict[str, Any]]]:
+        """(파일 경로, 메타) - 재시작 이후에는 디렉터리에서 파일명으로 찾음"""
+        if not is_valid_request_id(request_id):
+            return None
+        with self._lock:
+            entry = self._entries.get(request_id)
+        if entry is None:
+            for mode, suffix in ARTIFACT_SUFFIX.items():
+                path = self.directory / f"{request_id}{suffix}"
+                if path.exists():
+                    return path, {"request_id": request_id, "mode": mode, "file": path.name}
+            return None
+        path = self.directory / entry["file"]
+        return (path, entry) if path.exists() else None
+
+    def list(self) -> list:
+        with self._lock:
+            return list(reversed(self._entries.values()))
+
+
+class RequestProfiler:
+    """프로파일링 대상 요청 결정 (토큰 트리거 / 무작위 샘플링) 및 동시 실행 제한"""
+
+    def __init__(self, token: str = PROFILE_TOKEN, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 max_per_minute: int = PROFILE_SAMPLE_MAX_PER_MINUTE, max_concurrent: int = PROFILE_MAX_CONCURRENT):
+        self.token = token
+        self.sample_rate = sample_rate
+        self.max_per_minute = max_per_minute
+        self.max_concurrent = max_concurrent
+        self.store = ProfileStore()
+        self._recent_random = deque()
+        self._active = 0
+        self._cprofile_active = False
+        self._lock = threading.Lock()
+        self.counters = Counter()
+
+    def check_token(self, value: Optional[str]) -> bool:
+        return bool(self.token) and value is not None and hmac.compare_digest(value.encode("utf-8"), self.token.encode("utf-8"))
+
+    def decide(self, scope) -> Optional[Tuple[str, str]]:
+        """(mode, trigger) 또는 None"""
+        if scope.get("path", "").startswith(_EXCLUDED_PREFIX):
+            return None
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        token = get_header(scope, b"x-profile") or (query.get("profile") or [None])[0]
+        if token is not None and self.check_token(token):
+            mode = get_header(scope, b"x-profile-mode") or (query.get("profile_mode") or ["sample"])[0]
+            return (mode if mode in MODES else "sample"), "token"
+        if self.sample_rate > 0 and random.random() < self.sample_rate and self._allow_random():
+            return "sample", "random"
+        return None
+
+    def _allow_random(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            while self._recent_random and now - self._recent_random[0] > 60:
+                self._recent_random.popleft()
+            if len(self._recent_random) >= self.max_per_minute:
+                return False
+            self._recent_random.append(now)
+            return True
+
+    def begin(self, mode: str):
+        """프로파일러 시작 (동시 실행 상한 초과 시 None) - cProfile은 스레드당 하나만 활성화 가능"""
+        with self._lock:
+            if self._active >= self.max_concurrent or (mode == "cprofile" and self._cprofile_active):
+                self.counters["skipped"] += 1
+                return None
+            self._active += 1
+            if mode == "cprofile":
+                self._cprofile_active = True
+        profiler = DeterministicProfiler() if mode == "cprofile" else StackSampler()
+        profiler.start()
+        return profiler
+
+    def end(self, profiler):
+        profiler.stop()
+        with self._lock:
+            self._active -= 1
+            if profiler.mode == "cprofile":
+                self._cprofile_active = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "token_enabled": bool(self.token),
+            "sample_rate": self.sample_rate,
+            "active": self._active,
+            "artifacts": len(self.store.list()),
+            **self.counters,
+        }
+
+
+class ProfilingMiddleware:
+    """대상 요청을 프로파일링하고 결과를 요청 ID로 저장 (순수 ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        decision = request_profiler.decide(scope)
+        profiler = request_profiler.begin(decision[0]) if decision else None
+        if profiler is None:
+            return await self.app(scope, receive, send)
+
+        request_id = current_request_id() or new_request_id()
+        started = time.perf_counter()
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_profiler.end(profiler)
+            meta = {
+                "trigger": decision[1],
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            try:
+                await asyncio.to_thread(request_profiler.store.save, request_id, profiler, meta)
+                request_profiler.counters[decision[1]] += 1
+            except Exception as e:
+                logger.error(f"프로파일 저장 실패 ({request_id}): {e}")
+
+
+request_profiler = RequestProfiler()
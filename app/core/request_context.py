@@ -0,0 +1,66 @@
+# app/core/request_context.py
+"""
+요청 ID 컨텍스트 (X-Request-ID)
+- 클라이언트가 보낸 X-Request-ID가 형식에 맞으면 그대로 사용, 없으면 새로 발급
+- contextvar에 두므로 asyncio.to_thread 워커에서도 같은 ID를 조회할 수 있음
+- 응답 헤더로 돌려주어 프로파일/로그/추적 결과를 요청 단위로 찾을 수 있게 함
+"""
+
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# 파일명/헤더에 그대로 써도 안전한 형식만 허용
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{8,64}$")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def is_valid_request_id(value: Optional[str]) -> bool:
+    return bool(value) and _REQUEST_ID_RE.match(value) is not None
+
+
+def get_header(scope, name: bytes) -> Optional[str]:
+    """ASGI scope에서 헤더 값 조회 (name은 소문자 bytes)"""
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RequestContextMiddleware:
+    """요청 ID를 contextvar에 설정하고 응답에 X-Request-ID 헤더 추가 (순수 ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        incoming = get_header(scope, REQUEST_ID_HEADER)
+        request_id = incoming if is_valid_request_id(incoming) else new_request_id()
+        token = _request_id.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_id.reset(token)
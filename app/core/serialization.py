@@ -0,0 +1,67 @@
+# app/core/serialization.py
+"""
+응답 JSON 인코딩 및 필드 선택
+- orjson 설치 시 한 번에 bytes로 인코딩 (tuple, numpy 스칼라/배열, datetime 직접 처리)
+  미설치 시 표준 json으로 대체 (공백 없는 구분자, 한글 그대로)
+- 그 외 타입은 기존 json.dumps(default=str)와 같이 문자열로 기록
+- select_fields: "a,b.c" 형식의 점 경로 목록으로 dict 일부만 골라냄 (필드 선택 응답용)
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """기본 인코더가 처리하지 못하는 값 (numpy 값은 파이썬 값으로, 나머지는 문자열로)"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def parse_fields(fields: Optional[str]) -> List[List[str]]:
+    """"interpretation,gpt_analysis.emotion" → [["interpretation"], ["gpt_analysis", "emotion"]]"""
+    if not fields:
+        return []
+    return [path.strip().split(".") for path in fields.split(",") if path.strip()]
+
+
+def select_fields(data: Dict[str, Any], paths: Iterable[List[str]]) -> Dict[str, Any]:
+    """점 경로로 지정한 필드만 남긴 새 dict (없는 경로는 무시, 원본은 수정하지 않음)"""
+    selected: Dict[str, Any] = {}
+    for path in paths:
+        value = data
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            source, target = data, selected
+            for key in path[:-1]:
+                source = source[key]
+                child = target.get(key)
+                if child is source:
+                    # 상위 필드 전체가 이미 선택됨
+                    break
+                target = child if child is not None else target.setdefault(key, {})
+            else:
+                target[path[-1]] = value
+    return selected
@@ -0,0 +1,179 @@
+# app/core/timing.py
+"""
+요청별 단계 시간 집계 (Server-Timing 헤더 / metadata.timings)
+- 요청마다 RequestTimings를 contextvar에 두고 파이프라인 각 단계가 시간을 누적
+- asyncio.to_thread는 컨텍스트를 복사하므로 워커 스레드의 기록도 같은 객체에 모임
+- overlap 모드에서는 GPT 시간이 탐지 시간과 겹칠 수 있음 (단계 합 ≠ 전체 시간)
+- tracemalloc 사용 시 단계별 메모리 피크(구간 시작 대비 최대 증가량)도 함께 집계
+- metadata.timings는 응답 본문을 인코딩하기 전에 만들어지므로 serialize(인코딩/압축) 단계를 포함하지 않음
+  serialize는 본문이 완성된 뒤 보내는 Server-Timing 헤더에만 기록 (view와 무관하게 항상 포함)
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+# 응답에 노출하는 단계 (순서 유지)
+PHASES = ("upload", "decode", "detect", "rules", "gpt", "serialize")
+
+# metadata.timings에 넣는 단계 (본문 인코딩 전에 끝나는 단계만)
+BODY_PHASES = tuple(phase for phase in PHASES if phase != "serialize")
+
+# 메트릭 단계(step) → 응답 단계(phase)
+STEP_PHASES = {
+    "upload_read": "upload",
+    "canvas_rasterize": "upload",
+    "image_decode": "decode",
+    "model_load": "detect",
+    "preprocess": "detect",
+    "inference": "detect",
+    "postprocess": "detect",
+    "yolo_predict": "detect",
+    "geometry_analysis": "rules",
+    "rule_interpretation": "rules",
+    "gpt_call": "gpt",
+    "response_serialize": "serialize",
+    "response_compress": "serialize",
+}
+
+
+class RequestTimings:
+    """요청 하나의 단계별 시간, 메모리 피크, GPT 토큰 사용량, 캐시 적중 여부"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.memory: Dict[str, int] = {}
+        self.gpt = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        self.cache: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_memory(self, phase: str, peak_bytes: int):
+        with self._lock:
+            self.memory[phase] = max(self.memory.get(phase, 0), peak_bytes)
+
+    def add_gpt_usage(self, usage: Any):
+        with self._lock:
+            self.gpt["calls"] += 1
+            if usage is None:
+                return
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                self.gpt[key] += getattr(usage, key, 0) or 0
+
+    def mark_cache(self, layer: str, hit: bool):
+        # 같은 계층을 여러 번 거치면 한 번이라도 미스면 미스로 표시
+        with self._lock:
+            self.cache[layer] = self.cache.get(layer, True) and hit
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def snapshot(self) -> Dict[str, Any]:
+        """metadata.timings (ms, serialize 제외 - total도 인코딩 전 시점까지)"""
+        with self._lock:
+            snapshot = {phase: round(self.phases[phase] * 1000, 2) for phase in BODY_PHASES if phase in self.phases}
+            snapshot["total"] = round(self.elapsed() * 1000, 2)
+            if self.memory:
+                snapshot["memory_peak_kb"] = {
+                    phase: round(self.memory[phase] / 1024, 1) for phase in BODY_PHASES if phase in self.memory
+                }
+            if self.gpt["calls"]:
+                snapshot["gpt_usage"] = dict(self.gpt)
+            if self.cache:
+                snapshot["cache"] = dict(self.cache)
+        return snapshot
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값"""
+        with self._lock:
+            parts = [f"{phase};dur={self.phases[phase] * 1000:.1f}" for phase in PHASES if phase in self.phases]
+            if self.gpt["calls"]:
+                parts.append(f'gpt-tokens;desc="{self.gpt["total_tokens"]}"')
+            for layer, hit in self.cache.items():
+                parts.append(f'cache-{layer.replace("_", "-")};desc="{"hit" if hit else "miss"}"')
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timing() -> RequestTimings:
+    """현재 컨텍스트(요청/배치 항목)에 새 타이밍 집계 시작"""
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def record_step(step: str, seconds: float):
+    timings = _current.get()
+    phase = STEP_PHASES.get(step)
+    if timings is not None and phase is not None:
+        timings.add(phase, seconds)
+
+
+def record_memory_peak(step: str, peak_bytes: int):
+    timings = _current.get()
+    phase = STEP_PHASES.get(step)
+    if timings is not None and phase is not None:
+        timings.add_memory(phase, peak_bytes)
+
+
+def record_gpt_usage(usage: Any):
+    timings = _current.get()
+    if timings is not None:
+        timings.add_gpt_usage(usage)
+
+
+def record_cache_layer(layer: str, hit: bool):
+    timings = _current.get()
+    if timings is not None:
+        timings.mark_cache(layer, hit)
+
+
+def attach_timings(response: Dict[str, Any]) -> Dict[str, Any]:
+    """응답 dict의 metadata에 timings/processing_time(초) 추가"""
+    timings = _current.get()
+    if timings is None:
+        return response
+    metadata = response.get("metadata") or {}
+    metadata["timings"] = timings.snapshot()
+    metadata["processing_time"] = round(timings.elapsed(), 4)
+    response["metadata"] = metadata
+    return response
+
+
+class ServerTimingMiddleware:
+    """요청별 타이밍 집계를 시작하고 응답 시작 시 Server-Timing 헤더 추가 (순수 ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,467 @@
+# app/core/tracing.py
+"""
+분산 추적 (OpenTelemetry 형식 span)
+- 요청(server span) → 분석기/파이프라인 단계 → GPT 호출 / DB 서버 호출(client span) 계층
+- W3C traceparent 헤더로 수신 요청의 trace를 잇고, DB 서버 호출에 전파
+- 현재 span은 contextvar에 두므로 asyncio.to_thread / copy_context 워커에서도 부모가 이어짐
+- 익스포터 교체 가능 (TRACE_EXPORTER): file(JSON Lines), console(로그), otlp(OTLP/HTTP JSON),
+  "패키지.모듈:클래스" 또는 register_exporter로 등록한 이름
+- TRACE_EXPORTER 미설정 시 모든 span 호출은 아무 일도 하지 않는 공용 객체를 반환 (오버헤드 없음)
+"""
+
+import functools
+import importlib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import (
+    TRACE_EXPORTER,
+    TRACE_FILE_PATH,
+    TRACE_OTLP_ENDPOINT,
+    TRACE_SAMPLE_RATE,
+    TRACE_SERVICE_NAME,
+    TRACE_QUEUE_SIZE,
+    TRACE_EXPORT_BATCH_SIZE,
+    TRACE_EXPORT_INTERVAL,
+)
+from .request_context import current_request_id, get_header
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+class Span:
+    """진행 중인 작업 단위 하나 (끝날 때 샘플링된 span만 익스포트)"""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "sampled", "attributes",
+                 "events", "status", "status_message", "start_ns", "end_ns")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], sampled: bool,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.status = "unset"
+        self.status_message = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        if attributes:
+            self.set_attributes(attributes)
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value if isinstance(value, (str, bool, int, float)) else str(value)
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes or {}})
+
+    def record_exception(self, exc: BaseException):
+        self.status = "error"
+        self.status_message = f"{type(exc).__name__}: {exc}"
+        self.add_event("exception", {"exception.type": type(exc).__name__, "exception.message": str(exc)})
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "status": self.status,
+            "status_message": self.status_message,
+            "attributes": self.attributes,
+            "events": self.events,
+            "resource": {"service.name": TRACE_SERVICE_NAME},
+        }
+
+
+class _NoopSpan:
+    """추적 비활성 시 사용하는 공용 span"""
+
+    trace_id = None
+    sampled = False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def add_event(self, name, attributes=None):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+    def traceparent(self):
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# === 익스포터 ===
+
+class FileSpanExporter:
+    """span을 JSON Lines로 파일에 추가 (오프라인 분석용)"""
+
+    def __init__(self, path=TRACE_FILE_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Dict[str, Any]]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False) + "\n")
+
+    def shutdown(self):
+        pass
+
+
+class ConsoleSpanExporter:
+    """span을 로그로 출력 (개발용)"""
+
+    def export(self, spans: List[Dict[str, Any]]):
+        for span in spans:
+            logger.info(f"span {span['name']} {span['duration_ms']}ms trace={span['trace_id']} {span['attributes']}")
+
+    def shutdown(self):
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OTLPHttpSpanExporter:
+    """OTLP/HTTP JSON으로 수집기(OpenTelemetry Collector, Jaeger, Tempo 등)에 전송"""
+
+    def __init__(self, endpoint: str = TRACE_OTLP_ENDPOINT, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def encode(self, spans: List[Dict[str, Any]]) -> bytes:
+        otlp_spans = []
+        for span in spans:
+            otlp_span = {
+                "traceId": span["trace_id"],
+                "spanId": span["span_id"],
+                "name": span["name"],
+                "kind": _OTLP_KINDS.get(span["kind"], 1),
+                "startTimeUnixNano": str(span["start_time_unix_nano"]),
+                "endTimeUnixNano": str(span["end_time_unix_nano"]),
+                "attributes": _otlp_attributes(span["attributes"]),
+                "events": [
+                    {"name": e["name"], "timeUnixNano": str(e["time_ns"]), "attributes": _otlp_attributes(e["attributes"])}
+                    for e in span["events"]
+                ],
+                "status": {"code": 2, "message": span["status_message"] or ""} if span["status"] == "error" else {},
+            }
+            if span["parent_span_id"]:
+                otlp_span["parentSpanId"] = span["parent_span_id"]
+            otlp_spans.append(otlp_span)
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": TRACE_SERVICE_NAME})},
+                "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": otlp_spans}],
+            }]
+        }
+        return json.dumps(payload).encode("utf-8")
+
+    def export(self, spans: List[Dict[str, Any]]):
+        request = urllib.request.Request(
+            self.endpoint, data=self.encode(spans), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def shutdown(self):
+        pass
+
+
+EXPORTERS: Dict[str, Callable[[], Any]] = {
+    "file": FileSpanExporter,
+    "console": ConsoleSpanExporter,
+    "otlp": OTLPHttpSpanExporter,
+}
+
+
+def register_exporter(name: str, factory: Callable[[], Any]):
+    """사용자 정의 익스포터 등록 (export(spans: list[dict]), shutdown() 구현)"""
+    EXPORTERS[name] = factory
+
+
+def create_exporter(name: str):
+    if not name or name == "none":
+        return None
+    if name in EXPORTERS:
+        return EXPORTERS[name]()
+    module_name, _, attr = name.partition(":")
+    if not attr:
+        raise ValueError(f"알 수 없는 TRACE_EXPORTER: {name}")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+class BatchSpanProcessor:
+    """끝난 span을 큐에 모아 백그라운드 스레드에서 일괄 익스포트 (요청 경로를 막지 않음)"""
+
+    def __init__(self, exporter, maxsize: int = TRACE_QUEUE_SIZE, batch_size: int = TRACE_EXPORT_BATCH_SIZE,
+                 interval: float = TRACE_EXPORT_INTERVAL):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize)
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def on_end(self, span: Span):
+        if self._thread is None:
+            self._start()
+        try:
+            self.queue.put_nowait(span.to_dict())
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            if batch:
+                self._export(batch)
+        # 종료 시 남은 span 마저 전송
+        remaining = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                remaining.append(item)
+        if remaining:
+            self._export(remaining)
+
+    def _export(self, batch: List[Dict[str, Any]]):
+        try:
+            self.exporter.export(batch)
+            self.exported += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"span 익스포트 실패 ({len(batch)}개): {e}")
+
+    def shutdown(self, timeout: float = 5.0):
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+        self.exporter.shutdown()
+
+
+# === 추적기 ===
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]):
+    """(trace_id, parent_span_id, sampled) 또는 None"""
+    match = _TRACEPARENT_RE.match((value or "").strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), int(match.group(3), 16) & 1 == 1
+
+
+class Tracer:
+    def __init__(self, exporter_name: str = TRACE_EXPORTER, sample_rate: float = TRACE_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        try:
+            exporter = create_exporter(exporter_name)
+        except Exception as e:
+            logger.error(f"추적 익스포터 생성 실패 ({exporter_name}), 추적 비활성화: {e}")
+            exporter = None
+        self.processor = BatchSpanProcessor(exporter) if exporter is not None else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def start(self, name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal",
+              traceparent: Optional[str] = None) -> Span:
+        parent = _current_span.get()
+        remote = parse_traceparent(traceparent) if traceparent else None
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+        elif parent is not None:
+            trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        else:
+            trace_id, parent_id, sampled = os.urandom(16).hex(), None, random.random() < self.sample_rate
+        return Span(name, kind, trace_id, parent_id, sampled, attributes)
+
+    def end(self, span: Span):
+        span.end_ns = time.time_ns()
+        if span.sampled:
+            self.processor.on_end(span)
+
+    def shutdown(self):
+        if self.processor is not None:
+            self.processor.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        if self.processor is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "exporter": type(self.processor.exporter).__name__,
+            "sample_rate": self.sample_rate,
+            "queued": self.processor.queue.qsize(),
+            "exported": self.processor.exported,
+            "dropped": self.processor.dropped,
+            "failed": self.processor.failed,
+        }
+
+
+tracer = Tracer()
+
+
+@contextmanager
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal",
+               traceparent: Optional[str] = None):
+    """with 블록을 span으로 기록 (예외는 error 상태로 남기고 다시 전파)"""
+    if not tracer.enabled:
+        yield NOOP_SPAN
+        return
+    span = tracer.start(name, attributes, kind, traceparent)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.record_exception(e)
+        raise
+    except BaseException:
+        # 취소(헤징에서 진 요청 등)는 오류로 보지 않음
+        span.set_attribute("cancelled", True)
+        raise
+    finally:
+        _current_span.reset(token)
+        tracer.end(span)
+
+
+def traced(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """함수 호출 전체를 span으로 기록하는 데코레이터"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with start_span(name, attributes):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+def set_span_attribute(key: str, value: Any):
+    current_span().set_attribute(key, value)
+
+
+def add_span_event(name: str, attributes: Optional[Dict[str, Any]] = None):
+    current_span().add_event(name, attributes)
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+    """현재 span의 traceparent를 헤더에 추가 (추적 중이 아니면 그대로 반환)"""
+    traceparent = current_span().traceparent()
+    if traceparent is None:
+        return headers
+    return {**(headers or {}), "traceparent": traceparent}
+
+
+class TracingMiddleware:
+    """요청마다 server span을 열고 수신 traceparent를 이어받음 (순수 ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            return await self.app(scope, receive, send)
+
+        method = scope.get("method", "GET")
+        attributes = {
+            "http.request.method": method,
+            "url.path": scope.get("path"),
+            "request.id": current_request_id(),
+        }
+        with start_span(method, attributes, kind="server", traceparent=get_header(scope, b"traceparent")) as span:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "error"
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-trace-id", span.trace_id.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None and getattr(route, "path", None):
+                    span.name = f"{method} {route.path}"
+                    span.set_attribute("http.route", route.path)
@@ -1,7 +1,7 @@
 # main.py
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.responses import Response
 from dotenv import load_dotenv
 import sys
 import os
@@ -11,26 +11,90 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from .api.analyze_router import router as analyze_router
 from .api.user_router import router as user_router
+from .api.live_router import router as live_router
+from .api.history_router import router as history_router
+from .api.profile_router import router as profile_router
+from .services.db_client import db_client
+from .services.game_clear_queue import game_clear_queue
+from .services.health_prober import health_prober
+from .services.result_persistence import result_persistence
+from .services.upload_store import upload_store
+from .core.config import GAME_CLEAR_WRITE_BEHIND
+from .core.metrics import MetricsMiddleware, TimedJSONResponse, CONTENT_TYPE_LATEST, generate_latest
+from .core.timing import ServerTimingMiddleware
+from .core.profiling import ProfilingMiddleware
+from .core.tracing import TracingMiddleware, tracer
+from .core.memory import memory_tracker
+from .core.memory_guard import MemoryGuardMiddleware, memory_reporter
+from .core.request_context import RequestContextMiddleware
+from .core.cors import CORSMiddleware
+from .core.compression import GZipMiddleware
+from .core.log import setup_logging, shutdown_logging
 
 # 환경변수 로드
 load_dotenv()
 
+# 로깅 (큐 기반 비동기 출력, LOG_LEVEL/LOG_FORMAT)
+setup_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 수명 주기 - DB 서버 공유 연결 풀 및 백그라운드 작업 생성/정리"""
+    memory_tracker.start()
+    if upload_store.enabled:
+        upload_store.sweep()
+    await db_client.start()
+    if GAME_CLEAR_WRITE_BEHIND:
+        await game_clear_queue.start()
+    await health_prober.start()
+    if result_persistence.enabled:
+        await result_persistence.start()
+    await memory_reporter.start()
+    yield
+    await memory_reporter.stop()
+    if result_persistence.enabled:
+        await result_persistence.stop()
+    await health_prober.stop()
+    if GAME_CLEAR_WRITE_BEHIND:
+        await game_clear_queue.stop()
+    await db_client.close()
+    tracer.shutdown()
+    memory_tracker.stop()
+    shutdown_logging()
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="Drawing Analysis API",
     description="API for analyzing drawings using YOLOv8 and GPT",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse
 )
 
-# CORS 설정 - 모든 요청 허용
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=False,  # credentials를 false로 설정
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
-    expose_headers=["*"]
-)
+# 큰 JSON 응답 gzip 압축 (RESPONSE_GZIP_MIN_SIZE) - 압축 시간도 serialize 단계에 포함되도록 가장 안쪽에 둠
+app.add_middleware(GZipMiddleware)
+
+# 단계별 처리 시간 (Server-Timing 헤더, metadata.timings)
+app.add_middleware(ServerTimingMiddleware)
+
+# 메모리 예산 가드 (MEMORY_BUDGET_MB 설정 시 분석 요청 대기/거절) - 거절도 메트릭에 기록되도록 안쪽에 둠
+app.add_middleware(MemoryGuardMiddleware)
+
+# 요청 처리 시간 및 엔드포인트 레이블 (Prometheus)
+app.add_middleware(MetricsMiddleware)
+
+# 요청 단위 프로파일링 (관리자 토큰 / 무작위 샘플링)
+app.add_middleware(ProfilingMiddleware)
+
+# 분산 추적 (요청별 server span, traceparent 수신/전파) - TRACE_EXPORTER 미설정 시 비활성
+app.add_middleware(TracingMiddleware)
+
+# CORS 및 프리플라이트/전역 OPTIONS 처리 (CORS_* 설정, 기본은 모든 출처 허용 + credentials 없음)
+# 프리플라이트는 추적/메트릭/프로파일링을 거치지 않고 여기서 바로 응답
+app.add_middleware(CORSMiddleware)
+
+# 요청 ID (X-Request-ID) - 프로파일링·메트릭보다 바깥에서 설정해 모든 단계가 같은 ID를 사용
+app.add_middleware(RequestContextMiddleware)
 
 # 분석 라우터 등록
 app.include_router(analyze_router, prefix="/api")
@@ -38,21 +102,19 @@ app.include_router(analyze_router, prefix="/api")
 # 사용자 관리 라우터 등록
 app.include_router(user_router, prefix="/api")
 
-# 전역 OPTIONS 처리
-@app.middleware("http")
-async def add_cors_headers(request: Request, call_next):
-    if request.method == "OPTIONS":
-        response = JSONResponse(content={"message": "OK"})
-        response.headers["Access-Control-Allow-Origin"] = "*"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "*"
-        return response
-    
-    response = await call_next(request)
-    response.headers["Access-Control-Allow-Origin"] = "*"
-    response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "*"
-    return response
+# 실시간 드로잉 피드백 (WebSocket) 라우터 등록
+app.include_router(live_router, prefix="/api")
+
+# 사용자별 분석 이력 라우터 등록
+app.include_router(history_router, prefix="/api")
+
+# 요청 단위 프로파일 조회 라우터 등록 (관리자 전용)
+app.include_router(profile_router, prefix="/api")
+
+# Prometheus 메트릭 엔드포인트
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 # 헬스체크 엔드포인트
 @app.get("/")
@@ -1,10 +1,16 @@
+import logging
+
 from ..models.yolov8_detector import detect_objects
 from ..models.gpt_analyzer import gpt_analyzer
 from ..models.htp_interpreter import run_full_interpretation
 from ..models.image_check import is_image_valid
+from ..models.confidence_analyzer import combine_interpretations, start_speculative_gpt, cancel_speculative_gpt
 from ...core.config import YOLO_MODELS
+from ...core.metrics import observe_duration
+from ...core.tracing import traced
 from PIL import Image
 
+logger = logging.getLogger(__name__)
 
 # class 이름 매핑 (모델 → GPT-friendly)
 LABEL_MAP = {
@@ -14,10 +20,13 @@ LABEL_MAP = {
 }
 REQUIRED_OBJECTS = set(LABEL_MAP.keys())  # 필수 탐지 클래스 (htp.pt 기준)
 
-def analyze_htp_image(image_path: str, description: str, model_path: str = None):
+@traced("analysis.htp", {"analysis.model": "htp", "analysis.stage": 0})
+def analyze_htp_image(image_path: str, description: str, model_path: str = None, detection_results=None,
+                      defer_gpt: bool = False, overlap_gpt: bool = False):
     """
     HTP 이미지 분석 - 안전한 에러 처리 포함
     """
+    gpt_future = None
     try:
         # config에서 모델 경로 가져오기
         if model_path is None:
@@ -29,14 +38,11 @@ def analyze_htp_image(image_path: str, description: str, model_path: str = None)
         if not os.path.isabs(normalized_path):
             normalized_path = os.path.abspath(normalized_path)
         
-        print(f"📍 HTP 분석 시작:")
-        print(f"   원본 경로: {image_path}")
-        print(f"   정규화된 경로: {normalized_path}")
-        print(f"   파일 존재: {os.path.exists(normalized_path)}")
+        logger.debug("HTP 분석 시작: 원본 경로 %s, 정규화된 경로 %s", image_path, normalized_path)
         
         # 파일 존재 확인
         if not os.path.exists(normalized_path):
-            print(f"❌ 이미지 파일이 존재하지 않음: {normalized_path}")
+            logger.warning(f"이미지 파일이 존재하지 않음: {normalized_path}")
             # 파일이 없어도 GPT 텍스트 분석 시도
             gpt_response = gpt_analyzer.analyze_drawing(
                 stage=0,
@@ -62,26 +68,34 @@ def analyze_htp_image(image_path: str, description: str, model_path: str = None)
                 "emotion_confidence": gpt_response.get("emotion_confidence", 0.3)
             }
         
-        results = detect_objects(normalized_path, model_path=model_path, model_name="htp", conf=0.4)
+        # 투기적 실행: GPT Vision 호출(이미지 인코딩 포함)을 탐지와 동시에 시작
+        if overlap_gpt and not defer_gpt and detection_results is None:
+            gpt_future = start_speculative_gpt(normalized_path, description, 0)
+        
+        # 배치 분석 등에서 미리 탐지한 결과가 있으면 재사용
+        if detection_results is not None:
+            results = detection_results
+        else:
+            results = detect_objects(normalized_path, model_path=model_path, model_name="htp", conf=0.4)
         
         # 신뢰도 기반 분기 분석 수행
         from ..models.confidence_analyzer import analyze_with_confidence_branching
         
         # 안전한 results 처리
         if results is None or not hasattr(results, 'boxes') or results.boxes is None:
-            print("⚠️ YOLO 탐지 결과 없음 - 텍스트 분석으로 진행")
-            return analyze_with_confidence_branching(None, normalized_path, description, 0)
+            logger.info("YOLO 탐지 결과 없음 - 텍스트 분석으로 진행")
+            return analyze_with_confidence_branching(None, normalized_path, description, 0, defer_gpt, gpt_future)
         
         boxes = results.boxes
         
         # boxes가 비어있는 경우 처리
         if not boxes or len(boxes) == 0 or (hasattr(boxes, 'cls') and len(boxes.cls) == 0):
-            print("⚠️ 탐지된 객체 없음 - 텍스트 분석으로 진행")
-            return analyze_with_confidence_branching(None, normalized_path, description, 0)
+            logger.info("탐지된 객체 없음 - 텍스트 분석으로 진행")
+            return analyze_with_confidence_branching(None, normalized_path, description, 0, defer_gpt, gpt_future)
         
         # 신뢰도 기반 분기 분석 수행
-        print(f"🎯 신뢰도 기반 HTP 분석 시작")
-        result = analyze_with_confidence_branching(results, normalized_path, description, 0)
+        result = analyze_with_confidence_branching(results, normalized_path, description, 0, defer_gpt, gpt_future)
+        result["detected_class_ids"] = sorted({int(cls) for cls in boxes.cls})
         
         # HTP 특화 정보 추가 및 interpreter 적용
         result["analysis_type"] = "htp"
@@ -98,8 +112,7 @@ def analyze_htp_image(image_path: str, description: str, model_path: str = None)
                 htp_position = {}
                 htp_size = {}
                 
-                print(f"🔍 디버그 - position_dict: {position_dict}")
-                print(f"🔍 디버그 - size_dict: {size_dict}")
+                logger.debug("position_dict: %s, size_dict: %s", position_dict, size_dict)
                 
                 for key, value in position_dict.items():
                     if key in ["person", "사람전체"]:
@@ -117,11 +130,11 @@ def analyze_htp_image(image_path: str, description: str, model_path: str = None)
                     elif key in ["tree", "나무전체"]:
                         htp_size["tree"] = value
                 
-                print(f"🔍 디버그 - htp_position: {htp_position}")
-                print(f"🔍 디버그 - htp_size: {htp_size}")
+                logger.debug("htp_position: %s, htp_size: %s", htp_position, htp_size)
                 
                 # HTP interpreter 실행
-                htp_interpretation = run_full_interpretation(htp_position, htp_size)
+                with observe_duration("rule_interpretation", "htp", 0):
+                    htp_interpretation = run_full_interpretation(htp_position, htp_size)
                 
                 # rule_based_interpretation 업데이트
                 result["rule_based_interpretation"] = {
@@ -131,15 +144,20 @@ def analyze_htp_image(image_path: str, description: str, model_path: str = None)
                     "size_analysis": htp_size
                 }
                 
-                print(f"✅ HTP Interpreter 해석 완료: {len(htp_interpretation)}개 해석")
+                logger.debug(f"HTP Interpreter 해석 완료: {len(htp_interpretation)}개 해석")
+                
+                # GPT 지연 모드에서는 갱신된 구조적 해석을 즉시 응답용 해석으로 사용
+                if result.get("gpt_pending"):
+                    result["interpretation"] = combine_interpretations(result["rule_based_interpretation"], {})
                 
             except Exception as e:
-                print(f"⚠️ HTP Interpreter 오류: {e}")
+                logger.warning(f"HTP Interpreter 오류: {e}")
         
         return result
         
     except Exception as e:
-        print(f"❌ HTP 분석 중 오류: {e}")
+        logger.exception(f"HTP 분석 중 오류: {e}")
+        cancel_speculative_gpt(gpt_future)
         return {
             "success": False,
             "error": str(e),
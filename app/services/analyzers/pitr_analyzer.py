@@ -1,17 +1,27 @@
+import logging
+
 from ..models.yolov8_detector import detect_objects
 from ..models.gpt_analyzer import gpt_analyzer
 from ..models.pitr_interpreter import interpret_pitr
 from ..models.image_check import is_image_valid
+from ..models.confidence_analyzer import combine_interpretations, start_speculative_gpt, cancel_speculative_gpt
 from ...core.config import YOLO_MODELS
+from ...core.metrics import observe_duration
+from ...core.tracing import traced
 from PIL import Image
 
+logger = logging.getLogger(__name__)
+
 # 클래스 이름 매핑 (PITR 모델 기준)
 REQUIRED_LABELS = {"person", "rain"}
 
-def analyze_pitr(image_path: str, description: str, model_path: str = None):
+@traced("analysis.pitr", {"analysis.model": "pitr", "analysis.stage": 1})
+def analyze_pitr(image_path: str, description: str, model_path: str = None, detection_results=None,
+                 defer_gpt: bool = False, overlap_gpt: bool = False):
     """
     PITR 분석 - 안전한 에러 처리 포함
     """
+    gpt_future = None
     try:
         # config에서 모델 경로 가져오기
         if model_path is None:
@@ -23,14 +33,11 @@ def analyze_pitr(image_path: str, description: str, model_path: str = None):
         if not os.path.isabs(normalized_path):
             normalized_path = os.path.abspath(normalized_path)
         
-        print(f"📍 PITR 분석 시작:")
-        print(f"   원본 경로: {image_path}")
-        print(f"   정규화된 경로: {normalized_path}")
-        print(f"   파일 존재: {os.path.exists(normalized_path)}")
+        logger.debug("PITR 분석 시작: 원본 경로 %s, 정규화된 경로 %s", image_path, normalized_path)
         
         # 파일 존재 확인
         if not os.path.exists(normalized_path):
-            print(f"❌ 이미지 파일이 존재하지 않음: {normalized_path}")
+            logger.warning(f"이미지 파일이 존재하지 않음: {normalized_path}")
             # 파일이 없어도 GPT 텍스트 분석 시도
             gpt_response = gpt_analyzer.analyze_drawing(
                 stage=1,
@@ -55,26 +62,34 @@ def analyze_pitr(image_path: str, description: str, model_path: str = None):
                 "emotion_confidence": gpt_response.get("emotion_confidence", 0.3)
             }
         
-        results = detect_objects(normalized_path, model_path=model_path, model_name="pitr", conf=0.4)
+        # 투기적 실행: GPT Vision 호출(이미지 인코딩 포함)을 탐지와 동시에 시작
+        if overlap_gpt and not defer_gpt and detection_results is None:
+            gpt_future = start_speculative_gpt(normalized_path, description, 1)
+        
+        # 배치 분석 등에서 미리 탐지한 결과가 있으면 재사용
+        if detection_results is not None:
+            results = detection_results
+        else:
+            results = detect_objects(normalized_path, model_path=model_path, model_name="pitr", conf=0.4)
         
         # 신뢰도 기반 분기 분석 수행
         from ..models.confidence_analyzer import analyze_with_confidence_branching
         
         # 안전한 results 처리
         if results is None or not hasattr(results, 'boxes') or results.boxes is None:
-            print("⚠️ YOLO 탐지 결과 없음 - 텍스트 분석으로 진행")
-            return analyze_with_confidence_branching(None, normalized_path, description, 1)
+            logger.info("YOLO 탐지 결과 없음 - 텍스트 분석으로 진행")
+            return analyze_with_confidence_branching(None, normalized_path, description, 1, defer_gpt, gpt_future)
         
         boxes = results.boxes
         
         # 빈 boxes 처리
         if not boxes or len(boxes) == 0 or (hasattr(boxes, 'cls') and len(boxes.cls) == 0):
-            print("⚠️ 탐지된 객체 없음 - 텍스트 분석으로 진행")
-            return analyze_with_confidence_branching(None, normalized_path, description, 1)
+            logger.info("탐지된 객체 없음 - 텍스트 분석으로 진행")
+            return analyze_with_confidence_branching(None, normalized_path, description, 1, defer_gpt, gpt_future)
         
         # 신뢰도 기반 분기 분석 수행
-        print(f"🎯 신뢰도 기반 PITR 분석 시작")
-        result = analyze_with_confidence_branching(results, normalized_path, description, 1)
+        result = analyze_with_confidence_branching(results, normalized_path, description, 1, defer_gpt, gpt_future)
+        result["detected_class_ids"] = sorted({int(cls) for cls in boxes.cls})
         
         # PITR 특화 정보 추가 및 interpreter 적용
         result["analysis_type"] = "pitr"
@@ -102,25 +117,33 @@ def analyze_pitr(image_path: str, description: str, model_path: str = None):
                     image_size = img.size
                     
                     # PITR interpreter 실행
-                    pitr_interpretation = interpret_pitr(detections, image_size)
+                    with observe_duration("rule_interpretation", "pitr", 1):
+                        pitr_interpretation = interpret_pitr(detections, image_size)
                     
                     # rule_based_interpretation 업데이트
                     result["rule_based_interpretation"] = {
                         "method": "pitr_interpreter",
                         "status": pitr_interpretation.get("status", "success"),
                         "interpretations": pitr_interpretation.get("analysis", []),
-                        "detected_elements": detected_objects
+                        "detected_elements": detected_objects,
+                        "stress_score": pitr_interpretation.get("stress_score")
                     }
+                    result["stress_score"] = pitr_interpretation.get("stress_score")
+                    
+                    logger.debug("PITR Interpreter 해석 완료")
                     
-                    print(f"✅ PITR Interpreter 해석 완료")
+                    # GPT 지연 모드에서는 갱신된 구조적 해석을 즉시 응답용 해석으로 사용
+                    if result.get("gpt_pending"):
+                        result["interpretation"] = combine_interpretations(result["rule_based_interpretation"], {})
                 
             except Exception as e:
-                print(f"⚠️ PITR Interpreter 오류: {e}")
+                logger.warning(f"PITR Interpreter 오류: {e}")
         
         return result
         
     except Exception as e:
-        print(f"❌ PITR 분석 중 오류: {e}")
+        logger.exception(f"PITR 분석 중 오류: {e}")
+        cancel_speculative_gpt(gpt_future)
         return {
             "success": False,
             "error": str(e),
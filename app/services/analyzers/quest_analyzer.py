@@ -1,15 +1,23 @@
-from ..models.yolov8_detector import detect_objects
+from ..models.yolov8_detector import detect_objects, detect_objects_in_image, resolve_model_path
+from ..image_check import class_mask, check_required_mask
 from ..models.image_check import check_required_classes
 from ..models.stage_logic import analyze_stage, analyze_quest_stage
 from ..models.gpt_analyzer import gpt_analyzer
 from ...core.config import HTP_CLASS_NAMES, STAGE_REQUIRED_CLASSES
+from ...core.tracing import traced, set_span_attribute
 from PIL import Image
+import logging
+import os
 
+logger = logging.getLogger(__name__)
+
+@traced("analysis.quest", {"analysis.model": "htp"})
 def analyze_quest(image_path: str, description: str, stage: int) -> dict:
     """
     12단계 Quest 분석: 객체 감지 + 설명 GPT 해석 + 조건 평가
     안전한 에러 처리 포함
     """
+    set_span_attribute("analysis.stage", stage)
     try:
         # 더 안전한 경로 처리
         from pathlib import Path
@@ -25,16 +33,11 @@ def analyze_quest(image_path: str, description: str, stage: int) -> dict:
         # 추가 정규화: 경로를 다시 Path 객체로 만들어 문자열로 변환
         final_path = str(Path(clean_path))
         
-        print(f"📍 Quest 분석 시작 (Stage {stage}):")
-        print(f"   원본 경로: {image_path}")
-        print(f"   Path 객체: {path_obj}")
-        print(f"   정규화된 경로: {normalized_path}")
-        print(f"   최종 경로: {final_path}")
-        print(f"   파일 존재: {os.path.exists(final_path)}")
+        logger.debug("Quest 분석 시작 (Stage %s): 원본 경로 %s, 최종 경로 %s", stage, image_path, final_path)
         
         # 파일 존재 확인
         if not os.path.exists(final_path):
-            print(f"❌ 이미지 파일이 존재하지 않음: {final_path}")
+            logger.warning(f"이미지 파일이 존재하지 않음: {final_path}")
             # 파일이 없어도 GPT 텍스트 분석 시도
             gpt_result = gpt_analyzer.analyze_drawing(
                 stage=stage,
@@ -60,13 +63,11 @@ def analyze_quest(image_path: str, description: str, stage: int) -> dict:
             }
         
         # 객체 감지 (최종 정리된 경로 사용) - 신뢰도 기반 분기
-        print(f"🔍 Quest Stage {stage} - YOLO 객체 탐지 시작")
         results = detect_objects(final_path, model_name="htp", conf=0.4)  # htp.pt 사용
         
         # 신뢰도 기반 분기 분석 수행
         from ..models.confidence_analyzer import analyze_with_confidence_branching
         
-        print(f"🎯 신뢰도 기반 Quest 분석 시작 (Stage {stage})")
         result = analyze_with_confidence_branching(results, final_path, description, stage)
         
         # Quest 특화 정보 추가
@@ -77,7 +78,7 @@ def analyze_quest(image_path: str, description: str, stage: int) -> dict:
         return result
         
     except Exception as e:
-        print(f"❌ Quest 분석 중 오류: {e}")
+        logger.exception(f"Quest 분석 중 오류: {e}")
         return {
             "success": False,
             "error": str(e),
@@ -92,4 +93,32 @@ def analyze_quest(image_path: str, description: str, stage: int) -> dict:
             "emotion": "happiness",
             "emotion_confidence": 0.3
         }
-     
\ No newline at end of file
+
+def precheck_quest_image(image_source, stage: int):
+    """
+    GPT 호출 전 필수 객체 사전 검사 (빠른 반려용)
+    - htp 모델 전체 클래스 탐지 (predict에 classes를 넘기지 않음 - 공유 predictor 설정 오염 방지,
+      같은 그림의 전체 분석과 탐지 캐시 공유)
+    - 미리 계산된 클래스 비트마스크로 필수 클래스 누락 판정
+    Args:
+        image_source: 이미지 파일 경로 또는 메모리상의 이미지(PIL/ndarray)
+    Returns:
+        check_required_mask 결과 + detected_class_ids, 모델을 사용할 수 없으면 None
+    """
+    if not os.path.exists(resolve_model_path(None, "htp")):
+        logger.warning("htp 모델 없음 - 필수 객체 사전 검사 생략")
+        return None
+    
+    required = STAGE_REQUIRED_CLASSES.get(stage, [])
+    if not required:
+        return {**check_required_mask(0, stage), "detected_class_ids": []}
+    
+    if isinstance(image_source, str):
+        results = detect_objects(image_source, model_name="htp", conf=0.4)
+    else:
+        results = detect_objects_in_image(image_source, model_name="htp", conf=0.4)
+    
+    detected_mask = class_mask(results.boxes.cls) if results.boxes else 0
+    status = check_required_mask(detected_mask, stage)
+    status["detected_class_ids"] = [cid for cid in required if detected_mask >> cid & 1]
+    return status
@@ -0,0 +1,186 @@
+# app/services/db_client.py
+"""
+DB 서버 프록시용 공유 HTTP 클라이언트
+- 앱 lifespan 동안 하나의 httpx.AsyncClient를 유지 (keep-alive 연결 재사용)
+- 연결 수 제한 및 HTTP/2 (h2 설치 시) 지원
+- 여러 업스트림(DB_SERVER_URLS) 간 부하 분산, 읽기 전용 요청은 복제본(DB_REPLICA_URLS)으로
+"""
+
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+from typing import List, Optional
+
+import httpx
+
+from ..core.config import (
+    DB_SERVER_URLS,
+    DB_REPLICA_URLS,
+    DB_HTTP_MAX_CONNECTIONS,
+    DB_HTTP_MAX_KEEPALIVE,
+    DB_HTTP_KEEPALIVE_EXPIRY,
+    DB_HTTP2,
+    DB_LB_EWMA_ALPHA,
+    DB_EJECT_FAILURES,
+    DB_EJECT_DURATION,
+)
+from ..core.tracing import inject_headers, set_span_attribute
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_enabled() -> bool:
+    if DB_HTTP2 in ("true", "1", "yes"):
+        return True
+    if DB_HTTP2 == "auto":
+        return importlib.util.find_spec("h2") is not None
+    return False
+
+
+class Upstream:
+    """업스트림 서버 하나의 부하/지연/상태"""
+
+    # 측정값이 없을 때의 초기 지연 추정치 (초)
+    INITIAL_LATENCY = 0.1
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.ewma = self.INITIAL_LATENCY
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def score(self) -> float:
+        """예상 대기 시간 = 지연 EWMA × (진행 중 요청 + 1)"""
+        return self.ewma * (self.outstanding + 1)
+
+    def record(self, latency: float, ok: bool, now: float):
+        self.ewma = DB_LB_EWMA_ALPHA * latency + (1 - DB_LB_EWMA_ALPHA) * self.ewma
+        self.requests += 1
+        if ok:
+            self.consecutive_failures = 0
+            return
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= DB_EJECT_FAILURES:
+            # 수동 헬스 체크: 연속 실패한 업스트림은 일정 시간 제외
+            self.ejected_until = now + DB_EJECT_DURATION
+            self.consecutive_failures = 0
+            logger.warning(f"DB 업스트림 일시 제외: {self.url} ({DB_EJECT_DURATION}s)")
+
+    def snapshot(self, now: float) -> dict:
+        return {
+            "url": self.url,
+            "outstanding": self.outstanding,
+            "ewma_ms": round(self.ewma * 1000, 1),
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejected": not self.available(now),
+        }
+
+
+class UpstreamPool:
+    """Power of two choices + EWMA×진행 중 요청 수 기반 업스트림 선택"""
+
+    def __init__(self, urls: List[str]):
+        self.upstreams = [Upstream(url) for url in urls]
+
+    def choose(self) -> Upstream:
+        now = time.monotonic()
+        candidates = [u for u in self.upstreams if u.available(now)]
+        if not candidates:
+            # 모두 제외된 경우 전체를 후보로 (제외가 전면 장애를 만들지 않도록)
+            candidates = self.upstreams
+        if len(candidates) == 1:
+            return candidates[0]
+        a, b = random.sample(candidates, 2)
+        return a if a.score() <= b.score() else b
+
+    def snapshot(self) -> list:
+        now = time.monotonic()
+        return [u.snapshot(now) for u in self.upstreams]
+
+
+class DBClient:
+    """DB 서버 공유 연결 풀"""
+
+    def __init__(self, urls: List[str] = DB_SERVER_URLS, replica_urls: List[str] = DB_REPLICA_URLS):
+        self.primaries = UpstreamPool(urls)
+        self.replicas = UpstreamPool(replica_urls) if replica_urls else self.primaries
+        self.base_url = self.primaries.upstreams[0].url
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        http2 = _http2_enabled()
+        limits = httpx.Limits(
+            max_connections=DB_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=DB_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=DB_HTTP_KEEPALIVE_EXPIRY,
+        )
+        logger.info(f"DB 서버 클라이언트 생성: {len(self.primaries.upstreams)}개 업스트림 (http2={http2}, max_connections={DB_HTTP_MAX_CONNECTIONS})")
+        return httpx.AsyncClient(limits=limits, http2=http2, timeout=10.0)
+
+    async def start(self):
+        """lifespan 시작 시 연결 풀 생성"""
+        if self._client is None:
+            self._client = self._create_client()
+
+    async def close(self):
+        """lifespan 종료 시 연결 풀 정리"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # lifespan 없이 사용되는 경우(스크립트 등)를 위해 지연 생성
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    async def request(self, method: str, path: str, read_only: bool = False, **kwargs) -> httpx.Response:
+        """업스트림을 골라 요청 (read_only면 복제본 풀 사용), 결과로 지연/상태 갱신"""
+        upstream = (self.replicas if read_only else self.primaries).choose()
+        upstream.outstanding += 1
+        started = time.monotonic()
+        ok = False
+        cancelled = False
+        set_span_attribute("server.address", upstream.url)
+        kwargs["headers"] = inject_headers(kwargs.get("headers"))
+        try:
+            response = await self.client.request(method, upstream.url + path, **kwargs)
+            ok = response.status_code < 500
+            set_span_attribute("http.response.status_code", response.status_code)
+            return response
+        except asyncio.CancelledError:
+            # 헤징에서 진 요청 등은 업스트림 실패로 보지 않음
+            cancelled = True
+            raise
+        finally:
+            upstream.outstanding -= 1
+            if not cancelled:
+                now = time.monotonic()
+                upstream.record(now - started, ok, now)
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    def snapshot(self) -> dict:
+        snapshot = {"primaries": self.primaries.snapshot()}
+        if self.replicas is not self.primaries:
+            snapshot["replicas"] = self.replicas.snapshot()
+        return snapshot
+
+
+# 전역 DB 서버 클라이언트 인스턴스
+db_client = DBClient()
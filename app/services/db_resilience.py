@@ -0,0 +1,350 @@
+# app/services/db_resilience.py
+"""
+DB 서버 호출 회복성 계층
+- 라우트별 정책: 멱등성에 따른 재시도, 전체 타임아웃 예산, 느린 읽기 요청 헤징
+- 라우트별 서킷 브레이커: DB 서버 장애 시 대기 없이 즉시 실패
+  (한 라우트의 실패가 다른 라우트를 막지 않음, 헬스 체크는 차단/집계 대상 아님)
+- 라우트별 업스트림 지연 히스토그램
+"""
+
+import asyncio
+import bisect
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+from ..core.config import DB_RETRY_BACKOFF, DB_BREAKER_FAILURE_THRESHOLD, DB_BREAKER_RESET_TIMEOUT
+from ..core.metrics import UPSTREAM_DURATION
+from ..core.tracing import start_span, set_span_attribute
+from .db_client import db_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """
+    업스트림 라우트 정책
+    - budget: 재시도와 헤징을 포함한 전체 시간 예산 (초)
+    - attempt_timeout: 시도 1회의 타임아웃 (초)
+    - retries: 추가 시도 횟수
+    - idempotent: 응답을 받지 못한 요청/5xx를 다시 보내도 안전한지
+    - hedge_after: 이 시간 안에 응답이 없으면 같은 요청을 하나 더 보냄 (멱등 라우트만)
+    - read_only: 복제본(DB_REPLICA_URLS)으로 보내도 되는 읽기 전용 요청인지 (서버 상태를 전혀 바꾸지 않는 라우트만)
+    - circuit_breaker: 라우트 서킷 브레이커 적용 여부 (False면 차단되지 않고 실패도 기록하지 않음)
+    """
+    budget: float
+    attempt_timeout: float
+    retries: int = 0
+    idempotent: bool = False
+    hedge_after: Optional[float] = None
+    read_only: bool = False
+    circuit_breaker: bool = True
+
+
+ROUTE_POLICIES: Dict[str, RoutePolicy] = {
+    # 회원가입은 중복 생성 위험 → 재시도 없음
+    "signup": RoutePolicy(budget=10.0, attempt_timeout=10.0),
+    # 로그인은 실패 횟수 제한/세션 발급 등 서버 측 상태를 바꿀 수 있음
+    # → 헤징 없음, 연결 실패(요청 미전송)만 재시도, 복제본이 아닌 주 서버로만 전송
+    "login": RoutePolicy(budget=5.0, attempt_timeout=5.0, retries=2),
+    # 게임 결과는 중복 기록 위험 → 연결 실패(요청 미전송)만 재시도
+    "game_clear": RoutePolicy(budget=10.0, attempt_timeout=5.0, retries=2),
+    # 헬스 체크는 서킷 상태와 무관하게 실제 연결을 확인해야 하고, 프로브 실패가 사용자 요청을 막으면 안 됨
+    "health": RoutePolicy(budget=3.0, attempt_timeout=1.5, retries=1, idempotent=True, hedge_after=0.3,
+                          circuit_breaker=False),
+}
+
+# 요청이 서버에 도달하지 않았음이 확실한 예외 (비멱등 라우트도 재시도 가능)
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class UpstreamUnavailable(Exception):
+    """DB 서버를 사용할 수 없음 (서킷 차단, 연결 실패, 시간 예산 초과)"""
+
+    def __init__(self, reason: str, retry_after: Optional[float] = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """연속 실패 기반 서킷 브레이커 (closed → open → half_open)"""
+
+    def __init__(self, name: str = "db", failure_threshold: int = DB_BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = DB_BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            self._probe_in_flight = False
+        # half_open: 시험 요청 하나만 통과
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def release(self):
+        """half_open 시험 요청이 결과 기록 없이 끝난 경우(취소 등) 다음 시험 허용"""
+        if self.state == "half_open":
+            self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info(f"DB 서버 서킷 브레이커 복구 ({self.name}: closed)")
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(f"DB 서버 서킷 브레이커 차단 ({self.name}: 연속 실패 {self.failures}회)")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        snapshot = {"state": self.state, "consecutive_failures": self.failures}
+        if self.state == "open":
+            snapshot["retry_after"] = round(self.retry_after(), 1)
+        return snapshot
+
+
+def _is_open(breaker: Optional[CircuitBreaker]) -> bool:
+    return breaker is not None and breaker.state == "open"
+
+
+class LatencyHistogram:
+    """고정 버킷 지연 히스토그램 (초 단위)"""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """버킷 상한 기준 근사 분위수"""
+        if self.count == 0:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            cumulative += n
+            if cumulative >= target:
+                return self.BUCKETS[i] if i < len(self.BUCKETS) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        buckets = {f"le_{b}": n for b, n in zip(self.BUCKETS, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 1) if self.count else None,
+            "p50_le": self.quantile(0.5),
+            "p95_le": self.quantile(0.95),
+            "p99_le": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class RouteStats:
+    """라우트별 업스트림 통계 (전체 소요 시간 + 시도 1회 시간 분리)"""
+
+    def __init__(self, route: str):
+        self.route = route
+        self.total = LatencyHistogram()
+        self.attempt = LatencyHistogram()
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+        self.short_circuited = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "latency": self.total.snapshot(),
+            "attempt_latency": self.attempt.snapshot(),
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class ResilientDBClient:
+    """라우트 정책을 적용하는 DB 서버 호출기"""
+
+    def __init__(self, client=db_client):
+        self.client = client
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.stats: Dict[str, RouteStats] = {}
+
+    def _route_stats(self, route: str) -> RouteStats:
+        if route not in self.stats:
+            self.stats[route] = RouteStats(route)
+        return self.stats[route]
+
+    def _breaker(self, route: str, policy: RoutePolicy) -> Optional[CircuitBreaker]:
+        if not policy.circuit_breaker:
+            return None
+        if route not in self.breakers:
+            self.breakers[route] = CircuitBreaker(route)
+        return self.breakers[route]
+
+    async def request(self, route: str, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        정책에 따라 DB 서버 호출
+        - 성공/4xx 응답은 그대로 반환 (5xx도 재시도 후 마지막 응답 반환)
+        - 서킷 차단, 연결 실패, 예산 초과 시 UpstreamUnavailable
+        - 라우트 호출 전체가 span 하나, 시도(재시도/헤징)마다 하위 span
+        """
+        attributes = {"db.route": route, "http.request.method": method, "url.path": path}
+        with start_span(f"db.{route}", attributes, kind="client") as span:
+            response = await self._request(route, method, path, **kwargs)
+            span.set_attribute("http.response.status_code", response.status_code)
+            return response
+
+    async def _request(self, route: str, method: str, path: str, **kwargs) -> httpx.Response:
+        policy = ROUTE_POLICIES[route]
+        stats = self._route_stats(route)
+        breaker = self._breaker(route, policy)
+
+        if breaker is not None and not breaker.allow():
+            stats.short_circuited += 1
+            raise UpstreamUnavailable("circuit_open", retry_after=breaker.retry_after())
+
+        started = time.monotonic()
+        deadline = started + policy.budget
+        attempt = 0
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise UpstreamUnavailable("timeout")
+                timeout = min(policy.attempt_timeout, remaining)
+
+                try:
+                    response = await self._send(policy, stats, method, path, timeout, **kwargs)
+                except httpx.TransportError as e:
+                    stats.failures += 1
+                    if breaker is not None:
+                        breaker.record_failure()
+                    retryable = policy.idempotent or isinstance(e, _NOT_SENT_ERRORS)
+                    if retryable and attempt < policy.retries and not _is_open(breaker):
+                        attempt += 1
+                        stats.retries += 1
+                        await self._backoff(attempt, deadline)
+                        continue
+                    reason = "timeout" if isinstance(e, httpx.TimeoutException) else "connect"
+                    raise UpstreamUnavailable(reason) from e
+
+                if response.status_code >= 500:
+                    stats.failures += 1
+                    if breaker is not None:
+                        breaker.record_failure()
+                    if policy.idempotent and attempt < policy.retries and not _is_open(breaker):
+                        attempt += 1
+                        stats.retries += 1
+                        await self._backoff(attempt, deadline)
+                        continue
+                elif breaker is not None:
+                    breaker.record_success()
+                return response
+        finally:
+            if breaker is not None:
+                breaker.release()
+            stats.total.observe(time.monotonic() - started)
+            set_span_attribute("db.retries", attempt)
+
+    async def _backoff(self, attempt: int, deadline: float):
+        delay = random.uniform(0, DB_RETRY_BACKOFF * (2 ** (attempt - 1)))
+        await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+
+    async def _attempt(self, policy: RoutePolicy, stats: RouteStats, method: str, path: str,
+                       timeout: float, **kwargs) -> httpx.Response:
+        stats.attempts += 1
+        started = time.monotonic()
+        outcome = "error"
+        with start_span("db.attempt", {"db.route": stats.route, "db.read_only": policy.read_only}, kind="client") as span:
+            try:
+                response = await self.client.request(method, path, read_only=policy.read_only, timeout=timeout, **kwargs)
+                outcome = "5xx" if response.status_code >= 500 else "ok"
+                return response
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                elapsed = time.monotonic() - started
+                stats.attempt.observe(elapsed)
+                UPSTREAM_DURATION.labels(route=stats.route, outcome=outcome).observe(elapsed)
+                span.set_attribute("db.outcome", outcome)
+
+    async def _send(self, policy: RoutePolicy, stats: RouteStats, method: str, path: str,
+                    timeout: float, **kwargs) -> httpx.Response:
+        """시도 1회 (헤징 정책이 있으면 느린 요청에 대해 두 번째 요청을 보내고 먼저 온 응답 사용)"""
+        if policy.hedge_after is None or policy.hedge_after >= timeout:
+            return await self._attempt(policy, stats, method, path, timeout, **kwargs)
+
+        primary = asyncio.create_task(self._attempt(policy, stats, method, path, timeout, **kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=policy.hedge_after)
+        if done:
+            return primary.result()
+
+        stats.hedges += 1
+        hedge = asyncio.create_task(self._attempt(policy, stats, method, path, timeout - policy.hedge_after, **kwargs))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            stats.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def snapshot(self) -> dict:
+        return {
+            "circuit_breakers": {route: breaker.snapshot() for route, breaker in self.breakers.items()},
+            "upstreams": self.client.snapshot(),
+            "routes": {route: stats.snapshot() for route, stats in self.stats.items()},
+        }
+
+
+# 전역 회복성 DB 호출기 인스턴스
+resilient_db = ResilientDBClient()
@@ -0,0 +1,246 @@
+# app/services/game_clear_queue.py
+"""
+게임 클리어 결과 write-behind 큐
+- 요청은 로컬 SQLite(WAL) 큐에 기록한 즉시 응답 (DB 서버 장애와 무관하게 유실 없음)
+- 백그라운드 플러셔가 일괄 전송, 실패 시 지터를 적용한 지수 백오프로 재시도
+- 전송마다 queue id 기반 Idempotency-Key 헤더를 붙여, 응답 유실 후 재전송된 레코드를 DB 서버가 중복 제거할 수 있게 함
+"""
+
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from ..core.config import (
+    GAME_CLEAR_QUEUE_PATH,
+    GAME_CLEAR_FLUSH_INTERVAL,
+    GAME_CLEAR_BATCH_SIZE,
+    GAME_CLEAR_RETRY_BASE,
+    GAME_CLEAR_RETRY_MAX,
+)
+from .db_client import db_client
+
+logger = logging.getLogger(__name__)
+
+# 재시도해도 성공할 수 없는 응답 (요청 자체의 문제) - 408/429는 재시도 대상
+_RETRYABLE_CLIENT_ERRORS = {408, 429}
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+def idempotency_key(queue_id: int, created_at: float) -> str:
+    """레코드별 고정 키 (큐 파일을 새로 만들어 id가 다시 1부터 시작해도 겹치지 않도록 생성 시각 포함)"""
+    return f"game-clear-{queue_id}-{int(created_at * 1000)}"
+
+
+class GameClearQueue:
+    """SQLite WAL 기반 내구성 큐 + 백그라운드 플러셔"""
+
+    def __init__(self, db_path: Path = GAME_CLEAR_QUEUE_PATH):
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._wakeup_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")  # 커밋 시점에 디스크 반영 보장
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pending (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pending_due ON pending(next_attempt_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dead_letter (
+                    id INTEGER PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    failed_at REAL NOT NULL,
+                    error TEXT
+                )
+            """)
+            self._conn = conn
+        return self._conn
+
+    # === 큐 조작 (동기, 스레드 안전) ===
+
+    def enqueue(self, record: Dict[str, Any]) -> int:
+        """레코드를 큐에 기록하고 queue id 반환"""
+        now = time.time()
+        with self._lock:
+            cursor = self._connect().execute(
+                "INSERT INTO pending (payload, next_attempt_at, created_at) VALUES (?, ?, ?)",
+                (json.dumps(record, ensure_ascii=False), now, now)
+            )
+            queue_id = cursor.lastrowid
+        if self._wakeup is not None and self._wakeup_loop is not None:
+            self._wakeup_loop.call_soon_threadsafe(self._wakeup.set)
+        return queue_id
+
+    def due_batch(self, limit: int = GAME_CLEAR_BATCH_SIZE) -> List[Tuple[int, Dict[str, Any], int, float]]:
+        """(id, payload, attempts, created_at) 목록"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT id, payload, attempts, created_at FROM pending WHERE next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+        return [(row[0], json.loads(row[1]), row[2], row[3]) for row in rows]
+
+    def ack(self, ids: List[int]):
+        if not ids:
+            return
+        with self._lock:
+            self._connect().executemany("DELETE FROM pending WHERE id = ?", [(i,) for i in ids])
+
+    def retry_later(self, failures: List[Tuple[int, int, str]]):
+        """(id, attempts, error) - full jitter 지수 백오프로 다음 시도 시각 설정"""
+        now = time.time()
+        updates = []
+        for queue_id, attempts, error in failures:
+            delay = random.uniform(0, min(GAME_CLEAR_RETRY_MAX, GAME_CLEAR_RETRY_BASE * (2 ** attempts)))
+            updates.append((attempts + 1, now + delay, error, queue_id))
+        with self._lock:
+            self._connect().executemany(
+                "UPDATE pending SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                updates
+            )
+
+    def dead_letter(self, failures: List[Tuple[int, int, str]]):
+        """재시도 불가능한 레코드를 dead_letter 테이블로 이동"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            for queue_id, attempts, error in failures:
+                conn.execute(
+                    "INSERT INTO dead_letter (id, payload, attempts, created_at, failed_at, error) "
+                    "SELECT id, payload, ?, created_at, ?, ? FROM pending WHERE id = ?",
+                    (attempts + 1, time.time(), error, queue_id)
+                )
+                conn.execute("DELETE FROM pending WHERE id = ?", (queue_id,))
+            conn.execute("COMMIT")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connect()
+            pending, oldest = conn.execute("SELECT COUNT(*), MIN(created_at) FROM pending").fetchone()
+            dead = conn.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+        return {
+            "pending": pending,
+            "dead_letter": dead,
+            "oldest_pending_age": (time.time() - oldest) if oldest else 0.0,
+            "flusher_running": self._task is not None and not self._task.done()
+        }
+
+    # === 백그라운드 플러셔 ===
+
+    async def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._wakeup_loop = asyncio.get_running_loop()
+            await asyncio.to_thread(self._connect)
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"게임 클리어 write-behind 플러셔 시작: {self.db_path}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def _run(self):
+        while True:
+            try:
+                flushed = await self.flush_once()
+            except Exception as e:
+                logger.error(f"게임 클리어 큐 플러시 오류: {e}")
+                flushed = 0
+            if flushed >= GAME_CLEAR_BATCH_SIZE:
+                continue  # 밀린 레코드가 더 있으면 바로 다음 배치
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), GAME_CLEAR_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def flush_once(self) -> int:
+        """기한이 된 레코드를 한 배치 전송 - 전송한 레코드 수 반환"""
+        batch = await asyncio.to_thread(self.due_batch)
+        if not batch:
+            return 0
+
+        # DB 서버에 일괄 API가 없으므로 공유 연결 풀로 배치 내 레코드를 동시 전송
+        outcomes = await asyncio.gather(
+            *(self._send(payload, idempotency_key(queue_id, created_at)) for queue_id, payload, _, created_at in batch),
+            return_exceptions=True
+        )
+
+        acked, retry, dead = [], [], []
+        for (queue_id, _, attempts, _), outcome in zip(batch, outcomes):
+            if outcome is True:
+                acked.append(queue_id)
+            elif isinstance(outcome, _PermanentFailure):
+                dead.append((queue_id, attempts, str(outcome)))
+            else:
+                retry.append((queue_id, attempts, str(outcome)))
+
+        await asyncio.to_thread(self.ack, acked)
+        if retry:
+            await asyncio.to_thread(self.retry_later, retry)
+        if dead:
+            await asyncio.to_thread(self.dead_letter, dead)
+            logger.error(f"게임 클리어 레코드 {len(dead)}건 전송 불가 (dead_letter 이동)")
+        if retry:
+            logger.warning(f"게임 클리어 레코드 {len(retry)}건 전송 실패, 재시도 예약")
+        return len(batch)
+
+    async def _send(self, payload: Dict[str, Any], key: str) -> bool:
+        try:
+            response = await db_client.post(
+                "/game/clear", json=payload, headers={IDEMPOTENCY_HEADER: key}, timeout=10.0
+            )
+        except httpx.RequestError as e:
+            raise _RetryableFailure(f"connection: {e}")
+        if response.status_code < 300:
+            return True
+        if 400 <= response.status_code < 500 and response.status_code not in _RETRYABLE_CLIENT_ERRORS:
+            raise _PermanentFailure(f"http {response.status_code}: {response.text[:200]}")
+        raise _RetryableFailure(f"http {response.status_code}")
+
+
+class _RetryableFailure(Exception):
+    pass
+
+
+class _PermanentFailure(Exception):
+    pass
+
+
+# 전역 게임 클리어 큐 인스턴스
+game_clear_queue = GameClearQueue()
@@ -0,0 +1,132 @@
+# app/services/health_prober.py
+"""
+의존성 헬스 체크 백그라운드 프로버
+- DB 서버, OpenAI 연결, YOLO 모델 준비 상태를 주기적으로 점검하고 결과를 캐싱
+- 헬스 엔드포인트는 캐시를 바로 반환 (로드밸런서 체크가 업스트림 부하를 만들지 않음)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..core.config import YOLO_MODELS, GPT_MODEL, HEALTH_PROBE_INTERVAL, HEALTH_PROBE_TIMEOUT
+from .db_resilience import resilient_db, UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+
+async def probe_db() -> Dict[str, Any]:
+    """DB 서버 연결 상태"""
+    try:
+        response = await resilient_db.request("health", "GET", "/")
+        if response.status_code == 200:
+            return {"status": "healthy", "db_server": "connected"}
+        return {"status": "unhealthy", "db_server": "error", "code": response.status_code}
+    except UpstreamUnavailable as e:
+        return {"status": "unhealthy", "db_server": "disconnected", "error": e.reason}
+
+
+async def probe_openai() -> Dict[str, Any]:
+    """OpenAI API 도달 가능 여부 및 설정된 모델 접근 권한"""
+    from .models.gpt_analyzer import gpt_analyzer
+
+    if not gpt_analyzer.enabled:
+        return {"status": "disabled", "model": GPT_MODEL}
+    try:
+        await asyncio.wait_for(
+            asyncio.to_thread(gpt_analyzer.client.models.retrieve, GPT_MODEL),
+            HEALTH_PROBE_TIMEOUT
+        )
+        return {"status": "healthy", "model": GPT_MODEL}
+    except Exception as e:
+        return {"status": "unhealthy", "model": GPT_MODEL, "error": str(e)}
+
+
+async def probe_models() -> Dict[str, Any]:
+    """YOLO 가중치 파일 존재 및 로드 여부"""
+    from .models.yolov8_detector import is_model_loaded
+
+    models = {}
+    for name, path in YOLO_MODELS.items():
+        models[name] = {
+            "path": str(path),
+            "exists": os.path.exists(path),
+            "loaded": is_model_loaded(str(path))
+        }
+    ready = all(info["exists"] for info in models.values())
+    return {"status": "healthy" if ready else "unhealthy", "models": models}
+
+
+class HealthProber:
+    """주기적 의존성 점검 및 결과 캐시"""
+
+    def __init__(self, interval: float = HEALTH_PROBE_INTERVAL):
+        self.interval = interval
+        self.probes: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]] = {
+            "db": probe_db,
+            "openai": probe_openai,
+            "models": probe_models,
+        }
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def snapshot(self, name: str) -> Dict[str, Any]:
+        """캐시된 결과 (아직 점검 전이면 unknown)"""
+        cached = self._cache.get(name)
+        if cached is None:
+            return {"status": "unknown", "checked_at": None, "age": None}
+        return {**cached, "age": round(time.time() - cached["checked_at"], 3)}
+
+    def snapshot_all(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self.snapshot(name) for name in self.probes}
+
+    async def probe(self, name: str) -> Dict[str, Any]:
+        """즉시 점검 (동시에 들어온 요청은 진행 중인 점검 하나를 공유)"""
+        task = self._inflight.get(name)
+        if task is None or task.done():
+            task = asyncio.create_task(self._run_probe(name))
+            self._inflight[name] = task
+        await asyncio.shield(task)
+        return self.snapshot(name)
+
+    async def probe_all(self):
+        await asyncio.gather(*(self.probe(name) for name in self.probes), return_exceptions=True)
+
+    async def _run_probe(self, name: str):
+        started = time.perf_counter()
+        try:
+            result = await self.probes[name]()
+        except Exception as e:
+            result = {"status": "unhealthy", "error": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["checked_at"] = time.time()
+        self._cache[name] = result
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"헬스 프로버 시작 (간격 {self.interval}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"헬스 프로브 오류: {e}")
+            await asyncio.sleep(self.interval)
+
+
+# 전역 헬스 프로버 인스턴스
+health_prober = HealthProber()
@@ -0,0 +1,263 @@
+# app/services/history_store.py
+"""
+사용자별 분석 이력 저장소 (SQLite)
+- (사용자, 시각) / (사용자, 검사 유형, 회기) 인덱스
+- 기록 시점에 집계를 갱신: 감정별 횟수, 스트레스 EWMA 및 최근 점수, 회기별 최신 결과
+- 조회는 집계 행과 회기별 최신 행(최대 14개)만 읽으므로 이력 길이와 무관
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..core.config import (
+    HISTORY_DB_PATH,
+    HISTORY_STRESS_WINDOW,
+    HISTORY_STRESS_ALPHA,
+    HISTORY_EXCERPT_CHARS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _excerpt(text: Any) -> Optional[str]:
+    if not text:
+        return None
+    text = str(text)
+    return text if len(text) <= HISTORY_EXCERPT_CHARS else text[:HISTORY_EXCERPT_CHARS] + "…"
+
+
+def history_entry(record: Dict[str, Any]) -> Dict[str, Any]:
+    """저장 레코드(result_persistence.build_record)에서 이력 항목 추출"""
+    data = record["response"].get("data") or {}
+    gpt_analysis = data.get("gpt_analysis") or {}
+    rule_based = data.get("rule_based_interpretation") or {}
+    return {
+        "username": record["username"],
+        "test_type": record["test_type"],
+        "stage": record["stage"] if record["stage"] is not None else 0,
+        "emotion": record["emotion"],
+        "emotion_confidence": record["emotion_confidence"],
+        "class_ids": record.get("detected_class_ids") or [],
+        "stress_score": record.get("stress_score"),
+        "interpretation": _excerpt(data.get("interpretation") or gpt_analysis.get("interpretation")),
+        "findings": rule_based.get("interpretations", []) if isinstance(rule_based, dict) else [],
+        "image_hash": record.get("image_hash"),
+        "created_at": record["created_at"],
+    }
+
+
+class HistoryStore:
+    """사용자별 이력 + 증분 집계"""
+
+    def __init__(self, db_path: Path = HISTORY_DB_PATH):
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT NOT NULL,
+                    test_type TEXT NOT NULL,
+                    stage INTEGER NOT NULL,
+                    emotion TEXT,
+                    emotion_confidence REAL,
+                    class_ids TEXT NOT NULL,
+                    stress_score REAL,
+                    interpretation TEXT,
+                    findings TEXT NOT NULL,
+                    image_hash TEXT,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_history_user_time ON history(username, created_at);
+                CREATE INDEX IF NOT EXISTS idx_history_user_stage ON history(username, test_type, stage, created_at);
+
+                CREATE TABLE IF NOT EXISTS user_summary (
+                    username TEXT PRIMARY KEY,
+                    total INTEGER NOT NULL,
+                    emotion_counts TEXT NOT NULL,
+                    stress_ewma REAL,
+                    stress_recent TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS stage_latest (
+                    username TEXT NOT NULL,
+                    test_type TEXT NOT NULL,
+                    stage INTEGER NOT NULL,
+                    history_id INTEGER NOT NULL,
+                    emotion TEXT,
+                    emotion_confidence REAL,
+                    class_ids TEXT NOT NULL,
+                    stress_score REAL,
+                    interpretation TEXT,
+                    findings TEXT NOT NULL,
+                    image_hash TEXT,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (username, test_type, stage)
+                );
+
+                CREATE TABLE IF NOT EXISTS portfolio_summary (
+                    username TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+            """)
+            self._conn = conn
+        return self._conn
+
+    # === 기록 (result_persistence 기록기에서 배치 단위 호출) ===
+
+    def record_batch(self, records: List[Dict[str, Any]]) -> int:
+        """사용자 이름이 있는 레코드를 이력에 추가하고 집계 갱신, 추가된 건수 반환"""
+        entries = [history_entry(r) for r in records if r.get("username")]
+        if not entries:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for entry in entries:
+                    self._insert(conn, entry)
+        return len(entries)
+
+    def _insert(self, conn: sqlite3.Connection, entry: Dict[str, Any]):
+        class_ids = json.dumps(entry["class_ids"])
+        findings = json.dumps(entry["findings"], ensure_ascii=False)
+        values = (
+            entry["emotion"], entry["emotion_confidence"], class_ids, entry["stress_score"],
+            entry["interpretation"], findings, entry["image_hash"], entry["created_at"]
+        )
+        cursor = conn.execute(
+            "INSERT INTO history (username, test_type, stage, emotion, emotion_confidence, class_ids, "
+            "stress_score, interpretation, findings, image_hash, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry["username"], entry["test_type"], entry["stage"], *values)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO stage_latest (username, test_type, stage, history_id, emotion, emotion_confidence, "
+            "class_ids, stress_score, interpretation, findings, image_hash, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry["username"], entry["test_type"], entry["stage"], cursor.lastrowid, *values)
+        )
+
+        row = conn.execute("SELECT * FROM user_summary WHERE username = ?", (entry["username"],)).fetchone()
+        total = row["total"] if row else 0
+        emotion_counts = json.loads(row["emotion_counts"]) if row else {}
+        stress_ewma = row["stress_ewma"] if row else None
+        stress_recent = json.loads(row["stress_recent"]) if row else []
+
+        if entry["emotion"]:
+            emotion_counts[entry["emotion"]] = emotion_counts.get(entry["emotion"], 0) + 1
+        if entry["stress_score"] is not None:
+            score = float(entry["stress_score"])
+            stress_ewma = score if stress_ewma is None else HISTORY_STRESS_ALPHA * score + (1 - HISTORY_STRESS_ALPHA) * stress_ewma
+            stress_recent = (stress_recent + [score])[-HISTORY_STRESS_WINDOW:]
+
+        conn.execute(
+            "INSERT OR REPLACE INTO user_summary (username, total, emotion_counts, stress_ewma, stress_recent, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (entry["username"], total + 1, json.dumps(emotion_counts, ensure_ascii=False),
+             stress_ewma, json.dumps(stress_recent), time.time())
+        )
+
+    # === 조회 ===
+
+    def get_summary(self, username: str) -> Optional[Dict[str, Any]]:
+        """집계 + 회기별 최신 결과 (이력 길이와 무관한 상수 시간 조회)"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT * FROM user_summary WHERE username = ?", (username,)).fetchone()
+            if row is None:
+                return None
+            stages = conn.execute(
+                "SELECT * FROM stage_latest WHERE username = ? ORDER BY test_type, stage", (username,)
+            ).fetchall()
+
+        stress_recent = json.loads(row["stress_recent"])
+        return {
+            "username": username,
+            "total": row["total"],
+            "emotion_counts": json.loads(row["emotion_counts"]),
+            "stress": {
+                "ewma": row["stress_ewma"],
+                "recent": stress_recent,
+                # 최근 창의 마지막 점수와 창 평균의 차 (양수면 상승 추세)
+                "trend": (stress_recent[-1] - sum(stress_recent) / len(stress_recent)) if stress_recent else None,
+            },
+            "stages": [self._stage_row(s) for s in stages],
+            "updated_at": row["updated_at"],
+        }
+
+    def get_recent(self, username: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """최근 이력 (인덱스 역순 조회, limit에 비례)"""
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT * FROM history WHERE username = ? ORDER BY created_at DESC LIMIT ?", (username, limit)
+            ).fetchall()
+        return [self._stage_row(r) for r in rows]
+
+    def get_stage_latest(self, username: str) -> List[Dict[str, Any]]:
+        """회기별 최신 결과만 조회"""
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT * FROM stage_latest WHERE username = ? ORDER BY test_type, stage", (username,)
+            ).fetchall()
+        return [self._stage_row(r) for r in rows]
+
+    # === 포트폴리오 요약 캐시 ===
+
+    @staticmethod
+    def stage_version(stages: List[Dict[str, Any]], thumbnails: bool = False) -> str:
+        """회기별 최신 결과 구성의 다이제스트 (새 회기 추가/재검사, 썸네일 첨부 여부가 바뀌면 변경)"""
+        composition = "|".join(f"{s['test_type']}:{s['stage']}:{s['created_at']}:{s['image_hash']}" for s in stages)
+        return hashlib.sha256(f"{composition}|thumbnails={int(thumbnails)}".encode("utf-8")).hexdigest()
+
+    def get_portfolio_summary(self, username: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT * FROM portfolio_summary WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return None
+        return {"version": row["version"], "summary": json.loads(row["summary"]), "created_at": row["created_at"]}
+
+    def save_portfolio_summary(self, username: str, version: str, summary: Dict[str, Any]):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO portfolio_summary (username, version, summary, created_at) VALUES (?, ?, ?, ?)",
+                    (username, version, json.dumps(summary, ensure_ascii=False), time.time())
+                )
+
+    @staticmethod
+    def _stage_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "test_type": row["test_type"],
+            "stage": row["stage"],
+            "emotion": row["emotion"],
+            "emotion_confidence": row["emotion_confidence"],
+            "class_ids": json.loads(row["class_ids"]),
+            "stress_score": row["stress_score"],
+            "interpretation": row["interpretation"],
+            "findings": json.loads(row["findings"]),
+            "image_hash": row["image_hash"],
+            "created_at": row["created_at"],
+        }
+
+
+# 전역 이력 저장소 인스턴스
+history_store = HistoryStore()
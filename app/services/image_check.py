@@ -8,13 +8,28 @@ CLASS_ID_TO_NAME = {
     26: "cloud", 28: "star", 29: "person"
 }
 
-def check_required_objects(detected_classes: list[int], stage: int) -> dict:
-    """해당 회기의 필수 객체가 감지되었는지 검사"""
+def class_mask(class_ids) -> int:
+    """클래스 ID 목록을 비트마스크로 변환"""
+    mask = 0
+    for cid in class_ids:
+        mask |= 1 << int(cid)
+    return mask
+
+# 회기별 필수 클래스 비트마스크 (미리 계산)
+STAGE_REQUIRED_MASKS = {stage: class_mask(ids) for stage, ids in STAGE_REQUIRED_CLASSES.items()}
+
+def check_required_mask(detected_mask: int, stage: int) -> dict:
+    """탐지된 클래스 비트마스크로 해당 회기의 필수 객체 감지 여부 검사"""
     required = STAGE_REQUIRED_CLASSES.get(stage, [])
-    missing = [cid for cid in required if cid not in detected_classes]
+    missing_mask = STAGE_REQUIRED_MASKS.get(stage, 0) & ~detected_mask
+    missing = [cid for cid in required if missing_mask >> cid & 1]
 
     return {
-        "ok": len(missing) == 0,
+        "ok": missing_mask == 0,
         "missing_classes": [CLASS_ID_TO_NAME.get(cid, f"class_{cid}") for cid in missing],
         "required_classes": [CLASS_ID_TO_NAME.get(cid, f"class_{cid}") for cid in required],
     }
+
+def check_required_objects(detected_classes: list[int], stage: int) -> dict:
+    """해당 회기의 필수 객체가 감지되었는지 검사"""
+    return check_required_mask(class_mask(detected_classes), stage)
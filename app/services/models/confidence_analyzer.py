@@ -1,21 +1,34 @@
 # app/services/models/confidence_analyzer.py
 # 신뢰도 기반 분기 로직 처리
 
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextvars
+import logging
 from PIL import Image
+from ...core.config import GPT_OVERLAP_WORKERS
+from ...core.metrics import observe_duration, record_branch, record_fallback
 
-def analyze_with_confidence_branching(results, image_path: str, description: str, stage: int) -> Dict[str, Any]:
+logger = logging.getLogger(__name__)
+
+# 탐지와 병렬로 실행되는 투기적 GPT Vision 호출용 스레드 풀
+_speculative_executor = ThreadPoolExecutor(max_workers=GPT_OVERLAP_WORKERS, thread_name_prefix="gpt-speculative")
+
+def analyze_with_confidence_branching(results, image_path: str, description: str, stage: int,
+                                      defer_gpt: bool = False, gpt_future: Optional[Future] = None) -> Dict[str, Any]:
     """
     신뢰도 기반 분기 분석
     - 높은 신뢰도 (>=0.6): 규칙 기반 분석 + 위치/크기 분석
     - 낮은 신뢰도 (0.4-0.6): GPT 기반 분석
     - 탐지 실패 (<0.4): GPT 텍스트 분석만
+    - defer_gpt=True: GPT 호출 없이 구조적 결과만 반환 (gpt_pending=True),
+      GPT 해석은 complete_deferred_analysis로 나중에 채움
+    - gpt_future: 탐지와 동시에 시작된 투기적 Vision 호출 (start_speculative_gpt),
+      이미지 분기에서는 그 결과를 사용하고 텍스트 분기에서는 취소
     """
     from .yolov8_detector import categorize_detections_by_confidence
     from .gpt_analyzer import gpt_analyzer
     
-    print(f"신뢰도 기반 분기 분석 시작 (Stage {stage})")
-    
     # 신뢰도별 탐지 결과 분류
     confidence_categories = categorize_detections_by_confidence(
         results.boxes if results else None, 
@@ -31,21 +44,25 @@ def analyze_with_confidence_branching(results, image_path: str, description: str
     # 분석 방식 결정
     if high_conf:
         # 높은 신뢰도 객체가 있는 경우 - 규칙 기반 + 위치/크기 분석
-        print(f"높은 신뢰도 객체 발견 → 규칙 기반 분석 수행")
-        return perform_rule_based_analysis(high_conf, low_conf, image_path, description, stage)
+        logger.info(f"신뢰도 분기 (Stage {stage}): 높은 신뢰도 객체 발견 → 규칙 기반 분석")
+        record_branch("rule_based", stage)
+        return perform_rule_based_analysis(high_conf, low_conf, image_path, description, stage, defer_gpt, gpt_future)
     
     elif low_conf:
         # 낮은 신뢰도 객체만 있는 경우 - GPT 기반 분석
-        print(f"낮은 신뢰도 객체만 발견 → GPT 기반 분석 수행")
-        return perform_gpt_based_analysis(low_conf, image_path, description, stage)
+        logger.info(f"신뢰도 분기 (Stage {stage}): 낮은 신뢰도 객체만 발견 → GPT 기반 분석")
+        record_branch("gpt_based", stage)
+        return perform_gpt_based_analysis(low_conf, image_path, description, stage, defer_gpt, gpt_future)
     
     else:
         # 객체 탐지 실패 - GPT 텍스트 분석만
-        print(f"객체 탐지 실패 → GPT 텍스트 분석만 수행")
-        return perform_text_only_analysis(description, stage)
+        logger.info(f"신뢰도 분기 (Stage {stage}): 객체 탐지 실패 → GPT 텍스트 분석")
+        record_branch("text_only", stage)
+        return perform_text_only_analysis(description, stage, defer_gpt, gpt_future)
 
 def perform_rule_based_analysis(high_conf: List[Tuple], low_conf: List[Tuple], 
-                               image_path: str, description: str, stage: int) -> Dict[str, Any]:
+                               image_path: str, description: str, stage: int,
+                               defer_gpt: bool = False, gpt_future: Optional[Future] = None) -> Dict[str, Any]:
     """
     높은 신뢰도 객체에 대한 규칙 기반 분석
     """
@@ -58,16 +75,35 @@ def perform_rule_based_analysis(high_conf: List[Tuple], low_conf: List[Tuple],
             detected_objects.append(f"{label}({conf:.2f})")
         
         # 위치/크기 분석을 위한 데이터 구성
-        position_dict, size_dict = analyze_object_positions_and_sizes(high_conf, image_path)
+        with observe_duration("geometry_analysis", {0: "htp", 1: "pitr"}.get(stage), stage):
+            position_dict, size_dict = analyze_object_positions_and_sizes(high_conf, image_path)
         
         # 규칙 기반 해석 생성
-        rule_based_result = generate_rule_based_interpretation(high_conf, stage)
+        with observe_duration("rule_interpretation", {0: "htp", 1: "pitr"}.get(stage), stage):
+            rule_based_result = generate_rule_based_interpretation(high_conf, stage)
         
-        # GPT 보조 분석 (이미지 포함)
-        from .gpt_analyzer import gpt_analyzer
+        result = {
+            "success": True,
+            "message": "높은 신뢰도 객체 탐지 성공",
+            "analysis_method": "rule_based_with_gpt_support",
+            "stage": stage,
+            "detected_objects": detected_objects,
+            "high_confidence_objects": [{"label": label, "confidence": conf, "box": box} for label, conf, box in high_conf],
+            "low_confidence_objects": [{"label": label, "confidence": conf, "box": box} for label, conf, box in low_conf],
+            "position_analysis": position_dict,
+            "size_analysis": size_dict,
+            "rule_based_interpretation": rule_based_result
+        }
+        
+        if defer_gpt:
+            # 구조적 해석만 즉시 반환 (GPT 보조 분석은 지연)
+            return mark_gpt_pending(result, combine_interpretations(rule_based_result, {}))
+        
+        # GPT 보조 분석 (이미지 포함) - 투기적 호출 결과가 있으면 사후 병합
         # PITR 분석인지 확인 (stage=1이고 피처가 PITR 관련인 경우)
         analysis_type = "pitr" if stage == 1 else None
-        gpt_result = gpt_analyzer.analyze_drawing(
+        gpt_result = resolve_gpt_result(
+            gpt_future,
             stage=stage,
             detected_objects=detected_objects,
             description=description,
@@ -77,29 +113,22 @@ def perform_rule_based_analysis(high_conf: List[Tuple], low_conf: List[Tuple],
             analysis_type=analysis_type
         )
         
-        return {
-            "success": True,
-            "message": "높은 신뢰도 객체 탐지 성공",
-            "analysis_method": "rule_based_with_gpt_support",
-            "stage": stage,
-            "detected_objects": detected_objects,
-            "high_confidence_objects": [{"label": label, "confidence": conf, "box": box} for label, conf, box in high_conf],
-            "low_confidence_objects": [{"label": label, "confidence": conf, "box": box} for label, conf, box in low_conf],
-            "position_analysis": position_dict,
-            "size_analysis": size_dict,
-            "rule_based_interpretation": rule_based_result,
+        result.update({
             "interpretation": combine_interpretations(rule_based_result, gpt_result),
             "emotion": gpt_result.get("emotion", "happiness"),
             "emotion_confidence": gpt_result.get("emotion_confidence", 0.7)
-        }
+        })
+        return result
         
     except Exception as e:
-        print(f"규칙 기반 분석 오류: {e}")
+        logger.exception(f"규칙 기반 분석 오류: {e}")
         # 오류 시 GPT 분석으로 폴백
-        return perform_gpt_based_analysis(high_conf + low_conf, image_path, description, stage)
+        record_fallback("rule_based_to_gpt")
+        return perform_gpt_based_analysis(high_conf + low_conf, image_path, description, stage, defer_gpt, gpt_future)
 
 def perform_gpt_based_analysis(low_conf: List[Tuple], image_path: str, 
-                              description: str, stage: int) -> Dict[str, Any]:
+                              description: str, stage: int, defer_gpt: bool = False,
+                              gpt_future: Optional[Future] = None) -> Dict[str, Any]:
     """
     낮은 신뢰도 객체에 대한 GPT 기반 분석
     """
@@ -109,11 +138,25 @@ def perform_gpt_based_analysis(low_conf: List[Tuple], image_path: str,
         for label, conf, box in low_conf:
             detected_objects.append(f"{label}({conf:.2f})")
         
+        result = {
+            "success": True,
+            "message": "낮은 신뢰도 객체 탐지, GPT 기반 분석 완료",
+            "analysis_method": "gpt_based_analysis",
+            "stage": stage,
+            "detected_objects": detected_objects,
+            "low_confidence_objects": [{"label": label, "confidence": conf, "box": box} for label, conf, box in low_conf],
+            "position_analysis": {},
+            "size_analysis": {}
+        }
+        
+        if defer_gpt:
+            return mark_gpt_pending(result, None)
+        
         # GPT 분석 수행 (이미지 포함)
-        from .gpt_analyzer import gpt_analyzer
         # PITR 분석인지 확인 (stage=1이고 피처가 PITR 관련인 경우)
         analysis_type = "pitr" if stage == 1 else None
-        gpt_result = gpt_analyzer.analyze_drawing(
+        gpt_result = resolve_gpt_result(
+            gpt_future,
             stage=stage,
             detected_objects=detected_objects,
             description=description,
@@ -123,29 +166,37 @@ def perform_gpt_based_analysis(low_conf: List[Tuple], image_path: str,
             analysis_type=analysis_type
         )
         
-        return {
-            "success": True,
-            "message": "낮은 신뢰도 객체 탐지, GPT 기반 분석 완료",
-            "analysis_method": "gpt_based_analysis",
-            "stage": stage,
-            "detected_objects": detected_objects,
-            "low_confidence_objects": [{"label": label, "confidence": conf, "box": box} for label, conf, box in low_conf],
-            "position_analysis": {},
-            "size_analysis": {},
+        result.update({
             "interpretation": gpt_result.get("interpretation", "GPT 기반 분석 완료"),
             "emotion": gpt_result.get("emotion", "happiness"),
             "emotion_confidence": gpt_result.get("emotion_confidence", 0.5)
-        }
+        })
+        return result
         
     except Exception as e:
-        print(f"GPT 기반 분석 오류: {e}")
+        logger.exception(f"GPT 기반 분석 오류: {e}")
         # 오류 시 텍스트 분석으로 폴백
-        return perform_text_only_analysis(description, stage)
+        return perform_text_only_analysis(description, stage, defer_gpt, gpt_future)
 
-def perform_text_only_analysis(description: str, stage: int) -> Dict[str, Any]:
+def perform_text_only_analysis(description: str, stage: int, defer_gpt: bool = False,
+                               gpt_future: Optional[Future] = None) -> Dict[str, Any]:
     """
     객체 탐지 실패 시 텍스트 기반 분석만 수행
     """
+    # 텍스트 분기에서는 이미지 기반 투기적 호출 결과를 사용하지 않음
+    cancel_speculative_gpt(gpt_future)
+    
+    if defer_gpt:
+        return mark_gpt_pending({
+            "success": True,
+            "message": "객체 탐지 실패, 설명 기반 분석 완료",
+            "analysis_method": "text_only_fallback",
+            "stage": stage,
+            "detected_objects": [],
+            "position_analysis": {},
+            "size_analysis": {}
+        }, None)
+    
     try:
         # GPT 텍스트 분석
         from .gpt_analyzer import gpt_analyzer
@@ -175,7 +226,7 @@ def perform_text_only_analysis(description: str, stage: int) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        print(f"❌ 텍스트 분석 오류: {e}")
+        logger.exception(f"텍스트 분석 오류: {e}")
         return {
             "success": False,
             "error": str(e),
@@ -190,6 +241,95 @@ def perform_text_only_analysis(description: str, stage: int) -> Dict[str, Any]:
             "emotion_confidence": 0.1
         }
 
+def start_speculative_gpt(image_path: str, description: str, stage: int) -> Future:
+    """
+    탐지와 동시에 GPT Vision 호출(이미지 인코딩 포함) 시작
+    탐지 결과는 프롬프트에 넣지 않고, 분기 후 규칙 기반 결과와 사후 병합
+    """
+    from .gpt_analyzer import gpt_analyzer
+    
+    analysis_type = "pitr" if stage == 1 else None
+    # 요청 컨텍스트(메트릭 레이블, 단계별 시간)를 워커 스레드로 전달
+    return _speculative_executor.submit(
+        contextvars.copy_context().run,
+        gpt_analyzer.analyze_drawing,
+        stage=stage,
+        detected_objects=[],
+        description=description,
+        position_dict={},
+        size_dict={},
+        image_path=image_path,
+        analysis_type=analysis_type
+    )
+
+def resolve_gpt_result(gpt_future: Optional[Future], **kwargs) -> Dict[str, Any]:
+    """투기적 호출이 있으면 그 결과를, 없으면 지금 GPT 호출"""
+    if gpt_future is not None:
+        return gpt_future.result()
+    from .gpt_analyzer import gpt_analyzer
+    return gpt_analyzer.analyze_drawing(**kwargs)
+
+def cancel_speculative_gpt(gpt_future: Optional[Future]):
+    """
+    투기적 호출 취소 - 아직 시작 전이면 실행되지 않고,
+    이미 진행 중이면 결과를 버림 (동기 OpenAI 호출은 중단 불가)
+    """
+    if gpt_future is not None and not gpt_future.done():
+        if gpt_future.cancel():
+            logger.debug("투기적 GPT Vision 호출 취소")
+        else:
+            logger.debug("투기적 GPT Vision 호출 결과 폐기 (이미 실행 중)")
+
+def mark_gpt_pending(result: Dict[str, Any], interpretation) -> Dict[str, Any]:
+    """GPT 해석이 아직 채워지지 않은 결과로 표시"""
+    result.update({
+        "gpt_pending": True,
+        "interpretation": interpretation,
+        "emotion": None,
+        "emotion_confidence": None
+    })
+    return result
+
+def complete_deferred_analysis(result: Dict[str, Any], image_path: str, description: str) -> Dict[str, Any]:
+    """
+    defer_gpt로 반환된 구조적 결과에 GPT 해석, 결합 해석, 감정을 채움
+    (분기별 GPT 호출 방식은 즉시 분석과 동일)
+    """
+    from .gpt_analyzer import gpt_analyzer
+    
+    stage = result.get("stage", 0)
+    method = result.get("analysis_method")
+    analysis_type = "pitr" if stage == 1 else None
+    
+    gpt_result = gpt_analyzer.analyze_drawing(
+        stage=stage,
+        detected_objects=result.get("detected_objects", []),
+        description=description,
+        position_dict=result.get("position_analysis", {}),
+        size_dict=result.get("size_analysis", {}),
+        image_path=None if method == "text_only_fallback" else image_path,
+        analysis_type=analysis_type
+    )
+    
+    if method == "rule_based_with_gpt_support":
+        interpretation = combine_interpretations(result.get("rule_based_interpretation", {}), gpt_result)
+        default_confidence = 0.7
+    elif method == "gpt_based_analysis":
+        interpretation = gpt_result.get("interpretation", "GPT 기반 분석 완료")
+        default_confidence = 0.5
+    else:
+        interpretation = gpt_result.get("interpretation", "텍스트 기반 분석 완료")
+        default_confidence = 0.3
+    
+    result.update({
+        "gpt_pending": False,
+        "gpt_analysis": gpt_result,
+        "interpretation": interpretation,
+        "emotion": gpt_result.get("emotion", "happiness"),
+        "emotion_confidence": gpt_result.get("emotion_confidence", default_confidence)
+    })
+    return result
+
 def analyze_object_positions_and_sizes(detections: List[Tuple], image_path: str) -> Tuple[Dict, Dict]:
     """
     탐지된 객체들의 위치와 크기 분석
@@ -240,7 +380,7 @@ def analyze_object_positions_and_sizes(detections: List[Tuple], image_path: str)
         return position_dict, size_dict
         
     except Exception as e:
-        print(f"⚠️ 위치/크기 분석 오류: {e}")
+        logger.warning(f"위치/크기 분석 오류: {e}")
         return {}, {}
 
 def get_position_description(x: float, y: float) -> str:
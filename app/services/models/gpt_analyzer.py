@@ -3,22 +3,34 @@
 
 import openai
 from openai import OpenAI
-from app.core.config import OPENAI_API_KEY, GPT_MODEL, GPT_MAX_TOKENS, GPT_TEMPERATURE
+from app.core.config import OPENAI_API_KEY, OPENAI_BASE_URL, GPT_MODEL, GPT_MAX_TOKENS, GPT_TEMPERATURE, PORTFOLIO_MAX_TOKENS, PORTFOLIO_THUMBNAIL_SIZE
+from app.services.upload_store import upload_store
+from app.core.metrics import GPT_CALL_DURATION, current_endpoint, stage_label, observe_duration, record_cache, record_fallback
+from app.core.timing import record_step, record_gpt_usage
+from app.core.tracing import start_span, set_span_attribute
+from collections import OrderedDict
 import json
 import logging
 import base64
 from PIL import Image
 import io
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 # Paul Ekman의 6가지 기본 감정
 EKMAN_EMOTIONS = ["anger", "disgust", "fear", "happiness", "sadness", "surprise"]
 
+# 콘텐츠 해시 기반 base64 인코딩 캐시 크기
+ENCODE_CACHE_SIZE = 64
+
 class GPTAnalyzer:
     def __init__(self):
+        self._encode_cache = OrderedDict()  # digest -> base64 문자열
+        self._encode_lock = threading.Lock()  # 투기적 호출/워커 스레드에서 동시에 접근
         if OPENAI_API_KEY and OPENAI_API_KEY != "your-key-here":
-            self.client = OpenAI(api_key=OPENAI_API_KEY)
+            self.client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
             self.enabled = True
         else:
             self.client = None
@@ -30,6 +42,7 @@ class GPTAnalyzer:
         그림 분석을 위한 GPT 호출 - 이미지 직접 분석 지원
         """
         if not self.enabled:
+            record_fallback("gpt_disabled")
             return {
                 "interpretation": "GPT 분석이 비활성화되어 있습니다. API 키를 설정해주세요.",
                 "emotion": "happiness",
@@ -46,6 +59,7 @@ class GPTAnalyzer:
             
         except Exception as e:
             logger.error(f"GPT 분석 오류: {e}")
+            record_fallback("gpt_error")
             return {
                 "interpretation": f"GPT 분석 중 오류가 발생했습니다: {str(e)}",
                 "emotion": "happiness",
@@ -63,6 +77,7 @@ class GPTAnalyzer:
         """
         GPT Vision을 사용한 이미지 직접 분석
         """
+        started = time.perf_counter()
         try:
             # 더 안전한 경로 처리
             from pathlib import Path
@@ -77,6 +92,7 @@ class GPTAnalyzer:
             
             if not os.path.exists(clean_path):
                 logger.warning(f"이미지 파일 없음, 텍스트 분석으로 폴백: {clean_path}")
+                record_fallback("missing_image_to_text")
                 return self._analyze_with_text(stage, detected_objects, description, position_dict, size_dict, analysis_type)
             
             # 이미지를 base64로 인코딩
@@ -85,8 +101,8 @@ class GPTAnalyzer:
             # Vision 전용 프롬프트 생성
             prompt = self._create_vision_analysis_prompt(stage, detected_objects, description, position_dict, size_dict, analysis_type)
             
-            response = self.client.chat.completions.create(
-                model=GPT_MODEL,
+            response = self._create_completion(
+                "vision", stage,
                 messages=[
                     {"role": "system", "content": self._get_vision_system_prompt()},
                     {
@@ -108,11 +124,14 @@ class GPTAnalyzer:
             )
             
             result = response.choices[0].message.content
+            self._observe_call("vision", "success", stage, started, getattr(response, "usage", None))
             logger.info("GPT Vision 분석 성공")
             return self._parse_gpt_response(result)
             
         except Exception as e:
             logger.error(f"GPT Vision 분석 오류: {e}")
+            self._observe_call("vision", "fallback", stage, started)
+            record_fallback("vision_to_text")
             # Vision 실패 시 텍스트 기반으로 폴백
             logger.info("텍스트 기반 분석으로 폴백")
             return self._analyze_with_text(stage, detected_objects, description, position_dict, size_dict, analysis_type)
@@ -123,19 +142,188 @@ class GPTAnalyzer:
         """
         prompt = self._create_analysis_prompt(stage, detected_objects, description, position_dict, size_dict, analysis_type)
         
-        response = self.client.chat.completions.create(
-            model=GPT_MODEL,
-            messages=[
-                {"role": "system", "content": self._get_system_prompt()},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=GPT_MAX_TOKENS,
-            temperature=GPT_TEMPERATURE
-        )
+        started = time.perf_counter()
+        try:
+            response = self._create_completion(
+                "text", stage,
+                messages=[
+                    {"role": "system", "content": self._get_system_prompt()},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=GPT_MAX_TOKENS
+            )
+        except Exception:
+            self._observe_call("text", "error", stage, started)
+            raise
+        self._observe_call("text", "success", stage, started, getattr(response, "usage", None))
         
         result = response.choices[0].message.content
         return self._parse_gpt_response(result)
     
+    def _create_completion(self, mode, stage, messages, max_tokens, temperature=GPT_TEMPERATURE):
+        """
+        chat.completions.create 1회 호출 - client span으로 모델/회기/이미지 수/토큰 사용량 기록
+        (Vision 실패 후 텍스트 폴백은 같은 부모 아래 두 개의 span으로 남음)
+        """
+        images = [
+            part for message in messages if isinstance(message["content"], list)
+            for part in message["content"] if part.get("type") == "image_url"
+        ]
+        with start_span(f"gpt.{mode}", {
+            "gen_ai.system": "openai",
+            "gen_ai.operation.name": "chat",
+            "gen_ai.request.model": GPT_MODEL,
+            "gen_ai.request.max_tokens": max_tokens,
+            "gpt.mode": mode,
+            "gpt.image_count": len(images),
+            "gpt.image_detail": images[0]["image_url"].get("detail") if images else None,
+            "analysis.stage": stage,
+        }, kind="client") as span:
+            response = self.client.chat.completions.create(
+                model=GPT_MODEL,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                span.set_attributes({
+                    "gen_ai.usage.input_tokens": getattr(usage, "prompt_tokens", None),
+                    "gen_ai.usage.output_tokens": getattr(usage, "completion_tokens", None),
+                })
+            span.set_attribute("gen_ai.response.model", getattr(response, "model", None))
+        return response
+    
+    def _observe_call(self, mode, outcome, stage, started, usage=None):
+        """GPT 호출 시간/토큰 사용량 기록 (mode: vision/text/portfolio, outcome: success/fallback/error)"""
+        elapsed = time.perf_counter() - started
+        GPT_CALL_DURATION.labels(
+            mode=mode, outcome=outcome, endpoint=current_endpoint(), stage=stage_label(stage)
+        ).observe(elapsed)
+        record_step("gpt_call", elapsed)
+        if outcome == "success":
+            record_gpt_usage(usage)
+    
+    def summarize_portfolio(self, entries, thumbnails=None):
+        """
+        회기별 저장 결과를 모아 한 번의 GPT 호출로 종합 진행 요약 생성
+        Args:
+            entries: 검사 유형/회기별 최신 결과 목록 (history_store.get_stage_latest)
+            thumbnails: [(라벨, 썸네일 이미지 경로), ...] - 있으면 low detail 이미지로 함께 전송
+        """
+        if not self.enabled:
+            return {
+                "summary": "GPT 분석이 비활성화되어 있습니다. API 키를 설정해주세요.",
+                "progress": "",
+                "recommendations": [],
+                "dominant_emotion": None,
+                "generated": False
+            }
+        
+        content = [{"type": "text", "text": self._create_portfolio_prompt(entries)}]
+        if thumbnails and self._is_vision_model():
+            for label, path in thumbnails:
+                content.append({"type": "text", "text": f"[{label} 그림]"})
+                content.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/jpeg;base64,{self._encode_thumbnail(path)}",
+                        "detail": "low"
+                    }
+                })
+        
+        started = time.perf_counter()
+        try:
+            response = self._create_completion(
+                "portfolio", None,
+                messages=[
+                    {"role": "system", "content": self._get_portfolio_system_prompt()},
+                    {"role": "user", "content": content}
+                ],
+                max_tokens=PORTFOLIO_MAX_TOKENS
+            )
+        except Exception:
+            self._observe_call("portfolio", "error", None, started)
+            raise
+        self._observe_call("portfolio", "success", None, started, getattr(response, "usage", None))
+        
+        result = response.choices[0].message.content
+        logger.info(f"포트폴리오 요약 생성 성공 ({len(entries)}개 회기)")
+        return self._parse_portfolio_response(result)
+    
+    def _create_portfolio_prompt(self, entries):
+        """
+        회기별 결과(감정, 규칙 기반 소견, 해석 요약)로 종합 프롬프트 생성
+        """
+        prompt = "환자가 치료 프로그램 동안 그린 그림들의 회기별 분석 결과입니다. 전체 진행 과정을 종합해주세요.\n"
+        for entry in entries:
+            analysis_type = entry["test_type"] if entry["test_type"] == "pitr" else None
+            prompt += f"\n### {entry['test_type'].upper()} {entry['stage']}단계 - {self._get_stage_context(entry['stage'], analysis_type)}"
+            prompt += f"\n- 감정: {entry['emotion']} (신뢰도 {entry['emotion_confidence']})"
+            if entry.get("stress_score") is not None:
+                prompt += f"\n- 스트레스 점수: {entry['stress_score']}"
+            if entry.get("findings"):
+                prompt += f"\n- 규칙 기반 소견: {' / '.join(entry['findings'])}"
+            if entry.get("interpretation"):
+                prompt += f"\n- 해석 요약: {entry['interpretation']}"
+            prompt += "\n"
+        return prompt
+    
+    def _get_portfolio_system_prompt(self):
+        """
+        포트폴리오 종합 요약용 시스템 프롬프트
+        """
+        return """
+당신은 조현병 회복기 환자를 위한 심리 미술 치료 전문가입니다.
+여러 회기에 걸친 그림 분석 결과를 종합하여 치료자가 한눈에 볼 수 있는 진행 요약을 작성합니다.
+
+**요약 시 중점 사항:**
+1. 회기에 따른 감정 변화의 흐름 (Ekman 6감정 기준)
+2. 반복적으로 나타나는 주제나 상징
+3. 긍정적인 변화와 강점
+4. 추가 관심이 필요한 부분 (조심스럽고 격려적인 톤으로)
+
+응답은 반드시 다음 JSON 형식으로만 해주세요:
+```json
+{
+    "summary": "전체 프로그램에 대한 종합 요약 (500자 이상)",
+    "progress": "회기별 감정 변화 흐름 설명",
+    "recommendations": ["치료자를 위한 제안", "..."],
+    "dominant_emotion": "anger/disgust/fear/happiness/sadness/surprise"
+}
+```"""
+    
+    def _parse_portfolio_response(self, response_text):
+        """
+        포트폴리오 요약 응답 파싱 (JSON이 아니면 원문을 요약으로 사용)
+        """
+        try:
+            result = json.loads(self._extract_json_text(response_text))
+        except json.JSONDecodeError as e:
+            logger.error(f"포트폴리오 요약 JSON 파싱 실패: {e}")
+            result = {"summary": response_text}
+        
+        dominant = str(result.get("dominant_emotion") or "").lower()
+        return {
+            "summary": result.get("summary", ""),
+            "progress": result.get("progress", ""),
+            "recommendations": result.get("recommendations", []),
+            "dominant_emotion": dominant if dominant in EKMAN_EMOTIONS else None,
+            "generated": True
+        }
+    
+    def _encode_thumbnail(self, image_path):
+        """
+        low detail 전송용 작은 JPEG 썸네일 base64 인코딩
+        """
+        with Image.open(image_path) as img:
+            img.thumbnail((PORTFOLIO_THUMBNAIL_SIZE, PORTFOLIO_THUMBNAIL_SIZE), Image.Resampling.LANCZOS)
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=70, optimize=True)
+        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+    
     def _encode_image(self, image_path):
         """
         이미지를 base64로 인코딩 - 경로 정규화 및 안전한 처리
@@ -155,10 +343,25 @@ class GPTAnalyzer:
                 logger.error(f"이미지 파일이 존재하지 않습니다: {normalized_path}")
                 raise FileNotFoundError(f"Image file not found: {normalized_path}")
             
+            # 동일 콘텐츠는 다시 인코딩하지 않음
+            digest = upload_store.digest_for(normalized_path)
+            if digest:
+                with self._encode_lock:
+                    cached = self._encode_cache.get(digest)
+                    if cached is not None:
+                        self._encode_cache.move_to_end(digest)
+                if cached is not None:
+                    record_cache("gpt_image_encode", True)
+                    logger.debug(f"이미지 인코딩 캐시 사용: {digest[:12]}")
+                    return cached
+            record_cache("gpt_image_encode", False)
+            
             logger.info(f"이미지 로딩 시도: {normalized_path}")
             
             # 이미지 최적화 (크기 조정)
-            with Image.open(normalized_path) as img:
+            with observe_duration("image_decode", "gpt"), Image.open(normalized_path) as img:
+                set_span_attribute("image.width", img.width)
+                set_span_attribute("image.height", img.height)
                 # 이미지 크기 제한 (최대 1024x1024)
                 max_size = 1024
                 if img.width > max_size or img.height > max_size:
@@ -176,7 +379,14 @@ class GPTAnalyzer:
                 # base64 인코딩
                 image_data = buffer.read()
                 logger.info(f"이미지 인코딩 성공: {len(image_data)} bytes")
-                return base64.b64encode(image_data).decode('utf-8')
+                encoded = base64.b64encode(image_data).decode('utf-8')
+                
+            if digest:
+                with self._encode_lock:
+                    self._encode_cache[digest] = encoded
+                    if len(self._encode_cache) > ENCODE_CACHE_SIZE:
+                        self._encode_cache.popitem(last=False)
+            return encoded
                 
         except Exception as e:
             logger.error(f"이미지 인코딩 오류: {e}")
@@ -339,24 +549,25 @@ class GPTAnalyzer:
         
         return stage_contexts.get(stage, "일반적인 그림 치료 단계")
     
+    def _extract_json_text(self, response_text):
+        """
+        ```json ... ``` 형식에서 JSON 텍스트 추출
+        """
+        if "```json" in response_text:
+            start = response_text.find("```json") + 7
+            end = response_text.find("```", start)
+            if end != -1:
+                return response_text[start:end].strip()
+            return response_text[start:].strip()
+        return response_text.strip()
+    
     def _parse_gpt_response(self, response_text):
         """
         GPT 응답 파싱 - JSON 블록 추출 지원
         """
         try:
-            # ```json ... ``` 형식에서 JSON 추출
-            if "```json" in response_text:
-                start = response_text.find("```json") + 7
-                end = response_text.find("```", start)
-                if end != -1:
-                    json_text = response_text[start:end].strip()
-                else:
-                    json_text = response_text[start:].strip()
-            else:
-                json_text = response_text.strip()
-            
             # JSON 파싱 시도
-            result = json.loads(json_text)
+            result = json.loads(self._extract_json_text(response_text))
             
             # 필수 필드 확인 및 기본값 설정
             parsed_result = {
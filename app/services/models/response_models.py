@@ -13,7 +13,8 @@ class AnalysisMetadata(BaseModel):
     stage: int
     analysis_type: str  # 'object_detection' or 'gpt_vision'
     model_used: Optional[str] = None  # 'htp.pt', 'pitr_yolov8.pt', 'gpt-4o'
-    processing_time: Optional[float] = None
+    processing_time: Optional[float] = None  # 초
+    timings: Optional[Dict[str, Any]] = None  # 단계별 ms (upload, decode, detect, rules, gpt, serialize, total)
     timestamp: datetime = datetime.now()
 
 class ObjectDetectionResult(BaseModel):
@@ -1,8 +1,155 @@
 from ultralytics import YOLO
+import logging
 import os
-from ...core.config import YOLO_MODELS
+import threading
+import time
+from collections import OrderedDict
+from ...core.config import YOLO_MODELS, YOLO_IMGSZ, DETECTION_CACHE_SIZE
+from ...core.memory import memory_tracker
+from ...core.metrics import observe_duration, observe_step, observe_memory, record_cache, record_fallback
+from ...core.tracing import start_span
+from ..upload_store import upload_store
 
-def detect_objects(image_path: str, model_path: str = None, model_name: str = "htp", conf: float = 0.4):
+logger = logging.getLogger(__name__)
+
+# 로드된 YOLO 모델 캐시 (모델 경로 -> YOLO 인스턴스)
+_MODEL_CACHE = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+# 모델별 predict 직렬화 (id(model) -> Lock)
+# ultralytics predictor는 스레드 안전하지 않고 predict()마다 model.predictor.args(conf/imgsz)를 바꾸므로
+# 배치/사전 검사/실시간/투기적 호출 워커가 같은 인스턴스를 동시에 쓰지 않도록 함
+# (스레드별 인스턴스는 to_thread 워커 수만큼 모델 메모리가 늘어나므로 사용하지 않음)
+_PREDICT_LOCKS = {}
+
+def _predict_lock(model) -> threading.Lock:
+    lock = _PREDICT_LOCKS.get(id(model))
+    if lock is None:
+        with _MODEL_CACHE_LOCK:
+            lock = _PREDICT_LOCKS.setdefault(id(model), threading.Lock())
+    return lock
+
+# 탐지 결과 캐시 ((콘텐츠 해시, 모델 경로, conf, imgsz) -> 전체 클래스 YOLO 결과)
+# 같은 그림의 재업로드/재분석은 추론 없이 이전 결과 사용 (결과는 읽기 전용으로만 사용됨)
+_DETECTION_CACHE = OrderedDict()
+_DETECTION_CACHE_LOCK = threading.Lock()
+
+def _cached_detection(key):
+    if key is None:
+        return None
+    with _DETECTION_CACHE_LOCK:
+        result = _DETECTION_CACHE.get(key)
+        if result is not None:
+            _DETECTION_CACHE.move_to_end(key)
+    record_cache("detection", result is not None)
+    return result
+
+def _detection_cache_key(image_path: str, model_path: str, conf: float, imgsz: int):
+    """콘텐츠 해시 기반 캐시 키 (캐시 비활성 또는 해시를 알 수 없으면 None)"""
+    if DETECTION_CACHE_SIZE <= 0:
+        return None
+    digest = upload_store.digest_for(image_path)
+    return (digest, model_path, conf, imgsz) if digest else None
+
+def _store_detection(key, result):
+    if key is None:
+        return
+    with _DETECTION_CACHE_LOCK:
+        _DETECTION_CACHE[key] = result
+        while len(_DETECTION_CACHE) > DETECTION_CACHE_SIZE:
+            _DETECTION_CACHE.popitem(last=False)
+
+def filter_classes(result, classes):
+    """
+    탐지 결과에서 지정한 클래스 ID만 남김
+    - predict(classes=...)는 공유 predictor의 args에 남아 동시에 실행되는 전체 탐지까지 걸러지므로
+      클래스 필터는 항상 예측 후에 적용
+    """
+    if not classes or result.boxes is None or not len(result.boxes):
+        return result
+    wanted = {int(cid) for cid in classes}
+    keep = [i for i, cid in enumerate(result.boxes.cls.tolist()) if int(cid) in wanted]
+    return result[keep]
+
+def resolve_model_path(model_path: str = None, model_name: str = "htp") -> str:
+    """model_path 우선, 없으면 model_name으로 config에서 모델 경로 선택"""
+    if model_path and os.path.exists(model_path):
+        return model_path
+    if model_name in YOLO_MODELS:
+        return str(YOLO_MODELS[model_name])
+    # 기본값으로 htp 모델 사용
+    return str(YOLO_MODELS["htp"])
+
+def get_model(model_path: str):
+    """YOLO 모델 로드 (프로세스 내 캐싱)"""
+    model = _MODEL_CACHE.get(model_path)
+    if model is not None:
+        record_cache("yolo_model", True)
+        return model
+    with _MODEL_CACHE_LOCK:
+        model = _MODEL_CACHE.get(model_path)
+        if model is None:
+            record_cache("yolo_model", False)
+            logger.info(f"모델 로드: {model_path}")
+            with observe_duration("model_load", _model_label(model_path)):
+                model = YOLO(model_path)
+            _MODEL_CACHE[model_path] = model
+    return model
+
+def _model_label(model_path: str) -> str:
+    """메트릭 레이블용 모델 이름 (config에 없는 경로는 other)"""
+    for name, path in YOLO_MODELS.items():
+        if str(path) == str(model_path):
+            return name
+    return "other"
+
+def run_predict(model, model_name: str, **kwargs):
+    """
+    model.predict 실행 + 단계별 시간 기록
+    - 전처리/추론/후처리: ultralytics result.speed (이미지당 ms)
+    - 나머지 시간은 이미지 로드/디코드로 기록
+    - 결과의 원본 이미지(orig_img)는 해제 (박스/orig_shape만 사용, 해석·GPT 호출 동안 배열이 남지 않도록)
+    - 같은 모델 인스턴스의 predict는 모델별 lock으로 직렬화 (대기 시간은 span의 yolo.lock_wait_ms)
+    """
+    with start_span("yolo.predict", {"analysis.model": model_name, "yolo.imgsz": kwargs.get("imgsz"),
+                                     "yolo.conf": kwargs.get("conf")}) as span:
+        waited = time.perf_counter()
+        with _predict_lock(model):
+            started = time.perf_counter()
+            span.set_attribute("yolo.lock_wait_ms", round((started - waited) * 1000, 2))
+            with memory_tracker.scope() as memory:
+                results = model.predict(**kwargs)
+            elapsed = time.perf_counter() - started
+        if memory.peak is not None:
+            observe_memory("yolo_predict", memory.peak, model_name)
+        
+        measured = 0.0
+        speed = getattr(results[0], "speed", None) if results else None
+        if speed:
+            for phase in ("preprocess", "inference", "postprocess"):
+                seconds = (speed.get(phase) or 0.0) * len(results) / 1000
+                measured += seconds
+                observe_step(phase, seconds, model_name)
+                span.set_attribute(f"yolo.{phase}_ms", round(seconds * 1000, 2))
+        observe_step("image_decode", max(0.0, elapsed - measured), model_name)
+        
+        if results:
+            orig_shape = getattr(results[0], "orig_shape", None)
+            if orig_shape:
+                span.set_attributes({"image.height": int(orig_shape[0]), "image.width": int(orig_shape[1])})
+            boxes = getattr(results[0], "boxes", None)
+            span.set_attribute("yolo.detections", len(boxes) if boxes is not None else 0)
+        for result in results or ():
+            if getattr(result, "orig_img", None) is not None:
+                result.orig_img = None
+    return results
+
+def is_model_loaded(model_path: str) -> bool:
+    """모델이 캐시에 로드되어 있는지 확인"""
+    return model_path in _MODEL_CACHE
+
+def detect_objects(image_path: str, model_path: str = None, model_name: str = "htp", conf: float = 0.4, classes: list = None,
+                   imgsz: int = YOLO_IMGSZ):
     """
     객체 탐지 함수 - 안전한 에러 처리 및 경로 정규화 포함
     Args:
@@ -10,6 +157,8 @@ def detect_objects(image_path: str, model_path: str = None, model_name: str = "h
         model_path: 모델 파일 경로 (우선순위)
         model_name: 모델 이름 (htp, pitr)
         conf: 신뢰도 임계값
+        classes: 결과에 남길 클래스 ID 목록 (None이면 전체, 예측 후 filter_classes로 적용)
+        imgsz: 추론 입력 크기 (기본 YOLO_IMGSZ)
     Returns:
         YOLO 결과 객체 또는 안전한 빈 결과
     """
@@ -26,35 +175,28 @@ def detect_objects(image_path: str, model_path: str = None, model_name: str = "h
         
         # 이미지 파일 존재 확인
         if not os.path.exists(clean_path):
-            print(f"❌ 이미지 파일이 존재하지 않음: {clean_path}")
+            logger.warning(f"이미지 파일이 존재하지 않음: {clean_path}")
             return create_empty_result()
         
-        print(f"🔍 YOLO 분석 시작:")
-        print(f"   원본 경로: {image_path}")
-        print(f"   최종 경로: {clean_path}")
-        
         # model_path가 제공되면 우선 사용, 없으면 model_name으로 선택
-        if model_path and os.path.exists(model_path):
-            selected_model_path = model_path
-            print(f"   모델 경로 (직접): {model_path}")
-        elif model_name in YOLO_MODELS:
-            selected_model_path = str(YOLO_MODELS[model_name])
-            print(f"   모델 경로 (config): {selected_model_path}")
-        else:
-            # 기본값으로 htp 모델 사용
-            selected_model_path = str(YOLO_MODELS["htp"])
-            print(f"   모델 경로 (기본값): {selected_model_path}")
+        selected_model_path = resolve_model_path(model_path, model_name)
+        logger.debug("YOLO 분석 시작: 원본 경로 %s, 최종 경로 %s, 모델 경로 %s", image_path, clean_path, selected_model_path)
         
         # 모델 파일 존재 확인
         if not os.path.exists(selected_model_path):
-            print(f"❌ 모델 파일이 존재하지 않음: {selected_model_path}")
+            logger.error(f"모델 파일이 존재하지 않음: {selected_model_path}")
             return create_empty_result()
         
-        print(f"✅ 모델 로드: {selected_model_path}")
-        model = YOLO(selected_model_path)
+        # 같은 내용의 이미지는 이전 탐지 결과 재사용
+        cache_key = _detection_cache_key(clean_path, selected_model_path, conf, imgsz)
+        cached = _cached_detection(cache_key)
+        if cached is not None:
+            return filter_classes(cached, classes)
+        
+        model = get_model(selected_model_path)
         
         # 예측 수행 (최종 정리된 경로 사용)
-        results = model.predict(source=clean_path, imgsz=512, conf=conf, verbose=False)
+        results = run_predict(model, model_name, source=clean_path, imgsz=imgsz, conf=conf, verbose=False)
         
         if results and len(results) > 0:
             result = results[0]
@@ -62,24 +204,107 @@ def detect_objects(image_path: str, model_path: str = None, model_name: str = "h
             # 결과 검증
             if hasattr(result, 'boxes') and result.boxes is not None:
                 num_detections = len(result.boxes) if hasattr(result.boxes, '__len__') else 0
-                print(f"✅ YOLO 탐지 완료: {num_detections}개 객체 발견")
-                return result
+                logger.info(f"YOLO 탐지 완료 ({model_name}): {num_detections}개 객체")
+                _store_detection(cache_key, result)
+                return filter_classes(result, classes)
             else:
-                print("⚠️ YOLO 결과에 boxes 속성이 없음")
+                logger.warning("YOLO 결과에 boxes 속성이 없음")
                 return create_empty_result()
         else:
-            print("⚠️ YOLO 예측 결과가 비어있음")
+            logger.warning("YOLO 예측 결과가 비어있음")
             return create_empty_result()
             
     except Exception as e:
-        print(f"❌ YOLO 탐지 중 오류: {e}")
-        print(f"   원본 경로: {image_path}")
-        if 'clean_path' in locals():
-            print(f"   최종 경로: {clean_path}")
-        if 'selected_model_path' in locals():
-            print(f"   모델 경로: {selected_model_path}")
+        logger.exception(
+            f"YOLO 탐지 중 오류: {e} (원본 경로: {image_path}, "
+            f"모델 경로: {locals().get('selected_model_path', '-')})"
+        )
         return create_empty_result()
 
+def detect_objects_in_image(image, model_name: str = "htp", conf: float = 0.4, classes: list = None,
+                            imgsz: int = YOLO_IMGSZ):
+    """
+    메모리상의 이미지(PIL/ndarray)에 대한 객체 탐지 (실시간 드로잉 피드백용)
+    Args:
+        image: PIL 이미지 또는 numpy 배열
+        model_name: 모델 이름 (htp, pitr)
+        conf: 신뢰도 임계값
+        classes: 결과에 남길 클래스 ID 목록 (None이면 전체, 예측 후 filter_classes로 적용)
+    """
+    try:
+        selected_model_path = resolve_model_path(None, model_name)
+        if not os.path.exists(selected_model_path):
+            logger.error(f"모델 파일이 존재하지 않음: {selected_model_path}")
+            return create_empty_result()
+        
+        model = get_model(selected_model_path)
+        results = run_predict(model, model_name, source=image, imgsz=imgsz, conf=conf, verbose=False)
+        
+        if results and hasattr(results[0], 'boxes') and results[0].boxes is not None:
+            return filter_classes(results[0], classes)
+        return create_empty_result()
+        
+    except Exception as e:
+        logger.exception(f"YOLO 탐지 중 오류 (메모리 이미지): {e}")
+        return create_empty_result()
+
+def detect_objects_batch(image_paths: list, model_path: str = None, model_name: str = "htp", conf: float = 0.4,
+                         imgsz: int = YOLO_IMGSZ) -> list:
+    """
+    여러 이미지를 한 번의 predict 호출로 탐지 (배치 분석용)
+    - detect_objects와 같은 탐지 캐시 사용: 캐시에 있는 이미지와 배치 안의 중복 이미지는 predict에서 제외
+    Returns:
+        입력 순서와 같은 YOLO 결과 리스트 (실패한 항목은 빈 결과)
+    """
+    if not image_paths:
+        return []
+    
+    try:
+        selected_model_path = resolve_model_path(model_path, model_name)
+        if not os.path.exists(selected_model_path):
+            logger.error(f"모델 파일이 존재하지 않음: {selected_model_path}")
+            return [create_empty_result() for _ in image_paths]
+        
+        # 경로별 캐시 조회, 미스는 캐시 키(없으면 경로) 단위로 한 번만 추론
+        by_path = {}
+        sources = {}  # 추론 단위 -> (대표 경로, 캐시 키)
+        source_of = {}
+        for path in image_paths:
+            if path in source_of or path in by_path or not os.path.exists(path):
+                continue
+            key = _detection_cache_key(path, selected_model_path, conf, imgsz)
+            cached = _cached_detection(key)
+            if cached is not None:
+                by_path[path] = cached
+                continue
+            unit = key if key is not None else path
+            sources.setdefault(unit, (path, key))
+            source_of[path] = unit
+        
+        if sources:
+            model = get_model(selected_model_path)
+            logger.debug(f"YOLO 배치 분석 시작: {len(sources)}개 이미지 ({model_name})")
+            predictions = run_predict(
+                model, model_name, source=[path for path, _ in sources.values()], imgsz=imgsz, conf=conf, verbose=False
+            )
+            predicted = {}
+            for (unit, (_, key)), result in zip(sources.items(), predictions):
+                if hasattr(result, 'boxes') and result.boxes is not None:
+                    predicted[unit] = result
+                    _store_detection(key, result)
+            for path, unit in source_of.items():
+                if unit in predicted:
+                    by_path[path] = predicted[unit]
+        
+        results = [by_path[path] if path in by_path else create_empty_result() for path in image_paths]
+        
+        logger.info(f"YOLO 배치 탐지 완료 ({model_name}): {len(results)}개 결과")
+        return results
+        
+    except Exception as e:
+        logger.exception(f"YOLO 배치 탐지 중 오류: {e}")
+        return [create_empty_result() for _ in image_paths]
+
 def get_confidence_scores(boxes):
     """
     박스들의 신뢰도 점수 반환
@@ -116,10 +341,11 @@ def categorize_detections_by_confidence(boxes, results, high_threshold=0.6, low_
         else:
             rejected.append((label, conf_value, box.tolist()))
     
-    print(f"🎯 신뢰도 분류 결과:")
-    print(f"   높은 신뢰도 (>={high_threshold}): {len(high_confidence)}개")
-    print(f"   낮은 신뢰도 ({low_threshold}-{high_threshold}): {len(low_confidence)}개")
-    print(f"   거부됨 (<{low_threshold}): {len(rejected)}개")
+    logger.debug(
+        "신뢰도 분류 결과: 높은 신뢰도(>=%s) %d개, 낮은 신뢰도(%s-%s) %d개, 거부됨(<%s) %d개",
+        high_threshold, len(high_confidence), low_threshold, high_threshold, len(low_confidence),
+        low_threshold, len(rejected)
+    )
     
     return {
         'high_confidence': high_confidence,
@@ -131,6 +357,8 @@ def create_empty_result():
     """
     안전한 빈 결과 객체 생성
     """
+    record_fallback("empty_detection")
+    
     class EmptyResult:
         def __init__(self):
             self.boxes = EmptyBoxes()
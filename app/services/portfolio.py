@@ -0,0 +1,74 @@
+# app/services/portfolio.py
+"""
+회기 포트폴리오 종합 요약
+- 이력 저장소의 회기별 최신 결과(소견, 감정, 해석 요약)로 GPT 1회 호출
+- 선택적으로 업로드 저장소의 원본 그림을 low detail 썸네일로 첨부
+- 결과는 회기 구성 다이제스트가 바뀔 때(새 회기 추가/재검사)까지 캐시
+- refresh(강제 재생성)는 사용자별로 PORTFOLIO_REFRESH_INTERVAL에 한 번만 GPT 호출, 그 사이에는 캐시 반환
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+from ..core.config import PORTFOLIO_REFRESH_INTERVAL
+from ..core.metrics import record_cache
+from .history_store import history_store
+from .upload_store import upload_store
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioSummarizer:
+    """사용자별 포트폴리오 요약 생성 및 캐시"""
+
+    def __init__(self, refresh_interval: float = PORTFOLIO_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        # 사용자별 생성 잠금 (대기/생성 중인 요청이 없으면 자동으로 사라지므로 사용자 수만큼 쌓이지 않음)
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    async def get_summary(self, username: str, thumbnails: bool = False, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        포트폴리오 요약 반환 (이력이 없으면 None)
+        - 캐시된 요약의 다이제스트가 현재 회기 구성과 같으면 GPT를 호출하지 않음
+        - refresh는 캐시가 refresh_interval보다 오래됐을 때만 적용 (유료 호출 반복 방지)
+        - 같은 사용자에 대한 동시 요청은 생성 한 번을 공유
+        """
+        lock = self._locks.setdefault(username, asyncio.Lock())
+        async with lock:
+            stages = await asyncio.to_thread(history_store.get_stage_latest, username)
+            if not stages:
+                return None
+            version = history_store.stage_version(stages, thumbnails)
+
+            cached = await asyncio.to_thread(history_store.get_portfolio_summary, username)
+            fresh = cached is not None and cached["version"] == version
+            if fresh and refresh and time.time() - cached["created_at"] < self.refresh_interval:
+                refresh = False
+            record_cache("portfolio_summary", fresh and not refresh)
+            if fresh and not refresh:
+                return {**cached["summary"], "stage_count": len(stages), "cached": True, "created_at": cached["created_at"]}
+
+            summary = await asyncio.to_thread(self._generate, stages, thumbnails)
+            if summary.get("generated"):
+                await asyncio.to_thread(history_store.save_portfolio_summary, username, version, summary)
+            return {**summary, "stage_count": len(stages), "cached": False}
+
+    @staticmethod
+    def _generate(stages, thumbnails: bool) -> Dict[str, Any]:
+        from .models.gpt_analyzer import gpt_analyzer
+
+        images = []
+        if thumbnails:
+            for stage in stages:
+                path = upload_store.find(stage["image_hash"]) if stage.get("image_hash") else None
+                if path is not None:
+                    images.append((f"{stage['test_type'].upper()} {stage['stage']}단계", str(path)))
+        logger.info(f"포트폴리오 요약 생성: {len(stages)}개 회기, 썸네일 {len(images)}개")
+        return gpt_analyzer.summarize_portfolio(stages, images)
+
+
+# 전역 포트폴리오 요약 인스턴스
+portfolio_summarizer = PortfolioSummarizer()
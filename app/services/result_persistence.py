@@ -0,0 +1,248 @@
+# app/services/result_persistence.py
+"""
+분석 결과 비동기 일괄 저장
+- 분석 엔드포인트는 제한된 크기의 인프로세스 큐에 넣기만 함 (저장을 기다리지 않음)
+- 백그라운드 작업이 배치로 모아 DB 서버(RESULT_PERSIST_ENDPOINT) 또는 로컬 SQLite에 기록
+- DB 서버 전송 실패 시 로컬 SQLite에 기록해 유실 방지
+- 사용자 이름이 있는 결과는 이력 저장소(history_store)에도 기록
+- 결과 저장(RESULT_PERSIST_ENABLED)과 이력 기록(HISTORY_ENABLED)은 독립적으로 켜고 끔
+  (둘 중 하나라도 켜져 있으면 기록기 실행, 이력만 켠 경우 사용자 결과만 큐에 넣고 이력에만 기록)
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..core.config import (
+    RESULT_PERSIST_ENDPOINT,
+    RESULT_PERSIST_DB_PATH,
+    RESULT_PERSIST_QUEUE_SIZE,
+    RESULT_PERSIST_BATCH_SIZE,
+    RESULT_PERSIST_FLUSH_INTERVAL,
+    RESULT_PERSIST_ENABLED,
+    HISTORY_ENABLED,
+)
+from ..core.metrics import record_fallback
+from ..core.serialization import dumps
+from .db_resilience import LatencyHistogram
+from .history_store import history_store
+
+logger = logging.getLogger(__name__)
+
+
+def build_record(test_type: str, response: Dict[str, Any], username: Optional[str] = None,
+                 stage: Optional[int] = None, image_hash: Optional[str] = None) -> Dict[str, Any]:
+    """AnalysisResponse dict에서 저장용 레코드 생성 (탐지 결과, 감정, 회기 포함)"""
+    data = response.get("data") or {}
+    gpt_analysis = data.get("gpt_analysis") or {}
+    required_objects = data.get("required_objects") or {}
+    return {
+        "username": username,
+        "test_type": test_type,
+        "stage": stage if stage is not None else data.get("stage"),
+        "success": bool(response.get("success")),
+        "emotion": data.get("emotion") or gpt_analysis.get("emotion"),
+        "emotion_confidence": data.get("emotion_confidence") or gpt_analysis.get("emotion_confidence"),
+        "detections": data.get("detected_objects", []),
+        "detected_class_ids": data.get("detected_class_ids") or required_objects.get("detected_class_ids", []),
+        "stress_score": data.get("stress_score"),
+        "image_hash": image_hash,
+        "response": response,
+        "created_at": time.time(),
+    }
+
+
+class SQLiteResultSink:
+    """로컬 SQLite 결과 저장소"""
+
+    def __init__(self, db_path: Path = RESULT_PERSIST_DB_PATH):
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT,
+                    test_type TEXT NOT NULL,
+                    stage INTEGER,
+                    success INTEGER NOT NULL,
+                    emotion TEXT,
+                    emotion_confidence REAL,
+                    detections TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._conn = conn
+        return self._conn
+
+    def write_batch(self, records: List[Dict[str, Any]]):
+        rows = [
+            (
+                r["username"], r["test_type"], r["stage"], int(r["success"]), r["emotion"],
+                r["emotion_confidence"], json.dumps(r["detections"], ensure_ascii=False, default=str),
+                json.dumps(r["response"], ensure_ascii=False, default=str), r["created_at"]
+            )
+            for r in records
+        ]
+        with self._lock:
+            conn = self._connect()
+            with conn:  # 배치 단위 트랜잭션
+                conn.executemany(
+                    "INSERT INTO analysis_results (username, test_type, stage, success, emotion, "
+                    "emotion_confidence, detections, response, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+
+
+class ResultPersistence:
+    """제한된 큐 + 백그라운드 배치 기록기"""
+
+    def __init__(self, endpoint: str = RESULT_PERSIST_ENDPOINT, maxsize: int = RESULT_PERSIST_QUEUE_SIZE,
+                 batch_size: int = RESULT_PERSIST_BATCH_SIZE, flush_interval: float = RESULT_PERSIST_FLUSH_INTERVAL,
+                 persist_results: bool = RESULT_PERSIST_ENABLED, record_history: bool = HISTORY_ENABLED):
+        self.endpoint = endpoint
+        self.persist_results = persist_results
+        self.record_history = record_history
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.local_sink = SQLiteResultSink()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flush_latency = LatencyHistogram()
+        self.counters = {"enqueued": 0, "dropped": 0, "written": 0, "spilled": 0, "failed": 0, "batches": 0, "history": 0}
+        self.last_flush_at: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.persist_results or self.record_history
+
+    @property
+    def target(self) -> str:
+        if not self.persist_results:
+            return "history_only"
+        return "db_server" if self.endpoint else "sqlite"
+
+    def accepts(self, username: Optional[str]) -> bool:
+        """이 결과를 큐에 넣을 필요가 있는지 (이력만 켠 경우 사용자 결과만)"""
+        return self.persist_results or (self.record_history and bool(username))
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """큐에 추가 (절대 대기하지 않음, 큐가 가득 차거나 기록기가 없으면 False)"""
+        if self._queue is None:
+            self.counters["dropped"] += 1
+            return False
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.counters["dropped"] += 1
+            logger.warning("분석 결과 저장 큐가 가득 차 결과를 버립니다.")
+            return False
+        self.counters["enqueued"] += 1
+        return True
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"분석 결과 저장 시작 (대상: {self.target})")
+
+    async def stop(self):
+        """기록기 종료 - 큐에 남은 결과는 마지막으로 기록"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        for i in range(0, len(remaining), self.batch_size):
+            await self.flush(remaining[i:i + self.batch_size])
+        self._queue = None
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self.flush(batch)
+
+    async def flush(self, batch: List[Dict[str, Any]]):
+        if self.persist_results:
+            await self._write_results(batch)
+        if self.record_history:
+            try:
+                self.counters["history"] += await asyncio.to_thread(history_store.record_batch, batch)
+            except Exception as e:
+                logger.error(f"분석 이력 기록 실패 ({len(batch)}건): {e}")
+
+    async def _write_results(self, batch: List[Dict[str, Any]]):
+        started = time.monotonic()
+        try:
+            if self.endpoint:
+                try:
+                    await self._send(batch)
+                except Exception as e:
+                    logger.warning(f"DB 서버 결과 저장 실패, 로컬에 기록: {e}")
+                    await asyncio.to_thread(self.local_sink.write_batch, batch)
+                    self.counters["spilled"] += len(batch)
+                    record_fallback("persist_spill")
+            else:
+                await asyncio.to_thread(self.local_sink.write_batch, batch)
+            self.counters["written"] += len(batch)
+        except Exception as e:
+            self.counters["failed"] += len(batch)
+            logger.error(f"분석 결과 저장 실패 ({len(batch)}건): {e}")
+        finally:
+            self.counters["batches"] += 1
+            self.flush_latency.observe(time.monotonic() - started)
+            self.last_flush_at = time.time()
+
+    async def _send(self, batch: List[Dict[str, Any]]):
+        from .db_client import db_client
+
+        # 한 번만 인코딩해 bytes로 전송 (JSON으로 표현할 수 없는 값은 serialization 기본 규칙으로 변환)
+        body = dumps({"results": batch})
+        response = await db_client.post(
+            self.endpoint, content=body, headers={"Content-Type": "application/json"}, timeout=10.0
+        )
+        if response.status_code >= 300:
+            raise RuntimeError(f"HTTP {response.status_code}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "target": self.target,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_capacity": self.maxsize,
+            **self.counters,
+            "last_flush_at": self.last_flush_at,
+            "flush_latency": self.flush_latency.snapshot(),
+        }
+
+
+# 전역 분석 결과 저장 인스턴스
+result_persistence = ResultPersistence()
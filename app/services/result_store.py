@@ -0,0 +1,86 @@
+# app/services/result_store.py
+"""
+지연 분석 결과 저장소
+- 구조적 결과를 즉시 반환한 뒤 GPT 해석이 완료되면 결과를 갱신
+- 폴링(get) 및 SSE 대기(wait)를 지원하는 프로세스 내 TTL 저장소
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..core.config import DEFERRED_RESULT_TTL, DEFERRED_RESULT_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+
+class ResultStore:
+    """result_id 기반 지연 결과 저장소 (이벤트 루프 안에서만 사용)"""
+
+    def __init__(self, ttl: int = DEFERRED_RESULT_TTL, max_entries: int = DEFERRED_RESULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def create(self, response: Dict[str, Any]) -> str:
+        """대기 중(pending) 결과 등록 후 result_id 반환"""
+        self._evict()
+        result_id = uuid.uuid4().hex
+        self._entries[result_id] = {
+            "status": "pending",
+            "response": response,
+            "created_at": time.time(),
+            "completed_at": None,
+            "event": asyncio.Event()
+        }
+        return result_id
+
+    def complete(self, result_id: str, response: Dict[str, Any], status: str = "complete"):
+        """결과 갱신 및 대기 중인 구독자 깨우기"""
+        entry = self._entries.get(result_id)
+        if entry is None:
+            logger.warning(f"만료된 지연 결과 갱신 시도: {result_id}")
+            return
+        entry.update({"status": status, "response": response, "completed_at": time.time()})
+        entry["event"].set()
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """현재 상태 스냅샷 (없거나 만료되면 None)"""
+        entry = self._entries.get(result_id)
+        if entry is None or time.time() - entry["created_at"] > self.ttl:
+            return None
+        return {
+            "result_id": result_id,
+            "status": entry["status"],
+            "created_at": entry["created_at"],
+            "completed_at": entry["completed_at"],
+            "response": entry["response"]
+        }
+
+    async def wait(self, result_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """결과가 완료될 때까지 최대 timeout초 대기 후 스냅샷 반환"""
+        entry = self._entries.get(result_id)
+        if entry is None:
+            return None
+        try:
+            await asyncio.wait_for(entry["event"].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.get(result_id)
+
+    def _evict(self):
+        """TTL 만료 및 최대 개수 초과 항목 정리 (생성 순서 기준)"""
+        now = time.time()
+        while self._entries:
+            oldest_id, oldest = next(iter(self._entries.items()))
+            if now - oldest["created_at"] > self.ttl or len(self._entries) >= self.max_entries:
+                self._entries.pop(oldest_id)
+            else:
+                break
+
+
+# 전역 지연 결과 저장소 인스턴스
+result_store = ResultStore()
@@ -0,0 +1,203 @@
+# app/services/upload_store.py
+"""
+업로드 이미지 콘텐츠 주소 저장소
+- SHA-256 해시를 파일명으로 사용하고 2단계 샤딩 디렉토리에 저장 (ab/cd/<hash>.png)
+  확장자는 내용(매직 바이트)으로 결정하므로 같은 바이트는 업로드 파일명과 관계없이 한 파일만 기록
+- 참조 카운트(진행 중인 요청 수, 메모리)로 사용 중인 파일이 삭제되지 않도록 관리
+  재시작하면 진행 중인 요청이 없으므로 카운트는 0부터 시작, retain=False일 때 남은 파일은 sweep()으로 정리
+- 임시 파일 작성 후 rename 하여 동시 업로드에도 원자적으로 저장
+- 해시(digest)는 탐지 결과/GPT 이미지 인코딩 캐시의 키로 사용
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ..core.config import UPLOAD_STORE_ENABLED, UPLOAD_STORE_DIR, UPLOAD_STORE_RETAIN, UPLOAD_STORE_ORPHAN_TTL
+
+logger = logging.getLogger(__name__)
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+_PATH_DIGEST_LIMIT = 4096
+
+# 매직 바이트 → 확장자 (탐지 모델이 확장자로 이미지 형식을 판단하므로 내용에 맞춰 부여)
+_MAGIC_EXTENSIONS = (
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+    (b"BM", ".bmp"),
+)
+
+
+def sniff_extension(content: bytes, default: str = ".png") -> str:
+    """내용으로 판단한 이미지 확장자 (알 수 없으면 default)"""
+    for magic, extension in _MAGIC_EXTENSIONS:
+        if content.startswith(magic):
+            return extension
+    if content[:4] == b"RIFF" and content[8:12] == b"WEBP":
+        return ".webp"
+    return default.lower() or ".png"
+
+
+class UploadStore:
+    """해시 기반 업로드 저장소 및 참조 카운트 관리"""
+
+    def __init__(self, root: Path = UPLOAD_STORE_DIR, enabled: bool = UPLOAD_STORE_ENABLED,
+                 retain: bool = UPLOAD_STORE_RETAIN):
+        self.root = Path(root).resolve()
+        self.enabled = enabled
+        self.retain = retain
+        self._refs: Dict[str, int] = {}
+        # 저장소 밖의 파일에 대한 해시 메모 (path -> (mtime_ns, size, digest))
+        self._path_digests: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_bytes(content: bytes) -> str:
+        """바이트 내용의 SHA-256 해시"""
+        return hashlib.sha256(content).hexdigest()
+
+    def path_for(self, digest: str, extension: str = ".png") -> Path:
+        """해시에 대응하는 샤딩 경로"""
+        return self.root / digest[:2] / digest[2:4] / f"{digest}{extension}"
+
+    def put(self, content: bytes, extension: str = ".png") -> Tuple[str, Path, bool]:
+        """
+        내용을 저장소에 기록 (이미 있으면 참조만 증가)
+
+        Returns:
+            (digest, 저장 경로, 새로 기록했는지 여부)
+        """
+        digest = self.hash_bytes(content)
+
+        # 참조를 먼저 늘려 두면 release()가 이 파일을 지우지 않음 (삭제는 lock 안에서 참조 0일 때만)
+        with self._lock:
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+
+        existing = self.find(digest)
+        if existing is not None:
+            return digest, existing, False
+
+        extension = sniff_extension(content, extension)
+        path = self.path_for(digest, extension)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=extension)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            # 동일 내용의 동시 업로드가 있어도 replace는 원자적이므로 충돌하지 않음
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            with self._lock:
+                self._release_ref(digest)
+            raise
+
+        return digest, path, True
+
+    def find(self, digest: str) -> Optional[Path]:
+        """해시에 해당하는 저장 파일 (확장자 무관), 없으면 None"""
+        if not _DIGEST_RE.match(digest):
+            return None
+        for path in self.path_for(digest).parent.glob(f"{digest}.*"):
+            if not path.name.startswith(".tmp-"):
+                return path
+        return None
+
+    def owns(self, file_path: str) -> bool:
+        """저장소가 관리하는 파일인지 확인"""
+        try:
+            return Path(file_path).resolve().is_relative_to(self.root)
+        except (OSError, ValueError):
+            return False
+
+    def release(self, file_path: str):
+        """참조 해제 - retain=False 이고 참조가 0이 되면 파일 삭제"""
+        digest = Path(file_path).stem
+        with self._lock:
+            # lock 안에서 삭제해야 동시에 같은 내용을 put()한 요청이 기존 파일을 받은 뒤 지워지지 않음
+            if self._release_ref(digest) == 0 and not self.retain:
+                try:
+                    os.unlink(file_path)
+                except FileNotFoundError:
+                    pass
+
+    def sweep(self, max_age: float = UPLOAD_STORE_ORPHAN_TTL) -> int:
+        """
+        시작 시 정리 - 남은 임시 파일과 (retain=False면) 참조가 없는 오래된 파일 삭제
+        - 참조 카운트는 메모리에만 있어 비정상 종료 시 해제되지 못한 파일이 남을 수 있음
+        - 여러 워커가 같은 저장소를 쓰는 경우를 고려해 max_age(초)보다 오래된 파일만 삭제
+        """
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for path in self.root.glob("*/*/*"):
+            temporary = path.name.startswith(".tmp-")
+            if not temporary and (self.retain or self.ref_count(path.stem) > 0):
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info(f"업로드 저장소 정리: {removed}개 파일 삭제")
+        return removed
+
+    def ref_count(self, digest: str) -> int:
+        with self._lock:
+            return self._refs.get(digest, 0)
+
+    def digest_for(self, file_path: str) -> Optional[str]:
+        """
+        파일의 콘텐츠 해시 반환
+        - 저장소 파일은 파일명에서 바로 추출
+        - 그 외 파일은 (mtime, size) 기준으로 메모이즈하여 계산
+        """
+        path = Path(file_path)
+        if _DIGEST_RE.match(path.stem):
+            return path.stem
+
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        key = str(path.resolve())
+        cached = self._path_digests.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        hasher = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        if len(self._path_digests) >= _PATH_DIGEST_LIMIT:
+            self._path_digests.clear()
+        self._path_digests[key] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def _release_ref(self, digest: str) -> int:
+        count = self._refs.get(digest, 0) - 1
+        if count <= 0:
+            self._refs.pop(digest, None)
+            return 0
+        self._refs[digest] = count
+        return count
+
+
+# 전역 업로드 저장소 인스턴스
+upload_store = UploadStore()
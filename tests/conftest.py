@@ -0,0 +1,178 @@
+# tests/conftest.py
+"""
+CPU 핫패스 마이크로 벤치마크 공통 설정 (pytest-benchmark)
+
+- 개발 의존성: pip install -r requirements-dev.txt
+- pytest-benchmark가 없거나 비활성(-p no:benchmark)이면 hot_path는 측정 없이 한 번만 실행
+  → 각 테스트의 결과 검증(assert)은 플러그인 없이도 그대로 수행됨
+
+- 합성 픽스처: stroke / 박스 수를 작게(10) ~ 크게(10k) 바꿔가며 측정
+- 기준선(baseline) 저장 및 회귀 검사:
+    pytest tests --bench-save-baseline            # 현재 결과를 기준선으로 저장
+    pytest tests --bench-regression 15            # 기준선 대비 중앙값이 15% 이상 느려지면 실패
+  기준선 경로와 허용치는 환경변수 BENCH_BASELINE / BENCH_REGRESSION_PCT로도 지정 가능
+- 기준선은 측정한 머신에 종속되므로 저장소에 커밋하지 않고 각자 생성해서 사용
+"""
+
+import json
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parent / ".benchmarks" / "baseline.json"
+DEFAULT_REGRESSION_PCT = 20.0
+
+# 작게 / 중간 / 크게 (stroke 또는 박스 개수)
+BENCH_SIZES = [10, 1000, 10000]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("hot-path benchmarks")
+    group.addoption(
+        "--bench-baseline",
+        default=os.getenv("BENCH_BASELINE", str(DEFAULT_BASELINE_PATH)),
+        help="벤치마크 기준선 JSON 경로",
+    )
+    group.addoption(
+        "--bench-save-baseline",
+        action="store_true",
+        default=False,
+        help="이번 실행 결과로 기준선 JSON을 갱신",
+    )
+    group.addoption(
+        "--bench-regression",
+        type=float,
+        default=float(os.getenv("BENCH_REGRESSION_PCT", str(DEFAULT_REGRESSION_PCT))),
+        help="기준선 대비 허용 회귀율 (%%, 중앙값 기준)",
+    )
+
+
+class BaselineStore:
+    """테스트별 중앙값(초)을 기준선 JSON과 비교/저장"""
+
+    def __init__(self, path: Path, regression_pct: float, save: bool):
+        self.path = path
+        self.regression_pct = regression_pct
+        self.save = save
+        self.results = {}
+        try:
+            self.baseline = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.baseline = {}
+
+    def check(self, key: str, median: float):
+        """기준선보다 허용치 이상 느려졌으면 실패 메시지 반환"""
+        self.results[key] = {"median": median}
+        if self.save:
+            return None
+        expected = self.baseline.get(key, {}).get("median")
+        if not expected:
+            return None
+        change = (median - expected) / expected * 100
+        if change > self.regression_pct:
+            return (f"{key}: 중앙값 {median * 1000:.3f}ms, 기준선 {expected * 1000:.3f}ms "
+                    f"대비 {change:.1f}% 느려짐 (허용 {self.regression_pct:.1f}%)")
+        return None
+
+    def write(self):
+        if not self.save or not self.results:
+            return
+        merged = {**self.baseline, **self.results}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(merged, indent=2, sort_keys=True), encoding="utf-8")
+
+
+_BASELINE_KEY = pytest.StashKey[BaselineStore]()
+
+
+def pytest_configure(config):
+    config.stash[_BASELINE_KEY] = BaselineStore(
+        Path(config.getoption("--bench-baseline")),
+        config.getoption("--bench-regression"),
+        config.getoption("--bench-save-baseline"),
+    )
+
+
+def pytest_sessionfinish(session):
+    store = session.config.stash.get(_BASELINE_KEY, None)
+    if store is not None:
+        store.write()
+
+
+def _run_once(fn, *args, setup=None, rounds=20, **kwargs):
+    """플러그인 없이 실행할 때의 hot_path (결과 검증만)"""
+    if setup is not None:
+        setup()
+    return fn(*args, **kwargs)
+
+
+@pytest.fixture
+def hot_path(request):
+    """
+    benchmark 래퍼 - 측정 후 기준선과 비교
+    setup이 주어지면 매 라운드 전에 호출 (캐시 초기화 등)
+    """
+    if not request.config.pluginmanager.hasplugin("benchmark"):
+        return _run_once
+    benchmark = request.getfixturevalue("benchmark")
+    store = request.config.stash[_BASELINE_KEY]
+
+    def run(fn, *args, setup=None, rounds=20, **kwargs):
+        if setup is None:
+            result = benchmark(fn, *args, **kwargs)
+        else:
+            result = benchmark.pedantic(fn, args=args, kwargs=kwargs, setup=setup, rounds=rounds, iterations=1)
+        if benchmark.stats is None:  # --benchmark-disable
+            return result
+        # rootdir에 따라 달라지는 nodeid 대신 "파일명::테스트명[파라미터]"로 기록
+        key = f"{request.node.path.name}::{request.node.name}"
+        failure = store.check(key, benchmark.stats.stats.median)
+        if failure:
+            pytest.fail(failure)
+        return result
+
+    return run
+
+
+# === 합성 픽스처 ===
+
+@pytest.fixture(scope="session")
+def rng():
+    return random.Random(42)
+
+
+def make_svg_path(rng: random.Random, points: int, width: int = 400, height: int = 300) -> str:
+    """프론트엔드 캔버스가 보내는 형태의 SVG path 문자열 ('M x,y L x,y ...')"""
+    coords = [f"{rng.uniform(0, width):.2f},{rng.uniform(0, height):.2f}" for _ in range(points)]
+    return "M " + " L ".join(coords)
+
+
+def make_canvas_paths(rng: random.Random, strokes: int, points_per_stroke: int = 8) -> list:
+    return [
+        {"path": make_svg_path(rng, points_per_stroke), "color": "#000000", "strokeWidth": 3}
+        for _ in range(strokes)
+    ]
+
+
+def make_boxes(rng: random.Random, count: int, width: int = 640, height: int = 640, classes: int = 43) -> list:
+    """(class_id, confidence, [x1, y1, x2, y2]) 목록"""
+    boxes = []
+    for _ in range(count):
+        x1, y1 = rng.uniform(0, width - 20), rng.uniform(0, height - 20)
+        x2, y2 = rng.uniform(x1 + 10, width), rng.uniform(y1 + 10, height)
+        boxes.append((rng.randrange(classes), rng.random(), [x1, y1, x2, y2]))
+    return boxes
+
+
+@pytest.fixture(scope="session")
+def canvas_paths(rng):
+    """stroke 수별 캔버스 path 목록"""
+    return {size: make_canvas_paths(rng, size) for size in BENCH_SIZES}
+
+
+@pytest.fixture(scope="session")
+def synthetic_boxes(rng):
+    """박스 수별 합성 탐지 결과"""
+    return {size: make_boxes(rng, size) for size in BENCH_SIZES}
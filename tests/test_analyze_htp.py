@@ -0,0 +1,135 @@
+# tests/test_analyze_htp.py
+"""
+HTP 분석 CPU 핫패스 벤치마크
+- 캔버스 파싱/래스터화, 위치·크기 계산, 규칙 해석, GPT 응답 파싱, 이미지 인코딩, 응답 인코딩(full/compact)
+"""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("PIL")
+pytest.importorskip("openai")
+pytest.importorskip("torch")
+
+from PIL import Image
+
+from app.api.analyze_router import (
+    build_analysis_response, build_metadata, cleanup_temp_file, parse_svg_path, process_canvas_json, render_analysis
+)
+from app.services.models.confidence_analyzer import analyze_object_positions_and_sizes
+from app.services.models.gpt_analyzer import gpt_analyzer
+from app.services.models.htp_interpreter import run_full_interpretation
+
+from conftest import BENCH_SIZES, make_svg_path
+
+
+class FakeUpload:
+    """UploadFile 대역 - process_canvas_json은 read()만 사용"""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    async def read(self) -> bytes:
+        return self.content
+
+
+@pytest.fixture(scope="module")
+def canvas_image(tmp_path_factory):
+    path = tmp_path_factory.mktemp("htp") / "canvas.png"
+    Image.new("RGB", (800, 600), "white").save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("points", BENCH_SIZES)
+def test_parse_svg_path(hot_path, rng, points):
+    path_string = make_svg_path(rng, points)
+
+    result = hot_path(parse_svg_path, path_string, 2.0)
+
+    assert len(result) == points
+
+
+@pytest.mark.parametrize("strokes", BENCH_SIZES)
+def test_process_canvas_json(hot_path, canvas_paths, strokes):
+    content = json.dumps({"paths": canvas_paths[strokes], "width": 400, "height": 300, "scale": 2.0}).encode("utf-8")
+
+    def render():
+        image_path = asyncio.run(process_canvas_json(FakeUpload(content)))
+        cleanup_temp_file(image_path)
+        return image_path
+
+    assert hot_path(render).endswith(".png")
+
+
+@pytest.mark.parametrize("count", BENCH_SIZES)
+def test_analyze_object_positions_and_sizes(hot_path, synthetic_boxes, canvas_image, count):
+    detections = [(f"obj_{i}", conf, box) for i, (_, conf, box) in enumerate(synthetic_boxes[count])]
+
+    position_dict, size_dict = hot_path(analyze_object_positions_and_sizes, detections, canvas_image)
+
+    assert len(position_dict) == len(size_dict) == count
+
+
+@pytest.mark.parametrize("count", BENCH_SIZES)
+def test_run_full_interpretation(hot_path, synthetic_boxes, canvas_image, count):
+    labels = ["home", "tree", "person"]
+    detections = [(labels[i % 3] if i < 3 else f"obj_{i}", conf, box)
+                  for i, (_, conf, box) in enumerate(synthetic_boxes[count])]
+    position_dict, size_dict = analyze_object_positions_and_sizes(detections, canvas_image)
+
+    result = hot_path(run_full_interpretation, position_dict, size_dict)
+
+    assert isinstance(result, list)
+
+
+@pytest.mark.parametrize("view", ["full", "compact"])
+@pytest.mark.parametrize("count", BENCH_SIZES)
+def test_render_analysis(hot_path, synthetic_boxes, canvas_image, count, view):
+    detections = [(f"obj_{i}", conf, box) for i, (_, conf, box) in enumerate(synthetic_boxes[count])]
+    position_dict, size_dict = analyze_object_positions_and_sizes(detections, canvas_image)
+    gpt_result = {"interpretation": "그림에서 안정감이 느껴집니다." * 20, "emotion": "happiness", "emotion_confidence": 0.8}
+    data = {
+        "stage": 0,
+        "analysis_method": "rule_based_with_gpt_support",
+        "detected_objects": detections,
+        "high_confidence_objects": [{"label": label, "confidence": conf, "box": box} for label, conf, box in detections],
+        "position_analysis": position_dict,
+        "size_analysis": size_dict,
+        "rule_based_interpretation": {"method": "htp_interpreter", "position_analysis": position_dict, "size_analysis": size_dict},
+        "gpt_analysis": gpt_result,
+        **gpt_result,
+    }
+    response = build_analysis_response(success=True, message="HTP 분석이 완료되었습니다.", data=data,
+                                       metadata=build_metadata("htp"))
+
+    rendered = hot_path(render_analysis, response, view)
+
+    body = json.loads(rendered.body)
+    assert body["data"]["emotion"] == "happiness"
+    assert ("position_analysis" in body["data"]) == (view == "full")
+
+
+@pytest.mark.parametrize("sentences", BENCH_SIZES)
+def test_parse_gpt_response(hot_path, sentences):
+    interpretation = " ".join(["그림에서 안정감과 따뜻함이 느껴집니다."] * sentences)
+    body = json.dumps({"interpretation": interpretation, "emotion": "불안", "emotion_confidence": 0.8},
+                      ensure_ascii=False)
+    response_text = f"분석 결과입니다.\n```json\n{body}\n```"
+
+    result = hot_path(gpt_analyzer._parse_gpt_response, response_text)
+
+    assert result["emotion"] == "fear"
+
+
+@pytest.mark.parametrize("side", [256, 1024, 2048])
+def test_encode_image(hot_path, tmp_path, rng, side):
+    image_path = tmp_path / f"drawing_{side}.png"
+    Image.frombytes("RGB", (side, side), rng.randbytes(side * side * 3)).save(image_path)
+
+    # 인코딩 캐시를 비워 매 라운드 실제 디코딩/리사이즈/JPEG 인코딩 경로를 측정
+    encoded = hot_path(gpt_analyzer._encode_image, str(image_path), setup=gpt_analyzer._encode_cache.clear)
+
+    assert encoded
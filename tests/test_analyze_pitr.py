@@ -0,0 +1,32 @@
+# tests/test_analyze_pitr.py
+"""
+PITR 규칙 해석 CPU 핫패스 벤치마크
+"""
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("torch")
+
+from app.core.config import PITR_CLASS_NAMES
+from app.services.models.pitr_interpreter import interpret_pitr
+
+from conftest import BENCH_SIZES
+
+IMAGE_SIZE = (640, 640)
+
+
+@pytest.mark.parametrize("count", BENCH_SIZES)
+def test_interpret_pitr(hot_path, synthetic_boxes, count):
+    detections = [
+        {"class": PITR_CLASS_NAMES[class_id % len(PITR_CLASS_NAMES)], "confidence": conf, "box": box}
+        for class_id, conf, box in synthetic_boxes[count]
+    ]
+    # 필수 객체(person, rain)가 항상 포함되도록 앞의 두 박스를 고정
+    detections[0].update({"class": "person", "confidence": 0.9})
+    detections[1].update({"class": "rain", "confidence": 0.9})
+
+    result = hot_path(interpret_pitr, detections, IMAGE_SIZE)
+
+    assert result["status"] == "success"
+    assert 0 <= result["stress_score"] <= 100
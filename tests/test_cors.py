@@ -0,0 +1,229 @@
+# tests/test_cors.py
+"""
+CORS 미들웨어 요청당 오버헤드 벤치마크 (멀티파트 업로드 / 프리플라이트) 및 동작 검증
+- legacy: 기존 구성 (Starlette CORSMiddleware + 응답마다 헤더를 다시 쓰는 @app.middleware("http"))
+- asgi: app.core.cors.CORSMiddleware
+- 네트워크/클라이언트 비용을 빼기 위해 ASGI 앱을 직접 호출
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("multipart")
+pytest.importorskip("dotenv")
+
+from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.middleware.cors import CORSMiddleware as StarletteCORSMiddleware
+from fastapi.responses import JSONResponse
+
+from app.core.config import CORS_MAX_AGE
+from app.core.cors import CORSMiddleware
+
+ORIGIN = b"http://localhost:3000"
+BOUNDARY = b"benchboundary"
+CHUNK_SIZE = 64 * 1024
+
+# 업로드 이미지 크기 (bytes)
+UPLOAD_SIZES = [16 * 1024, 1024 * 1024]
+
+METHODS = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    if stack == "asgi":
+        app.add_middleware(CORSMiddleware)
+        return app
+
+    app.add_middleware(
+        StarletteCORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=False,
+        allow_methods=METHODS,
+        allow_headers=["*"],
+        expose_headers=["*"]
+    )
+
+    @app.middleware("http")
+    async def add_cors_headers(request: Request, call_next):
+        if request.method == "OPTIONS":
+            response = JSONResponse(content={"message": "OK"})
+            response.headers["Access-Control-Allow-Origin"] = "*"
+            response.headers["Access-Control-Allow-Methods"] = ", ".join(METHODS)
+            response.headers["Access-Control-Allow-Headers"] = "*"
+            return response
+        response = await call_next(request)
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        response.headers["Access-Control-Allow-Methods"] = ", ".join(METHODS)
+        response.headers["Access-Control-Allow-Headers"] = "*"
+        return response
+
+    return app
+
+
+def multipart_body(size: int) -> bytes:
+    return b"".join([
+        b"--" + BOUNDARY + b"\r\n",
+        b'Content-Disposition: form-data; name="file"; filename="drawing.png"\r\n',
+        b"Content-Type: image/png\r\n\r\n",
+        bytes(size),
+        b"\r\n--" + BOUNDARY + b"--\r\n",
+    ])
+
+
+def http_scope(method: str, headers) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": "/api/upload",
+        "raw_path": b"/api/upload",
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def run_request(loop, app, scope, chunks):
+    """요청 하나를 끝까지 처리하고 (상태 코드, 응답 헤더) 반환"""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    loop.run_until_complete(app(scope, receive, send))
+    return sent[0]["status"], dict(sent[0]["headers"])
+
+
+@pytest.mark.parametrize("size", UPLOAD_SIZES)
+@pytest.mark.parametrize("stack", ["legacy", "asgi"])
+def test_multipart_upload(hot_path, loop, stack, size):
+    app = build_app(stack)
+    body = multipart_body(size)
+    chunks = [body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)]
+    scope = http_scope("POST", [
+        (b"origin", ORIGIN),
+        (b"content-type", b"multipart/form-data; boundary=" + BOUNDARY),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ])
+
+    status, headers = hot_path(run_request, loop, app, scope, chunks)
+
+    assert status == 200
+    assert headers[b"access-control-allow-origin"] == b"*"
+
+
+@pytest.mark.parametrize("stack", ["legacy", "asgi"])
+def test_preflight(hot_path, loop, stack):
+    app = build_app(stack)
+    scope = http_scope("OPTIONS", [
+        (b"origin", ORIGIN),
+        (b"access-control-request-method", b"POST"),
+        (b"access-control-request-headers", b"authorization, content-type"),
+    ])
+
+    status, headers = hot_path(run_request, loop, app, scope, [b""])
+
+    assert 200 <= status < 300
+    assert headers[b"access-control-allow-origin"] == b"*"
+    if stack == "asgi":
+        assert headers[b"access-control-max-age"] == str(CORS_MAX_AGE).encode("latin-1")
+        assert headers[b"access-control-allow-headers"] == b"authorization, content-type"
+
+
+# === 동작 검증 (벤치마크 없이 실행) ===
+
+ALLOWED_ORIGINS = ["http://localhost:3000"]
+
+
+def build_strict_app() -> FastAPI:
+    """출처를 지정한 구성 (Vary: Origin 검증용)"""
+    app = FastAPI()
+
+    @app.post("/api/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(CORSMiddleware, allow_origins=ALLOWED_ORIGINS)
+    return app
+
+
+def upload_request(loop, app, headers):
+    body = multipart_body(16)
+    scope = http_scope("POST", [
+        *headers,
+        (b"content-type", b"multipart/form-data; boundary=" + BOUNDARY),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ])
+    return run_request(loop, app, scope, [body])
+
+
+def test_preflight_returns_204_with_max_age(loop):
+    scope = http_scope("OPTIONS", [
+        (b"origin", ORIGIN),
+        (b"access-control-request-method", b"POST"),
+    ])
+
+    status, headers = run_request(loop, build_strict_app(), scope, [b""])
+
+    assert status == 204
+    assert headers[b"access-control-allow-origin"] == ORIGIN
+    assert headers[b"access-control-max-age"] == str(CORS_MAX_AGE).encode("latin-1")
+
+
+def test_disallowed_origin_gets_no_allow_origin(loop):
+    app = build_strict_app()
+
+    status, headers = upload_request(loop, app, [(b"origin", b"http://evil.example")])
+    assert status == 200
+    assert b"access-control-allow-origin" not in headers
+
+    preflight = http_scope("OPTIONS", [
+        (b"origin", b"http://evil.example"),
+        (b"access-control-request-method", b"POST"),
+    ])
+    status, headers = run_request(loop, app, preflight, [b""])
+    assert status == 400
+    assert b"access-control-allow-origin" not in headers
+
+
+def test_request_without_origin_passes_through(loop):
+    status, headers = upload_request(loop, build_strict_app(), [])
+
+    assert status == 200
+    assert not any(key.startswith(b"access-control-") for key in headers)
+
+
+def test_specific_origins_set_vary_origin(loop):
+    status, headers = upload_request(loop, build_strict_app(), [(b"origin", ORIGIN)])
+
+    assert status == 200
+    assert headers[b"access-control-allow-origin"] == ORIGIN
+    assert headers[b"vary"] == b"Origin"
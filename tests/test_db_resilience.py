@@ -0,0 +1,43 @@
+# tests/test_db_resilience.py
+"""
+DB 서버 호출 라우트 정책 동작 검증 (네트워크 없이 httpx MockTransport로 업스트림 대체)
+"""
+
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("dotenv")
+
+from app.services.db_client import DBClient
+from app.services.db_resilience import ResilientDBClient
+
+PRIMARY = "http://primary.db"
+REPLICA = "http://replica.db"
+
+
+def make_client(hosts: list) -> ResilientDBClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        hosts.append(request.url.host)
+        return httpx.Response(200, json={"ok": True})
+
+    client = DBClient([PRIMARY], [REPLICA])
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return ResilientDBClient(client)
+
+
+def test_login_goes_to_primary_when_replicas_configured():
+    hosts = []
+    resilient = make_client(hosts)
+
+    async def login():
+        try:
+            return await resilient.request("login", "POST", "/login", json={"username": "u", "password": "p"})
+        finally:
+            await resilient.client.close()
+
+    response = asyncio.run(login())
+
+    assert response.status_code == 200
+    assert hosts == ["primary.db"]
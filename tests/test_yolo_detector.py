@@ -0,0 +1,40 @@
+# tests/test_yolo_detector.py
+"""
+YOLO 탐지 결과 후처리 CPU 핫패스 벤치마크
+- 모델 가중치 없이 합성 boxes(cls/conf/xyxy 배열)로 측정
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("ultralytics")
+
+from app.core.config import HTP_CLASS_NAMES
+from app.services.models.yolov8_detector import categorize_detections_by_confidence
+
+from conftest import BENCH_SIZES
+
+
+def make_results(boxes: list) -> SimpleNamespace:
+    """ultralytics Results 대역 (boxes.cls / boxes.conf / boxes.xyxy, names)"""
+    names = {class_id: HTP_CLASS_NAMES.get(class_id, f"class_{class_id}") for class_id in range(43)}
+    return SimpleNamespace(
+        boxes=SimpleNamespace(
+            cls=np.array([class_id for class_id, _, _ in boxes], dtype=np.float32),
+            conf=np.array([conf for _, conf, _ in boxes], dtype=np.float32),
+            xyxy=np.array([box for _, _, box in boxes], dtype=np.float32),
+        ),
+        names=names,
+    )
+
+
+@pytest.mark.parametrize("count", BENCH_SIZES)
+def test_categorize_detections_by_confidence(hot_path, synthetic_boxes, count):
+    results = make_results(synthetic_boxes[count])
+
+    categories = hot_path(categorize_detections_by_confidence, results.boxes, results)
+
+    total = sum(len(categories[key]) for key in ("high_confidence", "low_confidence", "rejected"))
+    assert total == count
@@ -0,0 +1,132 @@
+# tools/fake_db_server.py - 로컬 테스트용 DB 서버 대역
+"""
+DB 서버 API(/, /signup, /login, /game/clear)를 흉내 내는 대역 서버
+- 지연 분포와 실패율을 조절해 부하 분산/회복성 동작을 로컬에서 확인
+
+예) 업스트림 3개 띄우기 (하나는 느리고 하나는 자주 실패)
+    python tools/fake_db_server.py --port 9001
+    python tools/fake_db_server.py --port 9002 --latency 0.3
+    python tools/fake_db_server.py --port 9003 --fail-rate 0.5
+    DB_SERVER_URLS=http://127.0.0.1:9001,http://127.0.0.1:9002,http://127.0.0.1:9003 python run_server.py
+
+예) 긴 꼬리 지연 (로그정규 분포 + 2% 확률로 1초 지연)
+    python tools/fake_db_server.py --distribution lognormal --latency 0.02 --jitter 0.01 --tail-rate 0.02 --tail-latency 1.0
+"""
+
+import argparse
+import asyncio
+import math
+import random
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+
+DISTRIBUTIONS = ("gauss", "lognormal", "exponential", "fixed")
+
+
+class LatencyModel:
+    """
+    응답 지연 분포 (초)
+    - gauss: 평균 latency, 표준편차 jitter
+    - lognormal: 평균 latency, 표준편차 jitter인 로그정규 (오른쪽 꼬리가 긴 실제 서비스 지연에 가까움)
+    - exponential: 평균 latency
+    - fixed: 항상 latency
+    - tail_rate 확률로 tail_latency만큼 추가 지연 (간헐적 느린 응답)
+    """
+
+    def __init__(self, latency: float, jitter: float = 0.0, distribution: str = "gauss",
+                 tail_rate: float = 0.0, tail_latency: float = 0.0, seed=None):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"지원하지 않는 분포: {distribution}")
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.random = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.distribution == "fixed" or self.latency <= 0:
+            value = self.latency
+        elif self.distribution == "exponential":
+            value = self.random.expovariate(1 / self.latency)
+        elif self.distribution == "lognormal":
+            sigma2 = math.log(1 + (self.jitter / self.latency) ** 2)
+            value = self.random.lognormvariate(math.log(self.latency) - sigma2 / 2, math.sqrt(sigma2))
+        else:
+            value = self.random.gauss(self.latency, self.jitter)
+        if self.tail_rate and self.random.random() < self.tail_rate:
+            value += self.tail_latency
+        return max(0.0, value)
+
+    def should_fail(self, fail_rate: float) -> bool:
+        return fail_rate > 0 and self.random.random() < fail_rate
+
+
+def add_latency_args(parser: argparse.ArgumentParser, latency: float, jitter: float):
+    """대역 서버 공통 지연/실패 옵션"""
+    parser.add_argument("--latency", type=float, default=latency, help="평균 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=jitter, help="지연 표준편차 (초, gauss/lognormal)")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="gauss", help="지연 분포")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="추가 지연이 붙는 응답 비율 (0~1)")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="꼬리 응답에 더할 지연 (초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="오류 응답 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=None, help="난수 시드 (재현용)")
+
+
+def latency_from_args(args) -> LatencyModel:
+    return LatencyModel(args.latency, args.jitter, args.distribution, args.tail_rate, args.tail_latency, args.seed)
+
+
+def create_app(name: str, latency: LatencyModel, fail_rate: float) -> FastAPI:
+    app = FastAPI(title=f"Fake DB Server ({name})")
+    users = {}
+    clears = []
+
+    async def simulate():
+        await asyncio.sleep(latency.sample())
+        if latency.should_fail(fail_rate):
+            raise HTTPException(status_code=503, detail=f"{name}: simulated failure")
+
+    @app.get("/")
+    async def root():
+        await simulate()
+        return {"status": "ok", "served_by": name}
+
+    @app.post("/signup")
+    async def signup(user: dict):
+        await simulate()
+        if user.get("username") in users:
+            raise HTTPException(status_code=400, detail="이미 존재하는 사용자입니다.")
+        users[user.get("username")] = user
+        return {"message": "회원가입 성공", "served_by": name}
+
+    @app.post("/login")
+    async def login(user: dict):
+        await simulate()
+        return {"message": "로그인 성공", "username": user.get("username"), "served_by": name}
+
+    @app.post("/game/clear")
+    async def game_clear(data: dict):
+        await simulate()
+        clears.append(data)
+        return {"message": "저장 완료", "count": len(clears), "served_by": name}
+
+    @app.post("/analysis/results")
+    async def analysis_results(batch: dict):
+        """분석 결과 일괄 저장 (RESULT_PERSIST_ENDPOINT=/analysis/results 로 사용)"""
+        await simulate()
+        return {"message": "저장 완료", "count": len(batch.get("results", [])), "served_by": name}
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DB 서버 대역")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--name", default=None)
+    add_latency_args(parser, latency=0.02, jitter=0.005)
+    args = parser.parse_args()
+
+    name = args.name or f"fake-db-{args.port}"
+    uvicorn.run(create_app(name, latency_from_args(args), args.fail_rate), host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,117 @@
+# tools/fake_openai_server.py - 로컬 테스트용 OpenAI API 대역
+"""
+OpenAI chat completions / models API를 흉내 내는 대역 서버
+- 실제 API 비용·레이트 리밋 없이 GPT 호출 구간의 동시성/지연 영향을 측정
+- 응답 본문은 gpt_analyzer가 파싱하는 ```json``` 블록 형식 (interpretation/emotion/emotion_confidence)
+
+예)
+    python tools/fake_openai_server.py --port 9100 --distribution lognormal --latency 2.0 --jitter 1.0 --fail-rate 0.02
+    OPENAI_API_KEY=sk-fake OPENAI_BASE_URL=http://127.0.0.1:9100/v1 python run_server.py
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from fake_db_server import LatencyModel, add_latency_args, latency_from_args
+
+EMOTIONS = ["happiness", "sadness", "fear", "anger", "surprise", "disgust"]
+
+
+def completion_content(prompt_chars: int, index: int) -> str:
+    """분석/포트폴리오 파서가 모두 받아들이는 JSON 블록"""
+    body = {
+        "interpretation": f"[fake] 그림에서 안정감과 정서적 표현이 관찰됩니다. (prompt {prompt_chars}자)",
+        "emotion": EMOTIONS[index % len(EMOTIONS)],
+        "emotion_confidence": 0.75,
+        "summary": "[fake] 회기 전반에 걸쳐 점진적인 정서 안정이 관찰됩니다.",
+        "progress": "[fake] 회기가 진행될수록 긍정 감정 비율이 증가합니다.",
+        "recommendations": ["[fake] 현재 활동 유지"],
+        "dominant_emotion": EMOTIONS[index % len(EMOTIONS)],
+    }
+    return f"```json\n{json.dumps(body, ensure_ascii=False)}\n```"
+
+
+def count_prompt(messages: list) -> tuple:
+    """(텍스트 글자 수, 이미지 수)"""
+    chars = images = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                chars += len(part.get("text", ""))
+            elif part.get("type") == "image_url":
+                images += 1
+    return chars, images
+
+
+def create_app(latency: LatencyModel, fail_rate: float, rate_limit_rate: float) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI Server")
+    stats = {"requests": 0, "failures": 0, "rate_limited": 0}
+
+    def error(status: int, message: str, error_type: str):
+        return JSONResponse(status_code=status, content={"error": {"message": message, "type": error_type, "code": None}})
+
+    @app.get("/v1/models/{model}")
+    async def retrieve_model(model: str):
+        return {"id": model, "object": "model", "created": 0, "owned_by": "fake-openai"}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        stats["requests"] += 1
+        index = stats["requests"]
+        await asyncio.sleep(latency.sample())
+
+        if latency.should_fail(rate_limit_rate):
+            stats["rate_limited"] += 1
+            return error(429, "simulated rate limit", "rate_limit_exceeded")
+        if latency.should_fail(fail_rate):
+            stats["failures"] += 1
+            return error(500, "simulated server error", "server_error")
+
+        prompt_chars, images = count_prompt(payload.get("messages", []))
+        prompt_tokens = prompt_chars // 2 + images * 765  # high detail 이미지 토큰 근사치
+        completion_tokens = 120
+        return {
+            "id": f"chatcmpl-fake-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": completion_content(prompt_chars, index)},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI API 대역")
+    parser.add_argument("--port", type=int, default=9100)
+    add_latency_args(parser, latency=1.5, jitter=0.5)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(latency_from_args(args), args.fail_rate, args.rate_limit_rate),
+                host="127.0.0.1", port=args.port, log_level="warning")
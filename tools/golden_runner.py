@@ -0,0 +1,542 @@
+# tools/golden_runner.py - 탐지기 변형별 정확도/지연/메모리 회귀 측정 (골든셋)
+"""
+라벨이 있는 그림 디렉터리(골든셋)에 대해 탐지기 변형(가중치 형식, imgsz, conf)을 각각 실행하고
+정답 대비 정확도와 이미지별 지연/메모리를 JSON으로 저장 (버전 간 diff 가능하도록 키 정렬)
+
+골든셋 구성 (ultralytics 데이터셋 형식):
+    <dataset>/images/*.png|jpg
+    <dataset>/labels/<이미지 이름>.txt   # 한 줄에 "클래스ID cx cy w h" (0~1 정규화)
+    <dataset>/dataset.json               # 시드 출처 메타 (seed 명령이 생성)
+라벨 파일이 없는 이미지는 "객체 없음"으로 간주
+
+정확도:
+- 박스: 클래스별 AP(IoU 0.5, 0.5:0.95) 평균 = mAP50 / mAP50-95 (변형의 conf에서 나온 예측 기준)
+- 클래스 존재 일치: 이미지별 정답/예측 클래스 집합 비교 (micro precision/recall/F1, 완전 일치 비율)
+  → 앱의 규칙 해석과 Quest 필수 객체 판정은 클래스 존재 여부를 주로 사용
+
+예)
+    # uploads/의 이미지로 골든셋 시드 (참조 모델의 예측을 라벨 초안으로 기록 → 사람이 검수)
+    python tools/golden_runner.py seed --source uploads --dataset golden/htp --reference assets/weights/htp.pt --imgsz 640 --conf 0.25
+    # 현재 설정과 후보 변형 비교
+    python tools/golden_runner.py run --dataset golden/htp \\
+        --variant current=assets/weights/htp.pt \\
+        --variant pt640=assets/weights/htp.pt,imgsz=640 \\
+        --variant onnx512=assets/weights/htp.onnx,imgsz=512,conf=0.35 \\
+        --output golden-report.json --compare previous-report.json
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app.core.config import YOLO_MODELS, YOLO_IMGSZ  # noqa: E402
+from app.core.memory import MemoryTracker, rss_bytes, tensor_memory  # noqa: E402
+
+REPORT_SCHEMA = 1
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+DEFAULT_CONF = 0.4  # detect_objects 기본값과 동일
+IOU_THRESHOLDS = [round(0.5 + 0.05 * i, 2) for i in range(10)]
+
+
+# === 골든셋 ===
+
+def list_images(directory: Path) -> List[Path]:
+    """하위 디렉터리 포함 이미지 목록 (업로드 저장소의 샤딩 디렉터리, 임시 파일 제외)"""
+    return sorted(
+        p for p in directory.rglob("*")
+        if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES and not p.name.startswith(".tmp-")
+    )
+
+
+def label_path(dataset: Path, image: Path) -> Path:
+    return dataset / "labels" / f"{image.stem}.txt"
+
+
+def read_labels(path: Path) -> List[Tuple[int, float, float, float, float]]:
+    """YOLO 라벨 (cls, cx, cy, w, h) - 파일이 없으면 빈 목록"""
+    if not path.exists():
+        return []
+    labels = []
+    for line_no, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) < 5:
+            raise ValueError(f"{path}:{line_no} 라벨 형식 오류 (cls cx cy w h): {line!r}")
+        labels.append((int(parts[0]), *(float(v) for v in parts[1:5])))
+    return labels
+
+
+def to_xyxy(label, width: int, height: int) -> List[float]:
+    _, cx, cy, w, h = label
+    return [(cx - w / 2) * width, (cy - h / 2) * height, (cx + w / 2) * width, (cy + h / 2) * height]
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def dataset_digest(dataset: Path, images: List[Path]) -> str:
+    """이미지 + 라벨 내용 해시 (보고서 비교 시 같은 골든셋인지 확인)"""
+    digest = hashlib.sha256()
+    for image in images:
+        digest.update(image.name.encode("utf-8"))
+        digest.update(file_digest(image).encode("ascii"))
+        labels = label_path(dataset, image)
+        if labels.exists():
+            digest.update(labels.read_bytes())
+    return digest.hexdigest()
+
+
+# === 탐지기 변형 ===
+
+def parse_variant(spec: str) -> Dict:
+    """'name=path[,imgsz=640][,conf=0.35][,device=cpu]' → 변형 설정"""
+    name, sep, rest = spec.partition("=")
+    if not sep or not rest:
+        raise argparse.ArgumentTypeError(f"변형 형식 오류: {spec!r} (name=모델경로[,imgsz=N][,conf=F][,device=D])")
+    model, *options = rest.split(",")
+    variant = {"name": name, "model": model, "imgsz": YOLO_IMGSZ, "conf": DEFAULT_CONF, "device": None}
+    for option in options:
+        key, _, value = option.partition("=")
+        if key == "imgsz":
+            variant["imgsz"] = int(value)
+        elif key == "conf":
+            variant["conf"] = float(value)
+        elif key == "device":
+            variant["device"] = value
+        else:
+            raise argparse.ArgumentTypeError(f"알 수 없는 변형 옵션: {key} (imgsz, conf, device)")
+    return variant
+
+
+def load_variants(args) -> List[Dict]:
+    variants = list(args.variant or [])
+    if args.variants:
+        for entry in json.loads(Path(args.variants).read_text(encoding="utf-8")):
+            variants.append({"imgsz": YOLO_IMGSZ, "conf": DEFAULT_CONF, "device": None, **entry})
+    if not variants:
+        # 지정이 없으면 현재 앱 설정 (detect_objects 기본값)
+        variants.append({"name": "current", "model": str(YOLO_MODELS[args.model]), "imgsz": YOLO_IMGSZ,
+                         "conf": DEFAULT_CONF, "device": None})
+    names = [v["name"] for v in variants]
+    if len(set(names)) != len(names):
+        raise SystemExit(f"변형 이름이 중복되었습니다: {names}")
+    for variant in variants:
+        if not Path(variant["model"]).exists():
+            raise SystemExit(f"모델 파일이 없습니다 ({variant['name']}): {variant['model']}")
+    return variants
+
+
+def predict_kwargs(variant: Dict) -> Dict:
+    kwargs = {"imgsz": variant["imgsz"], "conf": variant["conf"], "verbose": False}
+    if variant.get("device"):
+        kwargs["device"] = variant["device"]
+    return kwargs
+
+
+def load_detector(model_path: str):
+    """앱과 같은 로더/추론 경로 사용 (ultralytics는 .pt 외 onnx/engine/openvino 등 내보낸 형식도 로드)"""
+    from app.services.models.yolov8_detector import get_model, run_predict
+    return get_model(model_path), run_predict
+
+
+def extract_predictions(result) -> List[Tuple[int, float, List[float]]]:
+    boxes = getattr(result, "boxes", None)
+    if boxes is None or len(boxes) == 0:
+        return []
+    return [
+        (int(cls), float(conf), [float(v) for v in box])
+        for cls, conf, box in zip(boxes.cls.tolist(), boxes.conf.tolist(), boxes.xyxy.tolist())
+    ]
+
+
+# === 정확도 ===
+
+def box_iou(a: List[float], b: List[float]) -> float:
+    inter_w = min(a[2], b[2]) - max(a[0], b[0])
+    inter_h = min(a[3], b[3]) - max(a[1], b[1])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def average_precision(recalls: List[float], precisions: List[float]) -> float:
+    """정밀도 포락선 아래 면적 (all-point interpolation)"""
+    mrec = [0.0, *recalls, 1.0]
+    mpre = [1.0, *precisions, 0.0]
+    for i in range(len(mpre) - 2, -1, -1):
+        mpre[i] = max(mpre[i], mpre[i + 1])
+    return sum((mrec[i + 1] - mrec[i]) * mpre[i + 1] for i in range(len(mrec) - 1))
+
+
+def class_ap(predictions: List[Tuple[str, float, List[float]]], truths: Dict[str, List[List[float]]],
+             threshold: float) -> float:
+    """한 클래스의 AP - predictions: (이미지, conf, box), truths: 이미지 → 정답 박스 목록"""
+    positives = sum(len(boxes) for boxes in truths.values())
+    if positives == 0:
+        return 0.0
+    matched = {image: [False] * len(boxes) for image, boxes in truths.items()}
+    tp = fp = 0
+    recalls, precisions = [], []
+    for image, _, box in sorted(predictions, key=lambda p: -p[1]):
+        best, best_iou = -1, threshold
+        for index, truth in enumerate(truths.get(image, [])):
+            iou = box_iou(box, truth)
+            if iou >= best_iou and not matched[image][index]:
+                best, best_iou = index, iou
+        if best >= 0:
+            matched[image][best] = True
+            tp += 1
+        else:
+            fp += 1
+        recalls.append(tp / positives)
+        precisions.append(tp / (tp + fp))
+    return average_precision(recalls, precisions)
+
+
+def box_metrics(records: List[Dict]) -> Dict:
+    """mAP50, mAP50-95 및 클래스별 AP50 (정답에 등장하는 클래스 기준)"""
+    predictions = defaultdict(list)
+    truths = defaultdict(lambda: defaultdict(list))
+    for record in records:
+        for cls, conf, box in record["predictions"]:
+            predictions[cls].append((record["image"], conf, box))
+        for cls, box in record["truths"]:
+            truths[cls][record["image"]].append(box)
+    if not truths:
+        return {"map50": None, "map50_95": None, "ap50_per_class": {}}
+
+    ap50, ap_all = {}, []
+    for cls in sorted(truths):
+        per_threshold = [class_ap(predictions[cls], truths[cls], t) for t in IOU_THRESHOLDS]
+        ap50[str(cls)] = round(per_threshold[0], 4)
+        ap_all.append(sum(per_threshold) / len(per_threshold))
+    return {
+        "map50": round(sum(ap50.values()) / len(ap50), 4),
+        "map50_95": round(sum(ap_all) / len(ap_all), 4),
+        "ap50_per_class": ap50,
+    }
+
+
+def presence_metrics(records: List[Dict]) -> Dict:
+    """이미지별 클래스 존재 여부 일치도"""
+    tp = fp = fn = exact = 0
+    for record in records:
+        expected = {cls for cls, _ in record["truths"]}
+        detected = {cls for cls, _, _ in record["predictions"]}
+        tp += len(expected & detected)
+        fp += len(detected - expected)
+        fn += len(expected - detected)
+        exact += expected == detected
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "exact_match": round(exact / len(records), 4) if records else None,
+    }
+
+
+# === 지연 / 메모리 ===
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def latency_summary(values: List[float]) -> Dict:
+    if not values:
+        return {}
+    return {
+        "mean": round(statistics.fmean(values), 2),
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "max": round(max(values), 2),
+    }
+
+
+def run_variant(variant: Dict, dataset: Path, images: List[Path], warmup: int, repeat: int,
+                tracker: MemoryTracker) -> Dict:
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    model, run_predict = load_detector(variant["model"])
+    load_ms = (time.perf_counter() - started) * 1000
+    kwargs = predict_kwargs(variant)
+
+    for _ in range(warmup):
+        run_predict(model, "golden", source=str(images[0]), **kwargs)
+
+    records, latencies = [], []
+    phases = defaultdict(list)
+    for image in images:
+        timings, peaks = [], []
+        for _ in range(repeat):
+            with tracker.scope() as memory:
+                started = time.perf_counter()
+                results = run_predict(model, "golden", source=str(image), **kwargs)
+                timings.append((time.perf_counter() - started) * 1000)
+            if memory.peak is not None:
+                peaks.append(memory.peak)
+        result = results[0]
+        height, width = result.orig_shape[:2]
+        for phase, ms in (getattr(result, "speed", None) or {}).items():
+            if ms is not None:
+                phases[phase].append(ms)
+
+        latency = statistics.median(timings)
+        latencies.append(latency)
+        truths = [(label[0], to_xyxy(label, width, height)) for label in read_labels(label_path(dataset, image))]
+        records.append({
+            "image": image.name,
+            "latency_ms": round(latency, 2),
+            "traced_peak_bytes": max(peaks) if peaks else None,
+            "rss_bytes": rss_bytes(),
+            "truths": truths,
+            "predictions": extract_predictions(result),
+        })
+
+    rss_values = [r["rss_bytes"] for r in records if r["rss_bytes"] is not None]
+    traced = [r["traced_peak_bytes"] for r in records if r["traced_peak_bytes"] is not None]
+    summary = {
+        "images": len(records),
+        "model_load_ms": round(load_ms, 1),
+        "latency_ms": latency_summary(latencies),
+        "phase_ms": {phase: round(statistics.fmean(values), 2) for phase, values in sorted(phases.items())},
+        "memory": {
+            "rss_before_bytes": rss_before,
+            "rss_max_bytes": max(rss_values) if rss_values else None,
+            "traced_peak_max_bytes": max(traced) if traced else None,
+            "tensors": tensor_memory(),
+        },
+        "boxes": box_metrics(records),
+        "presence": presence_metrics(records),
+    }
+    per_image = [
+        {
+            "image": r["image"],
+            "latency_ms": r["latency_ms"],
+            "traced_peak_bytes": r["traced_peak_bytes"],
+            "rss_bytes": r["rss_bytes"],
+            "expected": sorted({cls for cls, _ in r["truths"]}),
+            "detected": sorted({cls for cls, _, _ in r["predictions"]}),
+            "detections": len(r["predictions"]),
+        }
+        for r in records
+    ]
+    return {**variant, "summary": summary, "per_image": per_image}
+
+
+def environment() -> Dict:
+    info = {"python": platform.python_version(), "platform": platform.platform()}
+    for package in ("ultralytics", "torch", "onnxruntime", "openvino"):
+        module = sys.modules.get(package)
+        if module is not None:
+            info[package] = getattr(module, "__version__", "unknown")
+    try:
+        info["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return info
+
+
+# === 비교 ===
+
+COMPARE_METRICS = (
+    ("map50", lambda s: s["boxes"]["map50"]),
+    ("map50_95", lambda s: s["boxes"]["map50_95"]),
+    ("presence_f1", lambda s: s["presence"]["f1"]),
+    ("latency_p50", lambda s: s["latency_ms"].get("p50")),
+    ("latency_p95", lambda s: s["latency_ms"].get("p95")),
+    ("traced_peak_max", lambda s: s["memory"]["traced_peak_max_bytes"]),
+)
+
+
+def compare_reports(current: Dict, previous: Dict, max_map_drop: Optional[float],
+                    max_latency_increase: Optional[float]) -> List[str]:
+    """변형 이름이 같은 항목끼리 요약 지표 비교 출력, 허용치를 넘은 회귀 목록 반환"""
+    if current["dataset"]["digest"] != previous.get("dataset", {}).get("digest"):
+        print("⚠️ 이전 보고서와 골든셋 내용이 다릅니다 (이미지/라벨 변경) - 비교는 참고용")
+    previous_variants = {v["name"]: v for v in previous.get("variants", [])}
+    regressions = []
+    print("\n📊 이전 보고서 대비")
+    for variant in current["variants"]:
+        old = previous_variants.get(variant["name"])
+        if old is None:
+            print(f"  {variant['name']}: 이전 보고서에 없음")
+            continue
+        parts = []
+        for metric, getter in COMPARE_METRICS:
+            new_value, old_value = getter(variant["summary"]), getter(old["summary"])
+            if new_value is None or old_value is None:
+                continue
+            parts.append(f"{metric} {old_value} → {new_value} ({new_value - old_value:+.4g})")
+        print(f"  {variant['name']}: " + ", ".join(parts))
+
+        new_map, old_map = variant["summary"]["boxes"]["map50"], old["summary"]["boxes"]["map50"]
+        if max_map_drop is not None and new_map is not None and old_map is not None and old_map - new_map > max_map_drop:
+            regressions.append(f"{variant['name']}: mAP50 {old_map} → {new_map}")
+        new_p95 = variant["summary"]["latency_ms"].get("p95")
+        old_p95 = old["summary"]["latency_ms"].get("p95")
+        if max_latency_increase is not None and new_p95 and old_p95 \
+                and (new_p95 - old_p95) / old_p95 * 100 > max_latency_increase:
+            regressions.append(f"{variant['name']}: p95 {old_p95}ms → {new_p95}ms")
+    return regressions
+
+
+def print_summary(report: Dict):
+    print(f"\n📋 골든셋 {report['dataset']['path']} ({report['dataset']['images']}장)")
+    header = f"{'variant':<16} {'imgsz':>5} {'conf':>5} {'mAP50':>7} {'mAP50-95':>8} {'presF1':>7} {'exact':>6} {'p50ms':>8} {'p95ms':>8} {'peakMB':>7}"
+    print(header)
+    print("-" * len(header))
+    for variant in report["variants"]:
+        s = variant["summary"]
+        peak = s["memory"]["traced_peak_max_bytes"]
+
+        def fmt(value, width, spec=".3f"):
+            return f"{value:>{width}{spec}}" if value is not None else f"{'-':>{width}}"
+
+        print(f"{variant['name']:<16} {variant['imgsz']:>5} {variant['conf']:>5} "
+              f"{fmt(s['boxes']['map50'], 7)} {fmt(s['boxes']['map50_95'], 8)} {fmt(s['presence']['f1'], 7)} "
+              f"{fmt(s['presence']['exact_match'], 6, '.2f')} {fmt(s['latency_ms'].get('p50'), 8, '.1f')} "
+              f"{fmt(s['latency_ms'].get('p95'), 8, '.1f')} {fmt(peak / 1048576 if peak is not None else None, 7, '.1f')}")
+
+
+# === 명령 ===
+
+def cmd_seed(args):
+    """source의 이미지를 골든셋으로 복사하고 참조 모델 예측을 라벨 초안으로 기록"""
+    source, dataset = Path(args.source), Path(args.dataset)
+    images = list_images(source)[: args.limit or None]
+    if not images:
+        raise SystemExit(f"이미지가 없습니다: {source}")
+    reference = {"name": "reference", "model": args.reference, "imgsz": args.imgsz, "conf": args.conf,
+                 "device": args.device}
+    if not Path(args.reference).exists():
+        raise SystemExit(f"참조 모델 파일이 없습니다: {args.reference}")
+    model, run_predict = load_detector(args.reference)
+    (dataset / "images").mkdir(parents=True, exist_ok=True)
+    (dataset / "labels").mkdir(parents=True, exist_ok=True)
+
+    seeded = []
+    for image in images:
+        # 업로드 저장소는 해시 파일명이라 이름 충돌이 없고, 일반 업로드도 고유 이름을 사용
+        target = dataset / "images" / image.name
+        if target.exists() and not args.overwrite:
+            continue
+        shutil.copy2(image, target)
+        result = run_predict(model, "golden", source=str(target), **predict_kwargs(reference))[0]
+        boxes = getattr(result, "boxes", None)
+        lines = []
+        if boxes is not None and len(boxes):
+            for cls, xywhn in zip(boxes.cls.tolist(), boxes.xywhn.tolist()):
+                lines.append(f"{int(cls)} " + " ".join(f"{v:.6f}" for v in xywhn))
+        label_path(dataset, target).write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+        seeded.append(target.name)
+
+    manifest_path = dataset / "dataset.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {"seeds": []}
+    manifest["seeds"].append({
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": str(source),
+        "reference": {k: reference[k] for k in ("model", "imgsz", "conf")},
+        "images": seeded,
+        "reviewed": False,
+    })
+    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"🌱 {len(seeded)}장 시드 완료 → {dataset} (라벨은 참조 모델 예측이므로 검수 후 사용하세요)")
+
+
+def cmd_run(args):
+    dataset = Path(args.dataset)
+    images = list_images(dataset / "images")[: args.limit or None]
+    if not images:
+        raise SystemExit(f"골든셋 이미지가 없습니다: {dataset / 'images'}")
+    variants = load_variants(args)
+    tracker = MemoryTracker(enabled=args.trace_memory)
+    tracker.start()
+
+    results = []
+    for variant in variants:
+        print(f"🔍 {variant['name']}: {variant['model']} (imgsz={variant['imgsz']}, conf={variant['conf']})")
+        results.append(run_variant(variant, dataset, images, args.warmup, args.repeat, tracker))
+
+    report = {
+        "schema": REPORT_SCHEMA,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "dataset": {"path": str(dataset), "images": len(images), "digest": dataset_digest(dataset, images)},
+        "settings": {"warmup": args.warmup, "repeat": args.repeat, "trace_memory": args.trace_memory},
+        "variants": results,
+    }
+    print_summary(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True) + "\n",
+                                     encoding="utf-8")
+        print(f"\n💾 보고서 저장: {args.output}")
+
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare_reports(report, previous, args.max_map_drop, args.max_latency_increase)
+        if regressions:
+            print("\n❌ 허용치를 넘은 회귀:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="탐지기 변형별 골든셋 정확도/지연/메모리 비교")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="이미지 디렉터리로 골든셋 시드 (참조 모델 예측을 라벨 초안으로 기록)")
+    seed.add_argument("--source", default=str(BASE_DIR / "uploads"), help="이미지 디렉터리 (하위 디렉터리 포함)")
+    seed.add_argument("--dataset", required=True, help="골든셋 디렉터리")
+    seed.add_argument("--reference", default=str(YOLO_MODELS["htp"]), help="라벨 초안을 만들 참조 모델")
+    seed.add_argument("--imgsz", type=int, default=640, help="참조 모델 입력 크기")
+    seed.add_argument("--conf", type=float, default=0.25, help="참조 모델 신뢰도 임계값")
+    seed.add_argument("--device", default=None, help="추론 장치 (cpu, 0 등)")
+    seed.add_argument("--limit", type=int, default=0, help="최대 이미지 수 (0이면 전체)")
+    seed.add_argument("--overwrite", action="store_true", help="이미 있는 이미지/라벨도 다시 기록")
+    seed.set_defaults(handler=cmd_seed)
+
+    run = commands.add_parser("run", help="변형별 실행 및 보고서 생성")
+    run.add_argument("--dataset", required=True, help="골든셋 디렉터리 (images/, labels/)")
+    run.add_argument("--variant", action="append", type=parse_variant,
+                     help="name=모델경로[,imgsz=N][,conf=F][,device=D] (여러 번 지정 가능)")
+    run.add_argument("--variants", default=None, help="변형 목록 JSON 파일 ([{name, model, imgsz, conf, device}])")
+    run.add_argument("--model", choices=sorted(YOLO_MODELS), default="htp", help="변형 미지정 시 사용할 앱 모델")
+    run.add_argument("--warmup", type=int, default=2, help="변형마다 측정 전 워밍업 추론 횟수")
+    run.add_argument("--repeat", type=int, default=1, help="이미지당 반복 횟수 (지연은 중앙값)")
+    run.add_argument("--limit", type=int, default=0, help="최대 이미지 수 (0이면 전체)")
+    run.add_argument("--trace-memory", action="store_true", help="tracemalloc으로 이미지별 Python 할당 피크 측정")
+    run.add_argument("--output", default=None, help="JSON 보고서 저장 경로")
+    run.add_argument("--compare", default=None, help="비교할 이전 보고서 (같은 이름의 변형끼리 비교)")
+    run.add_argument("--max-map-drop", type=float, default=None, help="허용 mAP50 하락 (절대값, 초과 시 종료 코드 1)")
+    run.add_argument("--max-latency-increase", type=float, default=None, help="허용 p95 지연 증가율 (%%, 초과 시 종료 코드 1)")
+    run.set_defaults(handler=cmd_run)
+
+    args = parser.parse_args()
+    args.handler(args)
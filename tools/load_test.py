@@ -0,0 +1,390 @@
+# tools/load_test.py - 엔드투엔드 부하 테스트
+"""
+목표 RPS로 /api/analyze/* 와 /api/login 을 호출하고 지연/처리량/오류/단계별 시간을 보고
+
+- 기본: OpenAI 대역(tools/fake_openai_server.py), DB 서버 대역(tools/fake_db_server.py),
+  앱(uvicorn app.main:app)을 로컬 포트에 띄운 뒤 부하를 걸고 종료 (외부 API 호출 없음)
+- --target 지정 시 이미 떠 있는 서버에 부하만 건다
+- 개방 루프(open-loop): 응답을 기다리지 않고 도착 간격대로 요청을 보냄 (포아송 또는 균등 간격)
+- 단계별 시간은 응답의 Server-Timing 헤더(upload/decode/detect/rules/gpt/serialize/total)에서 수집
+- 이미지는 uploads/ 의 샘플, 캔버스 요청은 합성 stroke JSON 사용
+
+예)
+    python tools/load_test.py --rps 5 --duration 60 --mix htp=2,pitr=2,quest=3,canvas=2,login=1
+    python tools/load_test.py --rps 10 --openai-latency 3 --openai-distribution lognormal --openai-fail-rate 0.05 --report report.json
+    python tools/load_test.py --target http://127.0.0.1:8000 --rps 2 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+TOOLS_DIR = BASE_DIR / "tools"
+SAMPLE_DIR = BASE_DIR / "uploads"
+
+SCENARIOS = ("htp", "pitr", "quest", "canvas", "login")
+DEFAULT_MIX = "htp=2,pitr=2,quest=3,canvas=2,login=1"
+
+DESCRIPTIONS = [
+    "비 오는 날 우산을 쓰고 걸어가는 사람을 그렸어요.",
+    "집 앞에 큰 나무가 있고 해가 떠 있어요.",
+    "가족과 함께 공원에서 산책하는 모습이에요.",
+]
+
+
+# === 요청 생성 ===
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """'htp=2,login=1' → {'htp': 2.0, 'login': 1.0}"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"알 수 없는 시나리오: {name} (가능: {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def load_samples() -> List[tuple]:
+    samples = [(p.name, p.read_bytes()) for p in sorted(SAMPLE_DIR.iterdir())
+               if p.suffix.lower() in (".png", ".jpg", ".jpeg")]
+    if not samples:
+        raise SystemExit(f"샘플 이미지가 없습니다: {SAMPLE_DIR}")
+    return samples
+
+
+def synthetic_canvas(rng: random.Random, strokes: int = 40, points: int = 12) -> bytes:
+    """프론트엔드 캔버스 형식의 stroke JSON"""
+    paths = []
+    for _ in range(strokes):
+        coords = [f"{rng.uniform(0, 400):.1f},{rng.uniform(0, 300):.1f}" for _ in range(points)]
+        paths.append({"path": "M " + " L ".join(coords), "color": "#000000", "strokeWidth": 3})
+    return json.dumps({"paths": paths, "width": 400, "height": 300, "scale": 2.0}).encode("utf-8")
+
+
+class RequestFactory:
+    """시나리오별 httpx 요청 인자 생성 (시드 고정으로 재현 가능)"""
+
+    def __init__(self, samples: List[tuple], seed: int):
+        self.samples = samples
+        self.rng = random.Random(seed)
+        self.canvases = [synthetic_canvas(self.rng) for _ in range(8)]
+
+    def build(self, scenario: str) -> dict:
+        description = self.rng.choice(DESCRIPTIONS)
+        if scenario == "login":
+            user = f"load-user-{self.rng.randrange(100)}"
+            return {"method": "POST", "url": "/api/login", "json": {"username": user, "password": "password"}}
+        if scenario == "canvas":
+            files = {"image": ("canvas.json", self.rng.choice(self.canvases), "application/json")}
+            data = {"stage": str(self.rng.randint(1, 12)), "description": description}
+            return {"method": "POST", "url": "/api/analyze/quest", "files": files, "data": data}
+
+        name, content = self.rng.choice(self.samples)
+        files = {"image": (name, content, "image/png")}
+        data = {"description": description}
+        if scenario == "quest":
+            data["stage"] = str(self.rng.randint(1, 12))
+        return {"method": "POST", "url": f"/api/analyze/{scenario}", "files": files, "data": data}
+
+
+# === 측정 ===
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """'detect;dur=12.3, gpt;dur=800.0' → {'detect': 12.3, 'gpt': 800.0} (dur 없는 항목은 제외)"""
+    timings = {}
+    for entry in (header or "").split(","):
+        name, *params = [p.strip() for p in entry.split(";")]
+        for param in params:
+            if param.startswith("dur="):
+                try:
+                    timings[name] = float(param[4:])
+                except ValueError:
+                    pass
+    return timings
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """nearest-rank 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def classify(response: httpx.Response) -> Optional[str]:
+    """성공이면 None, 아니면 오류 분류 키"""
+    if response.status_code >= 400:
+        return f"http_{response.status_code}"
+    try:
+        body = response.json()
+    except ValueError:
+        return "invalid_json"
+    if isinstance(body, dict) and body.get("success") is False:
+        return f"app_{body.get('error') or 'error'}"
+    return None
+
+
+class LoadRun:
+    def __init__(self, client: httpx.AsyncClient, factory: RequestFactory, mix: Dict[str, float],
+                 rps: float, duration: float, arrival: str, max_inflight: int, seed: int):
+        self.client = client
+        self.factory = factory
+        self.scenarios = list(mix)
+        self.weights = [mix[name] for name in self.scenarios]
+        self.rps = rps
+        self.duration = duration
+        self.arrival = arrival
+        self.semaphore = asyncio.Semaphore(max_inflight)
+        self.rng = random.Random(seed + 1)
+        self.records: List[dict] = []
+        self.dropped = 0
+        self.elapsed = 0.0
+
+    async def one(self, scenario: str):
+        request = self.factory.build(scenario)
+        started = time.perf_counter()
+        record = {"scenario": scenario, "error": None, "timings": {}}
+        try:
+            response = await self.client.request(**request)
+            record["status"] = response.status_code
+            record["error"] = classify(response)
+            record["timings"] = parse_server_timing(response.headers.get("server-timing"))
+        except httpx.TimeoutException:
+            record["error"] = "timeout"
+        except httpx.TransportError as e:
+            record["error"] = f"transport_{type(e).__name__}"
+        finally:
+            record["latency"] = time.perf_counter() - started
+            self.records.append(record)
+            self.semaphore.release()
+
+    async def run(self):
+        tasks = []
+        started = time.perf_counter()
+        next_at = started
+        while next_at - started < self.duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            # 동시 요청 상한 초과 시 보내지 않고 드롭으로 기록 (개방 루프 유지)
+            if self.semaphore.locked():
+                self.dropped += 1
+            else:
+                await self.semaphore.acquire()
+                tasks.append(asyncio.create_task(self.one(scenario)))
+            interval = self.rng.expovariate(self.rps) if self.arrival == "poisson" else 1 / self.rps
+            next_at += interval
+        await asyncio.gather(*tasks)
+        self.elapsed = time.perf_counter() - started
+
+    def report(self) -> dict:
+        by_scenario = defaultdict(list)
+        for record in self.records:
+            by_scenario[record["scenario"]].append(record)
+
+        def summarize(records: List[dict]) -> dict:
+            ok = [r for r in records if r["error"] is None]
+            latencies = [r["latency"] * 1000 for r in ok]
+            stages = defaultdict(list)
+            for r in ok:
+                for name, value in r["timings"].items():
+                    stages[name].append(value)
+            return {
+                "requests": len(records),
+                "ok": len(ok),
+                "error_rate": round(1 - len(ok) / len(records), 4) if records else 0.0,
+                "throughput_rps": round(len(ok) / self.elapsed, 3) if self.elapsed else 0.0,
+                "latency_ms": {
+                    "p50": percentile(latencies, 50),
+                    "p95": percentile(latencies, 95),
+                    "p99": percentile(latencies, 99),
+                    "max": max(latencies) if latencies else None,
+                },
+                "errors": dict(Counter(r["error"] for r in records if r["error"])),
+                "stages_ms": {
+                    name: {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+                    for name, values in sorted(stages.items())
+                },
+            }
+
+        return {
+            "target_rps": self.rps,
+            "duration_s": round(self.elapsed, 2),
+            "sent": len(self.records),
+            "dropped": self.dropped,
+            "overall": summarize(self.records),
+            "scenarios": {name: summarize(records) for name, records in sorted(by_scenario.items())},
+        }
+
+
+def format_ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.0f}"
+
+
+def print_report(report: dict):
+    print(f"\n📊 부하 테스트 결과: 목표 {report['target_rps']} RPS, {report['duration_s']}초, "
+          f"전송 {report['sent']}건, 드롭 {report['dropped']}건")
+    header = f"{'scenario':<10}{'req':>6}{'ok':>6}{'err%':>7}{'rps':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["scenarios"].items()) + [("overall", report["overall"])]
+    for name, s in rows:
+        lat = s["latency_ms"]
+        print(f"{name:<10}{s['requests']:>6}{s['ok']:>6}{s['error_rate'] * 100:>6.1f}%{s['throughput_rps']:>8.2f}"
+              f"{format_ms(lat['p50']):>8}{format_ms(lat['p95']):>8}{format_ms(lat['p99']):>8}{format_ms(lat['max']):>8}")
+
+    if report["overall"]["errors"]:
+        print("\n❌ 오류 분류:")
+        for error, count in sorted(report["overall"]["errors"].items(), key=lambda item: -item[1]):
+            print(f"   {error}: {count}")
+
+    print("\n⏱️ 단계별 시간 (ms, p50 / p95):")
+    for name, s in rows:
+        if s["stages_ms"]:
+            stages = ", ".join(f"{stage} {format_ms(v['p50'])}/{format_ms(v['p95'])}" for stage, v in s["stages_ms"].items())
+            print(f"   {name:<10}{stages}")
+
+
+# === 로컬 스택 (대역 서버 + 앱) ===
+
+def latency_args(prefix: str, args) -> List[str]:
+    return [
+        "--latency", str(getattr(args, f"{prefix}_latency")),
+        "--jitter", str(getattr(args, f"{prefix}_jitter")),
+        "--distribution", getattr(args, f"{prefix}_distribution"),
+        "--fail-rate", str(getattr(args, f"{prefix}_fail_rate")),
+        "--seed", str(args.seed),
+    ]
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(url, timeout=2.0)).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.3)
+    raise SystemExit(f"서버 준비 시간 초과: {url}")
+
+
+class LocalStack:
+    """대역 서버와 앱을 하위 프로세스로 실행"""
+
+    def __init__(self, args):
+        self.args = args
+        self.processes: List[subprocess.Popen] = []
+        self.openai_url = f"http://127.0.0.1:{args.openai_port}"
+        self.db_url = f"http://127.0.0.1:{args.db_port}"
+        self.app_url = f"http://127.0.0.1:{args.app_port}"
+
+    def spawn(self, command: List[str], env: Optional[dict] = None):
+        self.processes.append(subprocess.Popen(command, cwd=BASE_DIR, env=env))
+
+    async def start(self, client: httpx.AsyncClient):
+        args = self.args
+        self.spawn([sys.executable, str(TOOLS_DIR / "fake_openai_server.py"), "--port", str(args.openai_port),
+                    *latency_args("openai", args)])
+        self.spawn([sys.executable, str(TOOLS_DIR / "fake_db_server.py"), "--port", str(args.db_port),
+                    *latency_args("db", args)])
+        await wait_ready(client, f"{self.openai_url}/v1/models/ready", 30)
+        await wait_ready(client, f"{self.db_url}/", 30)
+
+        env = {
+            **os.environ,
+            "OPENAI_API_KEY": "sk-fake-load-test",
+            "OPENAI_BASE_URL": f"{self.openai_url}/v1",
+            "DB_SERVER_URL": self.db_url,
+            "DB_SERVER_URLS": self.db_url,
+            "RESULT_PERSIST_ENDPOINT": os.environ.get("RESULT_PERSIST_ENDPOINT", "/analysis/results"),
+        }
+        self.spawn([sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+                    "--port", str(args.app_port), "--log-level", "warning"], env)
+        await wait_ready(client, f"{self.app_url}/api/health", args.startup_timeout)
+
+    def stop(self):
+        for process in reversed(self.processes):
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+async def main(args):
+    mix = parse_mix(args.mix)
+    factory = RequestFactory(load_samples(), args.seed)
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+
+    stack = None if args.target else LocalStack(args)
+    try:
+        async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as setup_client:
+            if stack:
+                print("🚀 대역 서버 및 앱 시작 중...")
+                await stack.start(setup_client)
+        base_url = args.target or stack.app_url
+
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            if args.warmup:
+                print(f"🔥 워밍업 {args.warmup}건 (집계 제외)")
+                names = list(mix)
+                await asyncio.gather(*(client.request(**factory.build(names[i % len(names)])) for i in range(args.warmup)),
+                                     return_exceptions=True)
+
+            print(f"📈 {base_url} 에 {args.rps} RPS로 {args.duration}초간 부하 ({args.arrival} 도착)")
+            run = LoadRun(client, factory, mix, args.rps, args.duration, args.arrival, args.max_inflight, args.seed)
+            await run.run()
+    finally:
+        if stack:
+            stack.stop()
+
+    report = run.report()
+    print_report(report)
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n💾 보고서 저장: {args.report}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="엔드투엔드 부하 테스트")
+    parser.add_argument("--target", default=None, help="이미 실행 중인 서버 URL (미지정 시 로컬 스택 실행)")
+    parser.add_argument("--rps", type=float, default=5.0, help="목표 초당 요청 수")
+    parser.add_argument("--duration", type=float, default=30.0, help="부하 시간 (초)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"시나리오 가중치 ({', '.join(SCENARIOS)})")
+    parser.add_argument("--arrival", choices=("poisson", "uniform"), default="poisson", help="요청 도착 간격 분포")
+    parser.add_argument("--max-inflight", type=int, default=256, help="동시 요청 상한 (초과분은 드롭)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청 타임아웃 (초)")
+    parser.add_argument("--warmup", type=int, default=3, help="측정 전 워밍업 요청 수 (모델 로드 등)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드 (재현용)")
+    parser.add_argument("--report", default=None, help="JSON 보고서 저장 경로")
+
+    stack_group = parser.add_argument_group("로컬 스택")
+    stack_group.add_argument("--app-port", type=int, default=8800)
+    stack_group.add_argument("--openai-port", type=int, default=9100)
+    stack_group.add_argument("--db-port", type=int, default=9001)
+    stack_group.add_argument("--startup-timeout", type=float, default=120.0, help="앱 시작 대기 (초)")
+    for prefix, latency, jitter in (("openai", 1.5, 0.5), ("db", 0.02, 0.005)):
+        stack_group.add_argument(f"--{prefix}-latency", type=float, default=latency, help=f"{prefix} 대역 평균 지연 (초)")
+        stack_group.add_argument(f"--{prefix}-jitter", type=float, default=jitter, help=f"{prefix} 대역 지연 표준편차 (초)")
+        stack_group.add_argument(f"--{prefix}-distribution", choices=("gauss", "lognormal", "exponential", "fixed"),
+                                 default="lognormal", help=f"{prefix} 대역 지연 분포")
+        stack_group.add_argument(f"--{prefix}-fail-rate", type=float, default=0.0, help=f"{prefix} 대역 오류 비율 (0~1)")
+
+    asyncio.run(main(parser.parse_args()))